@@ -5,7 +5,7 @@ import { useToast } from '../contexts/ToastContext';
 const ExportModal = ({ onClose, onExport }) => {
   const [formData, setFormData] = useState({
     reportType: 'user_activity',
-    exportFormat: 'pdf',
+    exportFormat: 'csv',
     dateFrom: '',
     dateTo: '',
     filters: {}
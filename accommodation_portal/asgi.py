@@ -3,6 +3,10 @@ ASGI config for accommodation_portal project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Requests for the live dashboard stream are answered by a dedicated ASGI app
+(apps/analytics/live.py) so that long-lived connections can react to client
+disconnects; everything else is handled by Django as usual.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +17,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'accommodation_portal.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup so the app registry is ready
+from apps.analytics.live import LIVE_EVENTS_PATH, live_events_app  # noqa: E402
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == LIVE_EVENTS_PATH:
+        await live_events_app(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -31,6 +31,7 @@ THIRD_PARTY_APPS = [
     'rest_framework',
     'corsheaders',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'django_filters',
     'django_extensions',
 ]
@@ -131,7 +132,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.authentication.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -163,8 +164,122 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.authentication.serializers.PrefilteredTokenRefreshSerializer',
 }
 
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (e.g. FileBasedCache or DatabaseCache) so invalidation reaches
+# every gunicorn worker.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='accommodation-portal'),
+    }
+}
+
+# Seconds analytics chart payloads stay cached
+ANALYTICS_CHART_CACHE_TTL = config('ANALYTICS_CHART_CACHE_TTL', default=60, cast=int)
+
+# Inactivity after which a user session is considered over (apps/analytics/sessions.py)
+ANALYTICS_SESSION_TIMEOUT_SECONDS = config('ANALYTICS_SESSION_TIMEOUT_SECONDS', default=1800, cast=int)
+
+# Dashboard snapshots (see apps/core/snapshots.py): refreshed in the background
+# once older than MAX_AGE, recomputed inline once older than MAX_STALENESS
+DASHBOARD_SNAPSHOT_MAX_AGE = config('DASHBOARD_SNAPSHOT_MAX_AGE', default=60, cast=int)
+DASHBOARD_SNAPSHOT_MAX_STALENESS = config('DASHBOARD_SNAPSHOT_MAX_STALENESS', default=900, cast=int)
+
+# Seconds Member/Deacon dashboard stats stay cached (apps/core/dashboard_cache.py);
+# entries are invalidated on change, the TTL only bounds memory. Not cached
+# unless the cache is shared between workers (not LocMemCache)
+DASHBOARD_STATS_CACHE_TTL = config('DASHBOARD_STATS_CACHE_TTL', default=3600, cast=int)
+
+# Seconds a role's dashboard activity feed stays cached
+DASHBOARD_ACTIVITIES_CACHE_TTL = config('DASHBOARD_ACTIVITIES_CACHE_TTL', default=30, cast=int)
+
+# Seconds the user snapshot behind JWT authentication stays cached
+# (apps/authentication/authentication.py); invalidated on change. Only used
+# with a shared CACHE_BACKEND; with local memory every request reads the user
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=300, cast=int)
+
+# Threads used to run the per-table dashboard totals concurrently
+# (apps/core/stats.py). Each thread opens its own connection, so this only
+# pays off when the database is remote; ignored on SQLite
+DASHBOARD_STATS_WORKERS = config('DASHBOARD_STATS_WORKERS', default=1, cast=int)
+
+# Token-bucket rate limits for the auth endpoints (apps/core/ratelimit.py),
+# as 'burst/refill per minute'. The local store limits each worker on its
+# own; SQLiteBucketStore or CacheBucketStore share buckets across workers
+RATE_LIMIT_ENABLED = config('RATE_LIMIT_ENABLED', default=True, cast=bool)
+RATE_LIMIT_STORE = config('RATE_LIMIT_STORE', default='apps.core.ratelimit.LocalBucketStore')
+RATE_LIMIT_SQLITE_PATH = config('RATE_LIMIT_SQLITE_PATH', default=str(BASE_DIR / 'ratelimit.sqlite3'))
+RATE_LIMITS = {
+    'login_ip': config('RATE_LIMIT_LOGIN_IP', default='20/10'),
+    'login_email': config('RATE_LIMIT_LOGIN_EMAIL', default='5/2'),
+    'register_ip': config('RATE_LIMIT_REGISTER_IP', default='5/1'),
+    'register_email': config('RATE_LIMIT_REGISTER_EMAIL', default='3/1'),
+}
+
+# Seconds the admin user statistics stay cached per scope
+# (apps/authentication/statistics.py); invalidated on change, the TTL only
+# rolls the 30-day registration window forward. Not cached unless the cache
+# is shared between workers (not LocMemCache)
+USER_STATISTICS_CACHE_TTL = config('USER_STATISTICS_CACHE_TTL', default=3600, cast=int)
+
+# Refresh-token blacklist Bloom filter (apps/authentication/blacklist.py):
+# seconds between syncs from the table when no blacklisting was signalled
+# through the cache, seconds of recent rows each sync re-reads (longer than
+# any blacklisting transaction, whose row may commit out of id order), and
+# tokens deleted per batch by the pruning job. The filter is only used with a
+# cache shared between workers (not LocMemCache)
+TOKEN_BLACKLIST_SYNC_SECONDS = config('TOKEN_BLACKLIST_SYNC_SECONDS', default=5, cast=int)
+TOKEN_BLACKLIST_RESCAN_SECONDS = config('TOKEN_BLACKLIST_RESCAN_SECONDS', default=60, cast=int)
+TOKEN_BLACKLIST_PRUNE_BATCH_SIZE = config('TOKEN_BLACKLIST_PRUNE_BATCH_SIZE', default=5000, cast=int)
+
+# Processes hashing passwords during bulk user imports
+# (apps/authentication/imports.py); 0 uses every CPU. Imports run in the
+# background job worker, so leave CPUs for the web workers. The import
+# endpoint rejects files with more than USER_IMPORT_MAX_ROWS rows
+USER_IMPORT_HASH_WORKERS = config('USER_IMPORT_HASH_WORKERS', default=2, cast=int)
+USER_IMPORT_MAX_ROWS = config('USER_IMPORT_MAX_ROWS', default=20000, cast=int)
+
+# Bulk user deletion (apps/authentication/deletion.py): users deleted per
+# transaction, and the request size above which deletion runs as a job
+USER_BULK_DELETE_BATCH_SIZE = config('USER_BULK_DELETE_BATCH_SIZE', default=100, cast=int)
+USER_BULK_DELETE_SYNC_LIMIT = config('USER_BULK_DELETE_SYNC_LIMIT', default=200, cast=int)
+
+# Square avatar variants (pixels) and their WebP quality, built by the
+# avatar processing job (apps/authentication/avatars.py)
+AVATAR_VARIANT_SIZES = {
+    'small': config('AVATAR_SMALL_SIZE', default=64, cast=int),
+    'medium': config('AVATAR_MEDIUM_SIZE', default=256, cast=int),
+}
+AVATAR_WEBP_QUALITY = config('AVATAR_WEBP_QUALITY', default=80, cast=int)
+
+# Most users returned by the user directory search endpoint
+# (apps/authentication/search.py)
+USER_SEARCH_MAX_RESULTS = config('USER_SEARCH_MAX_RESULTS', default=25, cast=int)
+
+# Seconds a service unit's stats stay cached (apps/service_units/stats.py);
+# invalidated on change, the TTL only bounds memory. Not cached unless the
+# cache is shared between workers (not LocMemCache)
+SERVICE_UNIT_STATS_CACHE_TTL = config('SERVICE_UNIT_STATS_CACHE_TTL', default=3600, cast=int)
+
+# Background jobs (see apps/core/jobs.py, run with `manage.py process_jobs`)
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=2, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_BACKOFF_SECONDS = config('JOB_RETRY_BACKOFF_SECONDS', default=10, cast=int)
+JOB_RETRY_BACKOFF_MAX_SECONDS = config('JOB_RETRY_BACKOFF_MAX_SECONDS', default=3600, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=2.0, cast=float)
+JOB_STALE_AFTER_SECONDS = config('JOB_STALE_AFTER_SECONDS', default=1800, cast=int)
+
+# Live dashboard stream (see apps/analytics/live.py, served over ASGI only)
+LIVE_EVENTS_POLL_INTERVAL = config('LIVE_EVENTS_POLL_INTERVAL', default=1.0, cast=float)
+LIVE_EVENTS_HEARTBEAT_SECONDS = config('LIVE_EVENTS_HEARTBEAT_SECONDS', default=15, cast=int)
+LIVE_EVENTS_MAX_CLIENTS = config('LIVE_EVENTS_MAX_CLIENTS', default=1000, cast=int)
+LIVE_EVENTS_QUEUE_SIZE = config('LIVE_EVENTS_QUEUE_SIZE', default=100, cast=int)
+LIVE_EVENTS_RETRY_MS = config('LIVE_EVENTS_RETRY_MS', default=5000, cast=int)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
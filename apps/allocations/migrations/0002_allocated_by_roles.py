@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('allocations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='roomallocation',
+            name='allocated_by',
+            field=models.ForeignKey(help_text='User who made this allocation', limit_choices_to={'role__in': ['SuperAdmin', 'PortalManager', 'Deacon']}, on_delete=django.db.models.deletion.PROTECT, related_name='allocations_made', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -7,6 +7,8 @@ from django.db import models
 from django.conf import settings
 from django.core.exceptions import ValidationError
 
+from apps.core.permissions import can
+
 
 class RoomAllocation(models.Model):
     """
@@ -57,7 +59,7 @@ class RoomAllocation(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.PROTECT,
         related_name='allocations_made',
-        limit_choices_to={'role__in': ['SuperAdmin', 'ServiceUnitAdmin']},
+        limit_choices_to={'role__in': ['SuperAdmin', 'PortalManager', 'Deacon']},
         help_text="User who made this allocation"
     )
     
@@ -190,20 +192,9 @@ class RoomAllocation(models.Model):
         if not user or not user.is_authenticated:
             return False
         
-        # Super admin can modify any allocation
-        if user.is_super_admin():
-            return True
-        
-        # Service unit admin can modify allocations they made or in their unit
-        if user.is_service_unit_admin():
-            # They made the allocation
-            if self.allocated_by == user:
-                return True
-            # It's for their service unit
-            if self.service_unit and self.service_unit.admin == user:
-                return True
-        
-        return False
+        # SuperAdmin and PortalManager can modify any allocation, a Deacon
+        # those they made or for the service unit they administer
+        return can(user, 'allocations', 'manage', self)
     
     @property
     def allocated_to_display(self):
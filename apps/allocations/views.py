@@ -10,7 +10,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django.utils import timezone
 from django.db import transaction
-from django.db import models
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 
 from .models import RoomAllocation, AllocationRequest
@@ -22,7 +22,9 @@ from .serializers import (
     AllocationRequestApprovalSerializer
 )
 from apps.buildings.models import Room
+from apps.service_units.models import ServiceUnit
 from apps.analytics.utils import EventLogger, EventType
+from apps.core.permissions import can, scope_queryset
 
 
 class CanManageAllocations(permissions.BasePermission):
@@ -33,7 +35,7 @@ class CanManageAllocations(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
             request.user.is_authenticated and
-            request.user.role in ['SuperAdmin', 'PortalManager', 'Deacon']
+            can(request.user, 'allocations', 'manage')
         )
 
 
@@ -48,9 +50,12 @@ class RoomAllocationViewSet(viewsets.ModelViewSet):
     - Permission-based access control
     """
     
+    # The nested ServiceUnitSerializer reads annotated counts and the admin
     queryset = RoomAllocation.objects.select_related(
-        'room', 'room__building', 'user', 'service_unit', 'allocated_by'
-    ).all()
+        'room', 'room__building', 'user', 'allocated_by'
+    ).prefetch_related(
+        Prefetch('service_unit', queryset=ServiceUnit.objects.with_counts())
+    )
     
     serializer_class = RoomAllocationSerializer
     permission_classes = [permissions.IsAuthenticated, CanManageAllocations]
@@ -83,22 +88,9 @@ class RoomAllocationViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        queryset = super().get_queryset()
-        user = self.request.user
-
-        # SuperAdmin and PortalManager can see all allocations
-        if user.role in ['SuperAdmin', 'PortalManager']:
-            return queryset
-
-        # Deacon can see allocations for their service unit
-        if user.role == 'Deacon':
-            return queryset.filter(
-                models.Q(service_unit__admin=user) |
-                models.Q(allocated_by=user)
-            )
-
-        # Regular users can only see their own allocations
-        return queryset.filter(user=user)
+        # SuperAdmin and PortalManager see all allocations, a Deacon those of
+        # their service unit or made by them, anyone else their own
+        return scope_queryset(super().get_queryset(), self.request.user, 'allocations')
     
     def perform_create(self, serializer):
         """Set allocated_by to current user and log event."""
@@ -193,7 +185,9 @@ class AllocationRequestViewSet(viewsets.ModelViewSet):
     queryset = AllocationRequest.objects.select_related(
         'requested_by', 'preferred_room', 'preferred_room__building',
         'preferred_building', 'reviewed_by', 'created_allocation'
-    ).all()
+    ).prefetch_related(
+        Prefetch('created_allocation__service_unit', queryset=ServiceUnit.objects.with_counts())
+    )
     
     serializer_class = AllocationRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -234,28 +228,9 @@ class AllocationRequestViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter queryset based on user permissions."""
-        queryset = super().get_queryset()
-        user = self.request.user
-
-        # SuperAdmin and PortalManager can see all requests
-        if user.role in ['SuperAdmin', 'PortalManager']:
-            return queryset
-
-        # Deacon can see requests for their service unit members
-        if user.role == 'Deacon':
-            # Get service unit members
-            from apps.authentication.models import User as AuthUser
-            service_unit_member_ids = AuthUser.objects.filter(
-                service_unit__admin=user
-            ).values_list('id', flat=True)
-
-            return queryset.filter(
-                models.Q(requested_by=user) |
-                models.Q(requested_by_id__in=service_unit_member_ids)
-            )
-
-        # Regular users can only see their own requests
-        return queryset.filter(requested_by=user)
+        # SuperAdmin and PortalManager see all requests, a Deacon their own and
+        # those of their service unit's members, anyone else their own
+        return scope_queryset(super().get_queryset(), self.request.user, 'allocation_requests')
     
     def perform_create(self, serializer):
         """Set requested_by to current user."""
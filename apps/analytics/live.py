@@ -0,0 +1,284 @@
+"""
+Server-Sent Events stream of live dashboard activity.
+
+Dashboards open ``GET /api/live/events/?token=<access token>`` with
+``EventSource`` instead of polling the dashboard endpoints. The stream is
+served directly by the ASGI application (see accommodation_portal/asgi.py), so
+it needs an ASGI server such as ``uvicorn accommodation_portal.asgi:application``.
+
+One ``LiveEventHub`` per worker process polls ``UserEvent`` for rows newer
+than the last one it saw and fans them out to every connected client, so the
+database cost is one small query per poll interval regardless of how many
+dashboards are open. Idle clients cost one asyncio queue each.
+
+Messages sent to clients:
+    event: activity   - a new UserEvent visible to the client's role
+    event: counters   - per-batch deltas (events, failed, by_type)
+    : heartbeat       - comment line keeping proxies from closing the stream
+"""
+
+import asyncio
+import json
+import logging
+from collections import Counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from apps.core.activities import feed_includes
+
+from .models import EventType, UserEvent
+
+logger = logging.getLogger(__name__)
+
+LIVE_EVENTS_PATH = '/api/live/events/'
+
+EVENT_FIELDS = (
+    'id', 'event_type', 'timestamp', 'user_id', 'user__username',
+    'user__service_unit_id', 'resource_type', 'resource_id', 'success',
+    'service_unit_id', 'target_user_id',
+)
+
+EVENT_TYPE_LABELS = dict(EventType.choices)
+
+
+class Subscriber:
+    """A connected dashboard and the slice of the event stream it may see."""
+
+    def __init__(self, user_id, role, service_unit_id, queue_size):
+        self.user_id = user_id
+        self.role = role
+        self.service_unit_id = service_unit_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def offer(self, message):
+        """Queue a message, dropping the oldest one if the client is too slow."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(message)
+
+
+def _is_visible(subscriber, event):
+    """The dashboard activity feed's rule for the subscriber's role (``FEED_RULES``)."""
+    return feed_includes(subscriber.role, subscriber.user_id, subscriber.service_unit_id, event)
+
+
+def _serialize_event(event):
+    return {
+        'id': event['id'],
+        'type': event['event_type'],
+        'title': EVENT_TYPE_LABELS.get(event['event_type'], event['event_type']),
+        'user_id': event['user_id'],
+        'username': event['user__username'],
+        'resource_type': event['resource_type'],
+        'resource_id': event['resource_id'],
+        'success': event['success'],
+        'timestamp': event['timestamp'].isoformat(),
+    }
+
+
+def _format_sse(event_name, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event_name}')
+    lines.append(f'data: {json.dumps(data)}')
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class LiveEventHub:
+    """
+    In-process publisher shared by all streams of one worker.
+
+    The polling task only runs while at least one client is connected.
+    """
+
+    def __init__(self, poll_interval, batch_size=500):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.subscribers = set()
+        self.last_id = None
+        self._task = None
+
+    def subscribe(self, subscriber):
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def _fetch(self):
+        close_old_connections()
+        if self.last_id is None:
+            # Start from "now": clients load history from the REST endpoints
+            self.last_id = UserEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            return []
+        events = list(
+            UserEvent.objects
+            .filter(id__gt=self.last_id)
+            .order_by('id')
+            .values(*EVENT_FIELDS)[:self.batch_size]
+        )
+        if events:
+            self.last_id = events[-1]['id']
+        return events
+
+    def publish(self, events):
+        """Fan a batch of event rows out to every subscriber allowed to see them."""
+        serialized = {}
+        for subscriber in list(self.subscribers):
+            visible = [event for event in events if _is_visible(subscriber, event)]
+            if not visible:
+                continue
+            for event in visible:
+                payload = serialized.get(event['id'])
+                if payload is None:
+                    payload = serialized[event['id']] = _format_sse(
+                        'activity', _serialize_event(event), event['id']
+                    )
+                subscriber.offer(payload)
+            subscriber.offer(_format_sse('counters', {
+                'events': len(visible),
+                'failed': sum(1 for event in visible if not event['success']),
+                'by_type': dict(Counter(event['event_type'] for event in visible)),
+            }))
+
+    async def _run(self):
+        fetch = sync_to_async(self._fetch)
+        while self.subscribers:
+            try:
+                events = await fetch()
+                if events:
+                    self.publish(events)
+            except Exception:
+                logger.exception('Live event poll failed')
+            await asyncio.sleep(self.poll_interval)
+        # The next subscriber starts from "now" again, not from where the
+        # last one left off
+        self.last_id = None
+
+
+hub = LiveEventHub(poll_interval=settings.LIVE_EVENTS_POLL_INTERVAL)
+
+
+def _authenticate(raw_token):
+    """Return ``(user_id, role, service_unit_id)`` for a valid access token, else None."""
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+    from apps.authentication.authentication import CachedJWTAuthentication
+
+    close_old_connections()
+    authenticator = CachedJWTAuthentication()
+    try:
+        user = authenticator.get_user(authenticator.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    if not user.is_active:
+        return None
+    return user.id, user.role, user.service_unit_id
+
+
+def _raw_token(scope):
+    from urllib.parse import parse_qs
+
+    # EventSource cannot set headers, so the token normally comes in the query string
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    if query.get('token'):
+        return query['token'][0]
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode('latin-1').split()
+            if len(parts) == 2 and parts[0] in settings.SIMPLE_JWT['AUTH_HEADER_TYPES']:
+                return parts[1]
+    return None
+
+
+def _cors_headers(scope):
+    origin = dict(scope.get('headers', [])).get(b'origin')
+    if not origin:
+        return []
+    allowed = getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False) or (
+        origin.decode('latin-1') in settings.CORS_ALLOWED_ORIGINS
+    )
+    if not allowed:
+        return []
+    return [
+        (b'access-control-allow-origin', origin),
+        (b'access-control-allow-credentials', b'true'),
+        (b'vary', b'Origin'),
+    ]
+
+
+async def _reject(send, status, message, extra_headers=()):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *extra_headers],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'error': message}).encode('utf-8')})
+
+
+async def live_events_app(scope, receive, send):
+    """ASGI application serving the live activity stream."""
+    cors = _cors_headers(scope)
+
+    if scope['method'] != 'GET':
+        await _reject(send, 405, 'Method not allowed', cors)
+        return
+
+    raw_token = _raw_token(scope)
+    identity = await sync_to_async(_authenticate)(raw_token) if raw_token else None
+    if identity is None:
+        await _reject(send, 401, 'Authentication credentials were not provided or are invalid', cors)
+        return
+
+    if len(hub.subscribers) >= settings.LIVE_EVENTS_MAX_CLIENTS:
+        await _reject(send, 503, 'Too many live connections, fall back to polling', cors)
+        return
+
+    subscriber = Subscriber(*identity, queue_size=settings.LIVE_EVENTS_QUEUE_SIZE)
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            *cors,
+        ],
+    })
+
+    async def stream():
+        await send({
+            'type': 'http.response.body',
+            'body': f'retry: {settings.LIVE_EVENTS_RETRY_MS}\n\n'.encode('utf-8'),
+            'more_body': True,
+        })
+        while True:
+            try:
+                message = await asyncio.wait_for(
+                    subscriber.queue.get(), timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                message = b': heartbeat\n\n'
+            await send({'type': 'http.response.body', 'body': message, 'more_body': True})
+
+    async def wait_for_disconnect():
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    hub.subscribe(subscriber)
+    tasks = [asyncio.ensure_future(stream()), asyncio.ensure_future(wait_for_disconnect())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hub.unsubscribe(subscriber)
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.analytics.models import UserEvent
+from apps.analytics.utils import RESOURCE_COLUMNS, extract_indexed_fields
+
+INDEXED_COLUMNS = ['service_unit_id', 'room_id', 'building_id', 'target_user_id']
+
+
+class Command(BaseCommand):
+    help = 'Copy service unit, room, building and target user ids from event metadata into indexed columns'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Number of events read and updated per batch (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        # Events logged before the columns existed have none of them set
+        pending = UserEvent.objects.filter(
+            **{f'{column}__isnull': True for column in INDEXED_COLUMNS}
+        ).filter(~Q(metadata={}) | Q(resource_type__in=RESOURCE_COLUMNS))
+
+        last_id = 0
+        scanned = updated = 0
+        while True:
+            batch = list(
+                pending.filter(id__gt=last_id)
+                .order_by('id')
+                .only('id', 'resource_type', 'resource_id', 'metadata', *INDEXED_COLUMNS)[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            changed = []
+            for event in batch:
+                fields = extract_indexed_fields(event.resource_type, event.resource_id, event.metadata)
+                if fields:
+                    for column, value in fields.items():
+                        setattr(event, column, value)
+                    changed.append(event)
+
+            UserEvent.objects.bulk_update(changed, INDEXED_COLUMNS)
+            updated += len(changed)
+            self.stdout.write(f'Scanned {scanned} events, updated {updated}...')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {updated} of {scanned} scanned events'))
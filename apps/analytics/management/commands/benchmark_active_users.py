@@ -0,0 +1,137 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.analytics.models import UserEvent
+from apps.analytics.rollups import window_start
+from apps.analytics.sketches import (
+    RELATIVE_ERROR, HyperLogLog, active_user_windows, update_active_user_sketches,
+)
+
+WINDOWS = (1, 7, 30)
+
+
+class Command(BaseCommand):
+    help = 'Compare HyperLogLog active-user estimates with exact distinct counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--synthetic-events',
+            type=int,
+            default=0,
+            help='Benchmark on N in-memory events instead of the analytics_user_events table',
+        )
+        parser.add_argument('--users', type=int, default=200000, help='Synthetic user population')
+        parser.add_argument('--days', type=int, default=30, help='Synthetic days of history')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for synthetic data')
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Fold pending events into the sketches before measuring',
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['synthetic_events']:
+            results = self.benchmark_synthetic(options)
+        else:
+            results = self.benchmark_database(options)
+
+        for row in results['windows']:
+            self.stdout.write(
+                f"{row['scope']:<28} {row['days']:>3}d  exact={row['exact']:<9} "
+                f"estimate={row['estimate']:<9} error={row['error_pct']:+.2f}%"
+            )
+        self.stdout.write(
+            f"exact: {results['exact_seconds']:.3f}s  sketches: {results['sketch_seconds']:.3f}s  "
+            f"expected standard error: {RELATIVE_ERROR * 100:.2f}%"
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def benchmark_database(self, options):
+        if options['refresh']:
+            update_active_user_sketches()
+
+        start = time.perf_counter()
+        exact = {}
+        for days in WINDOWS:
+            # Same day boundaries as the sketches: today plus the previous days - 1
+            events = UserEvent.objects.filter(timestamp__gte=window_start(days - 1), user__isnull=False)
+            exact[('all', '', days)] = events.values('user_id').distinct().count()
+            for row in events.values('user__role').annotate(users=Count('user_id', distinct=True)):
+                exact[('role', row['user__role'] or '', days)] = row['users']
+        exact_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        estimates = active_user_windows(WINDOWS)
+        sketch_seconds = time.perf_counter() - start
+
+        rows = []
+        for (dimension, value, days), count in sorted(exact.items()):
+            estimate = estimates.get((dimension, value), {}).get(days, 0)
+            rows.append(self.compare(f'{dimension}:{value or "*"}', days, count, estimate))
+
+        return {
+            'source': 'database',
+            'events': UserEvent.objects.count(),
+            'exact_seconds': exact_seconds,
+            'sketch_seconds': sketch_seconds,
+            'windows': rows,
+        }
+
+    def benchmark_synthetic(self, options):
+        rng = random.Random(options['seed'])
+        users, days, count = options['users'], options['days'], options['synthetic_events']
+
+        # Skewed activity: a minority of users produces most events
+        events = [
+            (rng.randrange(days), int(users * rng.random() ** 2))
+            for _ in range(count)
+        ]
+
+        start = time.perf_counter()
+        exact_days = [set() for _ in range(days)]
+        for day, user_id in events:
+            exact_days[day].add(user_id)
+        exact_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        daily = [HyperLogLog() for _ in range(days)]
+        for day, user_id in events:
+            daily[day].add(user_id)
+        estimates = {}
+        union = HyperLogLog()
+        for offset in range(max(WINDOWS)):
+            if offset < days:
+                union.update(daily[days - 1 - offset])
+            if offset + 1 in WINDOWS:
+                estimates[offset + 1] = union.estimate()
+        sketch_seconds = time.perf_counter() - start
+
+        rows = []
+        for window in WINDOWS:
+            exact = len(set().union(*exact_days[max(days - window, 0):]))
+            rows.append(self.compare('synthetic', window, exact, estimates[window]))
+
+        return {
+            'source': 'synthetic',
+            'events': count,
+            'users': users,
+            'exact_seconds': exact_seconds,
+            'sketch_seconds': sketch_seconds,
+            'generated_at': timezone.now().isoformat(),
+            'windows': rows,
+        }
+
+    @staticmethod
+    def compare(scope, days, exact, estimate):
+        error = (estimate - exact) / exact * 100 if exact else 0.0
+        return {'scope': scope, 'days': days, 'exact': exact, 'estimate': estimate, 'error_pct': round(error, 3)}
@@ -0,0 +1,183 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.analytics.models import UserEvent
+from apps.analytics.views import AnalyticsViewSet, invalidate_activity_charts
+from apps.core import views as core_views
+from apps.core.dashboard_cache import invalidate_dashboard_stats
+from apps.core.models import DashboardSnapshot
+from apps.core.snapshots import SNAPSHOT_BUILDERS, snapshot_scope
+
+User = get_user_model()
+
+DASHBOARD_VIEWS = {
+    'dashboard/stats': core_views.dashboard_stats,
+    'dashboard/activities': core_views.dashboard_activities,
+    'dashboard/summary': core_views.dashboard_summary,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Time every read-only AnalyticsViewSet action and the dashboard endpoints '
+        'at increasing event volumes and write a JSON report'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10000,1000000,10000000',
+            help='Comma-separated event counts to measure at (default: 10000,1000000,10000000)',
+        )
+        parser.add_argument(
+            '--generate',
+            action='store_true',
+            help='Top the event table up to each size with generate_sample_events',
+        )
+        parser.add_argument('--days', type=int, default=365, help='History spread for generated events')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for generated events')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per endpoint (default: 3)')
+        parser.add_argument('--email', help='Run as this user (defaults to the first SuperAdmin)')
+        parser.add_argument(
+            '--output',
+            help='Report path (default: analytics-benchmark-<timestamp>.json)',
+        )
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        user = self.get_user(options['email'])
+        endpoints = self.get_endpoints()
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'revision': self.git_revision(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'user_role': user.role,
+            'repeat': options['repeat'],
+            'runs': [],
+        }
+
+        for size in sizes:
+            existing = UserEvent.objects.count()
+            if options['generate'] and existing < size:
+                call_command(
+                    'generate_sample_events',
+                    count=size - existing,
+                    days=options['days'],
+                    seed=options['seed'] + size,
+                    stdout=self.stdout,
+                )
+            elif existing != size:
+                self.stdout.write(self.style.WARNING(
+                    f'Event table holds {existing} events, not {size}; measuring as is'
+                ))
+
+            events = UserEvent.objects.count()
+            self.stdout.write(self.style.SUCCESS(f'Measuring with {events} events...'))
+            run = {'target_events': size, 'events': events, 'endpoints': {}}
+            for name, view, params in endpoints:
+                result = self.measure(view, name, params, user, options['repeat'])
+                run['endpoints'][name] = result
+                self.stdout.write(
+                    f"  {name:<48} {result['status']}  cold {result['cold_ms']:>9.1f} ms  "
+                    f"median {result['median_ms']:>9.1f} ms  {result['queries']} queries"
+                )
+            report['runs'].append(run)
+
+        output = options['output'] or f"analytics-benchmark-{timezone.now():%Y%m%d-%H%M%S}.json"
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {os.path.abspath(output)}'))
+
+    def get_user(self, email):
+        users = User.objects.filter(email=email) if email else User.objects.filter(role='SuperAdmin')
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError('No user to benchmark as; pass --email or create a SuperAdmin')
+        return user
+
+    def get_endpoints(self):
+        """(name, view, query params) for every GET analytics action plus the dashboards."""
+        endpoints = []
+        for action in AnalyticsViewSet.get_extra_actions():
+            if 'get' not in action.mapping:
+                # POST actions (export_report) create rows and enqueue jobs
+                continue
+            view = AnalyticsViewSet.as_view({'get': action.__name__})
+            endpoints.append((f'analytics/{action.url_path}', view, {}))
+            if action.__name__ == 'activity_chart_data':
+                endpoints.append((f'analytics/{action.url_path}?chart_type=hourly', view, {'chart_type': 'hourly'}))
+        for name, view in DASHBOARD_VIEWS.items():
+            endpoints.append((name, view, {}))
+        return endpoints
+
+    def measure(self, view, name, params, user, repeat):
+        # Bypass ALLOWED_HOSTS checks for views that build absolute URLs
+        host = next((host for host in settings.ALLOWED_HOSTS if '*' not in host), 'localhost').lstrip('.')
+        factory = APIRequestFactory(SERVER_NAME=host)
+
+        def call():
+            request = factory.get(f'/api/{name.split("?")[0]}/', params)
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request)
+            if hasattr(response, 'render'):
+                response.render()
+            return response, (time.perf_counter() - start) * 1000
+
+        # The first call runs with nothing cached; later calls show the cached path
+        self.reset_caches(user)
+        with CaptureQueriesContext(connection) as queries:
+            response, cold_ms = call()
+        timings = [call()[1] for _ in range(repeat)]
+
+        return {
+            'status': response.status_code,
+            'queries': len(queries.captured_queries),
+            'cold_ms': round(cold_ms, 2),
+            'median_ms': round(statistics.median(timings), 2) if timings else None,
+            'runs_ms': [round(timing, 2) for timing in timings],
+            'response_bytes': len(response.content),
+        }
+
+    @staticmethod
+    def reset_caches(user):
+        """
+        Drop the cached payloads the measured endpoints read, and only those.
+
+        The cache also holds rate-limit buckets, auth snapshots, blacklist
+        state and job locks, which a full clear would wipe for every worker.
+        The user's dashboard snapshots go too, so the cold call computes the
+        dashboards instead of reading the stored rows; the next request
+        rebuilds them.
+        """
+        invalidate_activity_charts()
+        invalidate_dashboard_stats([user.id], [user.service_unit_id])
+        cache.delete(f'{core_views.ACTIVITY_FEED_NAMESPACE}:{core_views.activity_feed_scope(user)}:default')
+        for name in SNAPSHOT_BUILDERS:
+            DashboardSnapshot.objects.filter(name=name, scope=snapshot_scope(name, user)).delete()
+
+    @staticmethod
+    def git_revision():
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
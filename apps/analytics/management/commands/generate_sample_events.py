@@ -1,18 +1,50 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import timedelta
+from itertools import accumulate
 import random
 
-from apps.analytics.utils import EventLogger, EventType
-from apps.allocations.models import RoomAllocation
+from apps.analytics.models import ReportExport, UserEvent
+from apps.analytics.utils import EventType, extract_indexed_fields
+from apps.analytics.views import invalidate_activity_charts
 from apps.buildings.models import Building, Room
+from apps.service_units.models import ServiceUnit
 
 User = get_user_model()
 
+# Event types and their weights (more common events have higher weights)
+EVENT_TYPE_WEIGHTS = [
+    (EventType.LOGIN, 0.25),
+    (EventType.LOGOUT, 0.20),
+    (EventType.PROFILE_UPDATE, 0.05),
+    (EventType.ALLOCATION_CREATE, 0.15),
+    (EventType.ALLOCATION_UPDATE, 0.10),
+    (EventType.ALLOCATION_DELETE, 0.05),
+    (EventType.BUILDING_CREATE, 0.02),
+    (EventType.ROOM_CREATE, 0.03),
+    (EventType.USER_CREATE, 0.05),
+    (EventType.REPORT_GENERATE, 0.08),
+    (EventType.REPORT_EXPORT, 0.02),
+]
+
+# Relative activity per hour of day: quiet nights, a morning peak and a
+# smaller evening one
+HOUR_WEIGHTS = [
+    1, 1, 1, 1, 1, 2, 4, 8, 12, 14, 14, 12,
+    10, 11, 12, 11, 9, 7, 6, 6, 5, 4, 2, 1,
+]
+
+# Monday..Sunday; weekends carry services, so Sunday stays busy
+WEEKDAY_WEIGHTS = [10, 10, 10, 10, 9, 5, 8]
+
+ALLOCATION_EVENTS = {EventType.ALLOCATION_CREATE, EventType.ALLOCATION_UPDATE, EventType.ALLOCATION_DELETE}
+BUILDING_EVENTS = {EventType.BUILDING_CREATE, EventType.ROOM_CREATE}
+REPORT_EVENTS = {EventType.REPORT_GENERATE, EventType.REPORT_EXPORT}
+
 
 class Command(BaseCommand):
-    help = 'Generate sample analytics events for testing'
+    help = 'Generate sample analytics events for testing and benchmarking'
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -27,126 +59,153 @@ class Command(BaseCommand):
             default=30,
             help='Number of days back to generate events (default: 30)',
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=None,
+            help='Random seed, for reproducible datasets',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Events inserted per bulk_create call (default: 5000)',
+        )
 
     def handle(self, *args, **options):
         count = options['count']
         days = options['days']
-        
+        batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+
         self.stdout.write(
             self.style.SUCCESS(f'Generating {count} sample events over {days} days...')
         )
 
-        # Get some users for event generation
-        users = list(User.objects.all()[:10])
+        # Plain tuples of ids: tens of millions of events must not touch the ORM per row
+        users = list(User.objects.values_list('id', flat=True))
         if not users:
             self.stdout.write(
                 self.style.ERROR('No users found. Please create some users first.')
             )
             return
 
-        # Get some rooms and buildings for context
-        rooms = list(Room.objects.all()[:10])
-        buildings = list(Building.objects.all()[:5])
-
-        # Event types and their weights (more common events have higher weights)
-        event_types = [
-            (EventType.LOGIN, 0.25),
-            (EventType.LOGOUT, 0.20),
-            (EventType.PROFILE_UPDATE, 0.05),
-            (EventType.ALLOCATION_CREATE, 0.15),
-            (EventType.ALLOCATION_UPDATE, 0.10),
-            (EventType.ALLOCATION_DELETE, 0.05),
-            (EventType.BUILDING_CREATE, 0.02),
-            (EventType.ROOM_CREATE, 0.03),
-            (EventType.USER_CREATE, 0.05),
-            (EventType.REPORT_GENERATE, 0.08),
-            (EventType.REPORT_EXPORT, 0.02),
-        ]
-
-        # Generate events
-        events_created = 0
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=days)
+        rooms = list(Room.objects.values_list('id', 'room_number', 'building_id', 'building__name'))
+        buildings = list(Building.objects.values_list('id', 'name', 'location'))
+        service_units = list(ServiceUnit.objects.values_list('id', flat=True))
 
-        for i in range(count):
-            # Random timestamp within the date range
-            random_time = start_date + timedelta(
-                seconds=random.randint(0, int((end_date - start_date).total_seconds()))
-            )
+        event_types = [event_type for event_type, _ in EVENT_TYPE_WEIGHTS]
+        event_type_weights = list(accumulate(weight for _, weight in EVENT_TYPE_WEIGHTS))
 
-            # Select random event type based on weights
-            event_type = random.choices(
-                [et[0] for et in event_types],
-                weights=[et[1] for et in event_types]
-            )[0]
-
-            # Select random user
-            user = random.choice(users)
-
-            # Generate appropriate metadata based on event type
-            metadata = {}
-            resource_type = None
-            resource_id = None
+        # Seconds-since-start candidates for each (day, hour) slot, weighted by
+        # weekday and hour of day
+        end_date = timezone.now()
+        start_date = (end_date - timedelta(days=days)).replace(minute=0, second=0, microsecond=0)
+        slots = []
+        slot_weights = []
+        for hour_offset in range(days * 24):
+            slot_start = start_date + timedelta(hours=hour_offset)
+            if slot_start >= end_date:
+                break
+            local = timezone.localtime(slot_start)
+            slots.append(slot_start)
+            slot_weights.append(WEEKDAY_WEIGHTS[local.weekday()] * HOUR_WEIGHTS[local.hour])
+        slot_weights = list(accumulate(slot_weights))
 
-            if event_type in [EventType.ALLOCATION_CREATE, EventType.ALLOCATION_UPDATE, EventType.ALLOCATION_DELETE]:
-                if rooms:
-                    room = random.choice(rooms)
+        events_created = 0
+        while events_created < count:
+            size = min(batch_size, count - events_created)
+            chosen_types = rng.choices(event_types, cum_weights=event_type_weights, k=size)
+            chosen_slots = rng.choices(slots, cum_weights=slot_weights, k=size)
+
+            batch = []
+            for event_type, slot_start in zip(chosen_types, chosen_slots):
+                timestamp = slot_start + timedelta(seconds=rng.randrange(3600))
+                if timestamp > end_date:
+                    timestamp = end_date
+
+                # Skewed activity: a minority of users produces most events
+                user_id = users[int(len(users) * rng.random() ** 2)]
+
+                metadata = {}
+                resource_type = None
+                resource_id = None
+
+                if event_type in ALLOCATION_EVENTS and rooms:
+                    room_id, room_number, building_id, building_name = rng.choice(rooms)
                     metadata = {
-                        'room_id': room.id,
-                        'room_number': room.room_number,
-                        'building_name': room.building.name if room.building else 'Unknown',
-                        'allocation_type': random.choice(['Pastor', 'ServiceUnit', 'Member'])
+                        'allocation_details': {
+                            'room_id': room_id,
+                            'user_id': rng.choice(users),
+                            'service_unit_id': rng.choice(service_units) if service_units else None,
+                            'allocation_type': rng.choice(['Pastor', 'ServiceUnit', 'Member']),
+                        },
+                        'room_number': room_number,
+                        'building_id': building_id,
+                        'building_name': building_name,
                     }
                     resource_type = 'allocation'
-                    resource_id = random.randint(1, 100)
+                    resource_id = rng.randint(1, 100)
 
-            elif event_type in [EventType.BUILDING_CREATE, EventType.ROOM_CREATE]:
-                if buildings:
-                    building = random.choice(buildings)
+                elif event_type == EventType.ROOM_CREATE and rooms:
+                    room_id, room_number, building_id, building_name = rng.choice(rooms)
                     metadata = {
-                        'building_id': building.id,
-                        'building_name': building.name,
-                        'location': building.location
+                        'building_details': {
+                            'building_id': building_id,
+                            'building_name': building_name,
+                            'room_id': room_id,
+                            'room_number': room_number,
+                        },
                     }
-                    resource_type = 'building' if event_type == EventType.BUILDING_CREATE else 'room'
-                    resource_id = building.id
-
-            elif event_type in [EventType.REPORT_GENERATE, EventType.REPORT_EXPORT]:
-                metadata = {
-                    'report_type': random.choice(['user_activity', 'allocation_summary', 'building_utilization']),
-                    'filters': {'date_range': f'{days}_days'}
-                }
-                if event_type == EventType.REPORT_EXPORT:
-                    metadata['export_format'] = random.choice(['pdf', 'csv', 'excel'])
-                resource_type = 'report'
-
-            # Random success rate (95% success)
-            success = random.random() < 0.95
-            error_message = None if success else "Sample error message"
-
-            # Generate IP address
-            ip_address = f"192.168.1.{random.randint(1, 254)}"
-
-            # Create the event manually (since we want specific timestamps)
-            from apps.analytics.models import UserEvent
-            event = UserEvent.objects.create(
-                user=user,
-                event_type=event_type,
-                timestamp=random_time,
-                ip_address=ip_address,
-                user_agent="Mozilla/5.0 (Sample User Agent)",
-                resource_type=resource_type,
-                resource_id=resource_id,
-                metadata=metadata,
-                success=success,
-                error_message=error_message
-            )
+                    resource_type = 'room'
+                    resource_id = room_id
 
-            events_created += 1
+                elif event_type in BUILDING_EVENTS and buildings:
+                    # Also room events when there are no rooms yet
+                    building_id, building_name, location = rng.choice(buildings)
+                    metadata = {
+                        'building_id': building_id,
+                        'building_name': building_name,
+                        'location': location,
+                    }
+                    resource_type = 'building'
+                    resource_id = building_id
 
-            if events_created % 20 == 0:
+                elif event_type in REPORT_EVENTS:
+                    metadata = {
+                        'report_type': rng.choice(['user_activity', 'allocation_summary', 'building_utilization']),
+                        'filters': {'date_range': f'{days}_days'}
+                    }
+                    if event_type == EventType.REPORT_EXPORT:
+                        metadata['export_format'] = rng.choice(ReportExport.GENERATED_FORMATS)
+                    resource_type = 'report'
+
+                # Random success rate (95% success)
+                success = rng.random() < 0.95
+
+                batch.append(UserEvent(
+                    user_id=user_id,
+                    event_type=event_type,
+                    timestamp=timestamp,
+                    ip_address=f"192.168.{rng.randint(0, 3)}.{rng.randint(1, 254)}",
+                    user_agent="Mozilla/5.0 (Sample User Agent)",
+                    resource_type=resource_type,
+                    resource_id=resource_id,
+                    metadata=metadata,
+                    success=success,
+                    error_message=None if success else "Sample error message",
+                    **extract_indexed_fields(resource_type, resource_id, metadata),
+                ))
+
+            UserEvent.objects.bulk_create(batch, batch_size=batch_size)
+            events_created += size
+
+            if events_created % 100000 < batch_size or events_created == count:
                 self.stdout.write(f'Created {events_created} events...')
 
+        # Cached charts were computed before the backfill
+        invalidate_activity_charts()
+
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {events_created} sample events!')
         )
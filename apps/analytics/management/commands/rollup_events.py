@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+
+from apps.analytics.rollups import get_watermark, rollup_hourly_events
+
+
+class Command(BaseCommand):
+    help = 'Aggregate complete hours of analytics events into hourly rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-days',
+            type=int,
+            default=None,
+            help='Recompute rollups for the last N days instead of resuming from the watermark',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['rebuild_days'] is not None:
+            since = timezone.now() - timedelta(days=options['rebuild_days'])
+
+        self.stdout.write(f'Rolling up events from {since or get_watermark() or "the first event"}...')
+        written = rollup_hourly_events(since=since)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {written} rollup rows (covered until {get_watermark()})')
+        )
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from apps.analytics.sessions import get_watermark, sessionize_events
+
+
+class Command(BaseCommand):
+    help = 'Fold analytics events logged since the last run into user sessions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Discard stored sessions and replay the whole event history',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=int,
+            default=None,
+            help='Inactivity timeout in seconds (defaults to ANALYTICS_SESSION_TIMEOUT_SECONDS)',
+        )
+
+    def handle(self, *args, **options):
+        start = 'the first event' if options['rebuild'] else (get_watermark() or 'the first event')
+        self.stdout.write(f'Sessionizing events from {start}...')
+        processed = sessionize_events(timeout=options['timeout'], rebuild=options['rebuild'])
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Processed {processed} events (covered until {get_watermark()})')
+        )
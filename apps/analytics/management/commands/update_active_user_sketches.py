@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from datetime import timedelta
+
+from apps.analytics.sketches import get_watermark, update_active_user_sketches
+
+
+class Command(BaseCommand):
+    help = 'Fold recent analytics events into the daily active-user HyperLogLog sketches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-days',
+            type=int,
+            default=None,
+            help='Re-add the events of the last N days instead of resuming from the watermark',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['rebuild_days'] is not None:
+            since = timezone.now() - timedelta(days=options['rebuild_days'])
+
+        self.stdout.write(f'Updating sketches from {since or get_watermark() or "the first event"}...')
+        written = update_active_user_sketches(since=since)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Wrote {written} sketches (covered until {get_watermark()})')
+        )
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userevent',
+            name='event_type',
+            field=models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('password_change', 'Password Change'), ('profile_update', 'Profile Update'), ('allocation_create', 'Allocation Created'), ('allocation_update', 'Allocation Updated'), ('allocation_delete', 'Allocation Deleted'), ('allocation_request', 'Allocation Requested'), ('allocation_approve', 'Allocation Approved'), ('allocation_reject', 'Allocation Rejected'), ('booking_create', 'Booking Created'), ('booking_update', 'Booking Updated'), ('booking_cancel', 'Booking Cancelled'), ('booking_confirm', 'Booking Confirmed'), ('booking_payment', 'Booking Payment'), ('building_create', 'Building Created'), ('building_update', 'Building Updated'), ('building_delete', 'Building Deleted'), ('room_create', 'Room Created'), ('room_update', 'Room Updated'), ('room_delete', 'Room Deleted'), ('user_create', 'User Created'), ('user_update', 'User Updated'), ('user_delete', 'User Deleted'), ('user_activate', 'User Activated'), ('user_deactivate', 'User Deactivated'), ('service_unit_create', 'Service Unit Created'), ('service_unit_update', 'Service Unit Updated'), ('service_unit_delete', 'Service Unit Deleted'), ('report_generate', 'Report Generated'), ('report_export', 'Report Exported'), ('report_view', 'Report Viewed'), ('system_backup', 'System Backup'), ('system_maintenance', 'System Maintenance'), ('data_import', 'Data Import'), ('data_export', 'Data Export')], db_index=True, max_length=50),
+        ),
+        migrations.CreateModel(
+            name='UserEventHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(db_index=True)),
+                ('event_type', models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('password_change', 'Password Change'), ('profile_update', 'Profile Update'), ('allocation_create', 'Allocation Created'), ('allocation_update', 'Allocation Updated'), ('allocation_delete', 'Allocation Deleted'), ('allocation_request', 'Allocation Requested'), ('allocation_approve', 'Allocation Approved'), ('allocation_reject', 'Allocation Rejected'), ('booking_create', 'Booking Created'), ('booking_update', 'Booking Updated'), ('booking_cancel', 'Booking Cancelled'), ('booking_confirm', 'Booking Confirmed'), ('booking_payment', 'Booking Payment'), ('building_create', 'Building Created'), ('building_update', 'Building Updated'), ('building_delete', 'Building Deleted'), ('room_create', 'Room Created'), ('room_update', 'Room Updated'), ('room_delete', 'Room Deleted'), ('user_create', 'User Created'), ('user_update', 'User Updated'), ('user_delete', 'User Deleted'), ('user_activate', 'User Activated'), ('user_deactivate', 'User Deactivated'), ('service_unit_create', 'Service Unit Created'), ('service_unit_update', 'Service Unit Updated'), ('service_unit_delete', 'Service Unit Deleted'), ('report_generate', 'Report Generated'), ('report_export', 'Report Exported'), ('report_view', 'Report Viewed'), ('system_backup', 'System Backup'), ('system_maintenance', 'System Maintenance'), ('data_import', 'Data Import'), ('data_export', 'Data Export')], max_length=50)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('last_event_at', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='event_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'analytics_user_event_hourly',
+                'ordering': ['-hour'],
+                'indexes': [models.Index(fields=['user', 'hour'], name='analytics_u_user_id_3496d7_idx'), models.Index(fields=['hour', 'event_type'], name='analytics_u_hour_a4d6a0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('analytics', '0002_user_event_hourly_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, max_length=20)),
+                ('session_key', models.CharField(blank=True, max_length=40, null=True)),
+                ('started_at', models.DateTimeField(db_index=True)),
+                ('last_activity_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+                ('end_reason', models.CharField(blank=True, choices=[('logout', 'Logout'), ('timeout', 'Inactivity Timeout'), ('relogin', 'New Login')], max_length=10, null=True)),
+                ('duration_seconds', models.PositiveIntegerField(default=0)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('is_open', models.BooleanField(default=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'analytics_user_sessions',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['is_open', 'user'], name='analytics_u_is_open_528a3f_idx'), models.Index(fields=['started_at', 'role'], name='analytics_u_started_10a661_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_user_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActiveUserSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('dimension', models.CharField(choices=[('all', 'All Users'), ('role', 'Role'), ('service_unit', 'Service Unit')], max_length=20)),
+                ('value', models.CharField(blank=True, max_length=50)),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'analytics_active_user_sketches',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['dimension', 'date'], name='analytics_a_dimensi_97be38_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='activeusersketch',
+            constraint=models.UniqueConstraint(fields=('date', 'dimension', 'value'), name='uniq_active_user_sketch'),
+        ),
+    ]
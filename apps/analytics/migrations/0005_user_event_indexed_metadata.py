@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_active_user_sketch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userevent',
+            name='building_id',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userevent',
+            name='room_id',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userevent',
+            name='service_unit_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userevent',
+            name='target_user_id',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['service_unit_id', 'timestamp'], name='analytics_u_service_2deca6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userevent',
+            index=models.Index(fields=['target_user_id', 'timestamp'], name='analytics_u_target__1dd160_idx'),
+        ),
+    ]
@@ -90,6 +90,14 @@ class UserEvent(models.Model):
     # Metadata for storing additional event details
     metadata = models.JSONField(default=dict, blank=True)
     
+    # Frequently filtered metadata keys, copied out by EventLogger so feeds
+    # can use indexes instead of scanning the JSON (plain ids: events outlive
+    # the rows they mention)
+    service_unit_id = models.PositiveIntegerField(null=True, blank=True)
+    room_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    building_id = models.PositiveIntegerField(null=True, blank=True, db_index=True)
+    target_user_id = models.PositiveIntegerField(null=True, blank=True)
+    
     # Location information
     location = models.CharField(max_length=255, null=True, blank=True)
     
@@ -108,6 +116,8 @@ class UserEvent(models.Model):
             models.Index(fields=['timestamp', 'event_type']),
             models.Index(fields=['resource_type', 'resource_id']),
             models.Index(fields=['success']),
+            models.Index(fields=['service_unit_id', 'timestamp']),
+            models.Index(fields=['target_user_id', 'timestamp']),
         ]
     
     def __str__(self):
@@ -169,6 +179,10 @@ class ReportExport(models.Model):
         ('json', 'JSON'),
     )
     
+    # Formats the export job can write; PDF and Excel would need a document
+    # renderer this project does not ship
+    GENERATED_FORMATS = ('csv', 'json')
+    
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_exports')
     report_type = models.CharField(max_length=100)
     export_format = models.CharField(max_length=10, choices=EXPORT_FORMATS)
@@ -201,3 +215,116 @@ class ReportExport(models.Model):
     
     def __str__(self):
         return f"{self.report_type} - {self.export_format} by {self.user.username}"
+
+
+class UserEventHourlyRollup(models.Model):
+    """
+    Pre-aggregated event counts per hour, user and event type.
+
+    Built incrementally from UserEvent by ``apps.analytics.rollups`` so that
+    long-window analytics (e.g. 365 days) read a few thousand rows instead of
+    scanning the raw event table.
+    """
+    hour = models.DateTimeField(db_index=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='event_rollups'
+    )
+    event_type = models.CharField(max_length=50, choices=EventType.choices)
+    count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    last_event_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'analytics_user_event_hourly'
+        ordering = ['-hour']
+        indexes = [
+            models.Index(fields=['user', 'hour']),
+            models.Index(fields=['hour', 'event_type']),
+        ]
+    
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H}:00 {self.event_type} x{self.count}"
+
+
+class UserSession(models.Model):
+    """
+    A period of activity by one user, reconstructed from UserEvent.
+
+    Built incrementally by ``apps.analytics.sessions``: a session starts at a
+    LOGIN (or the first activity without an open session) and ends at the
+    matching LOGOUT, a new LOGIN, or after the inactivity timeout. The user's
+    role is copied onto the row so sessions can be grouped by role as it was
+    at the time.
+    """
+    END_REASONS = (
+        ('logout', 'Logout'),
+        ('timeout', 'Inactivity Timeout'),
+        ('relogin', 'New Login'),
+    )
+    
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity_sessions'
+    )
+    role = models.CharField(max_length=20, blank=True)
+    session_key = models.CharField(max_length=40, null=True, blank=True)
+    started_at = models.DateTimeField(db_index=True)
+    last_activity_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+    end_reason = models.CharField(max_length=10, choices=END_REASONS, null=True, blank=True)
+    duration_seconds = models.PositiveIntegerField(default=0)
+    event_count = models.PositiveIntegerField(default=0)
+    is_open = models.BooleanField(default=True)
+    
+    class Meta:
+        db_table = 'analytics_user_sessions'
+        ordering = ['-started_at']
+        indexes = [
+            models.Index(fields=['is_open', 'user']),
+            models.Index(fields=['started_at', 'role']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} session at {self.started_at} ({self.duration_seconds}s)"
+
+
+class ActiveUserSketch(models.Model):
+    """
+    HyperLogLog registers of the distinct users active on one day.
+
+    One row per day and dimension value (everyone, a role, or a service
+    unit). Rows for any date range can be unioned to estimate distinct active
+    users without scanning events; see ``apps.analytics.sketches``.
+    """
+    DIMENSIONS = (
+        ('all', 'All Users'),
+        ('role', 'Role'),
+        ('service_unit', 'Service Unit'),
+    )
+    
+    date = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSIONS)
+    value = models.CharField(max_length=50, blank=True)
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'analytics_active_user_sketches'
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'dimension', 'value'],
+                name='uniq_active_user_sketch'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} {self.dimension}={self.value or '*'}"
@@ -0,0 +1,187 @@
+"""
+Hourly rollups of UserEvent for long-window analytics.
+
+``rollup_hourly_events`` aggregates every complete hour since the last run
+into ``UserEventHourlyRollup`` rows (one per hour, user and event type) and
+advances a watermark stored in ``SystemSetting``. Readers combine the rollups
+below the watermark with raw events above it, so results stay exact while
+most of the window is served from the small rollup table.
+
+Events stamped below the watermark after it has passed (backfills such as
+``generate_sample_events``, imports, edited timestamps) are found through a
+second watermark on the event id: each run also rebuilds every hour touched
+by an event added since the previous run.
+"""
+
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from apps.core.models import SystemSetting
+from .models import UserEvent, UserEventHourlyRollup
+
+WATERMARK_KEY = 'analytics.hourly_rollup_watermark'
+EVENT_ID_KEY = 'analytics.hourly_rollup_event_id'
+
+# Leave a minute for requests still committing events stamped before the hour
+LAG = timedelta(minutes=1)
+
+# Past this many separate stale ranges, rebuild from the earliest one instead
+MAX_REBUILD_RANGES = 50
+
+
+def floor_hour(value):
+    """Truncate an aware datetime to the start of its hour."""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def get_watermark():
+    """Return the end (exclusive) of the range covered by rollups, or None."""
+    value = SystemSetting.get_setting(WATERMARK_KEY)
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def get_event_id_watermark():
+    """Return the highest event id seen by the previous run (0 before the first)."""
+    return int(SystemSetting.get_setting(EVENT_ID_KEY) or 0)
+
+
+def latest_event_id():
+    """Highest UserEvent id stored so far (0 when there are none)."""
+    return UserEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def stale_hour_ranges(after_id, up_to_id, before):
+    """
+    Hours before ``before`` that gained events with ids in ``(after_id, up_to_id]``.
+
+    Returns:
+        Sorted ``[start, end)`` ranges, adjacent hours merged
+    """
+    hours = (
+        UserEvent.objects
+        .filter(id__gt=after_id, id__lte=up_to_id, timestamp__lt=before)
+        .annotate(hour=TruncHour('timestamp'))
+        .values_list('hour', flat=True)
+        .distinct()
+        .order_by('hour')
+    )
+    ranges = []
+    for hour in hours:
+        if ranges and ranges[-1][1] == hour:
+            ranges[-1][1] = hour + timedelta(hours=1)
+        else:
+            ranges.append([hour, hour + timedelta(hours=1)])
+    return [tuple(bounds) for bounds in ranges]
+
+
+def rollup_hourly_events(until=None, since=None):
+    """
+    Aggregate complete hours of UserEvent into UserEventHourlyRollup.
+
+    Hours below the watermark that received events since the previous run
+    are rebuilt along with the new ones.
+
+    Args:
+        until: Stop at this time (defaults to the start of the current hour,
+            or of the previous one during the first minute of an hour)
+        since: Rebuild from this time instead of the stored watermark
+
+    Returns:
+        Number of rollup rows written
+    """
+    until = floor_hour(until or timezone.now() - LAG)
+    start = since or get_watermark()
+    # Read before the events so rows committed meanwhile are checked next run
+    last_id = get_event_id_watermark()
+    max_id = latest_event_id()
+
+    if start is None:
+        first = UserEvent.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if first is None:
+            return 0
+        start = first
+    start = floor_hour(start)
+
+    ranges = stale_hour_ranges(last_id, max_id, start)
+    if len(ranges) > MAX_REBUILD_RANGES:
+        start, ranges = ranges[0][0], []
+    if start < until:
+        ranges.append((start, until))
+    if not ranges:
+        return 0
+
+    in_ranges = Q()
+    rollups_in_ranges = Q()
+    for range_start, range_end in ranges:
+        in_ranges |= Q(timestamp__gte=range_start, timestamp__lt=range_end)
+        rollups_in_ranges |= Q(hour__gte=range_start, hour__lt=range_end)
+
+    buckets = (
+        UserEvent.objects
+        .filter(in_ranges)
+        .annotate(hour=TruncHour('timestamp'))
+        .values('hour', 'user_id', 'event_type')
+        .annotate(
+            count=Count('id'),
+            failed_count=Count('id', filter=Q(success=False)),
+            last_event_at=Max('timestamp'),
+        )
+        .order_by()
+    )
+
+    rows = [
+        UserEventHourlyRollup(
+            hour=bucket['hour'],
+            user_id=bucket['user_id'],
+            event_type=bucket['event_type'],
+            count=bucket['count'],
+            failed_count=bucket['failed_count'],
+            last_event_at=bucket['last_event_at'],
+        )
+        for bucket in buckets.iterator()
+    ]
+
+    with transaction.atomic():
+        # Re-running over a range replaces it, so rebuilds are idempotent
+        UserEventHourlyRollup.objects.filter(rollups_in_ranges).delete()
+        UserEventHourlyRollup.objects.bulk_create(rows, batch_size=1000)
+        if start < until:
+            SystemSetting.set_setting(
+                WATERMARK_KEY,
+                until.isoformat(),
+                'End (exclusive) of the range covered by hourly event rollups',
+            )
+        SystemSetting.set_setting(
+            EVENT_ID_KEY,
+            str(max_id),
+            'Highest event id checked for late events by the hourly rollup',
+        )
+
+    return len(rows)
+
+
+def rollup_coverage(start):
+    """
+    Split a window beginning at ``start`` into rollup and raw-event parts.
+
+    Returns:
+        ``(rollup_end, raw_start)``: rollups cover ``[start, rollup_end)`` and
+        raw events must be read from ``raw_start`` onwards. ``rollup_end`` is
+        None when no rollups cover any part of the window.
+    """
+    watermark = get_watermark()
+    if watermark is None or watermark <= start:
+        return None, start
+    return watermark, watermark
+
+
+def window_start(days):
+    """Aware datetime for midnight ``days`` days ago in the current time zone."""
+    start_date = timezone.localdate() - timedelta(days=days)
+    return timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
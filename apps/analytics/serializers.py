@@ -140,7 +140,7 @@ class ReportExportCreateSerializer(serializers.ModelSerializer):
     
     def validate_export_format(self, value):
         """Validate export format"""
-        valid_formats = ['pdf', 'csv', 'excel', 'json']
+        valid_formats = ReportExport.GENERATED_FORMATS
         if value not in valid_formats:
             raise serializers.ValidationError(f"Invalid format. Must be one of: {', '.join(valid_formats)}")
         return value
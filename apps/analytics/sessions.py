@@ -0,0 +1,298 @@
+"""
+Sessionization of UserEvent into UserSession rows.
+
+``sessionize_events`` replays events in timestamp order from a watermark
+stored in ``SystemSetting``. Events are grouped per user and ``session_key``
+(events without a key join the user's most recently active session):
+
+* LOGIN starts a new session, closing any open one for the same key
+* LOGOUT closes the session at the logout time
+* any other event extends the open session, or starts one if there is none
+  (access tokens outlive the login that issued them)
+* a gap longer than the inactivity timeout closes the session at its last
+  activity
+
+Sessions still open when a run ends are stored with ``is_open=True`` and
+resumed by the next run, so each event is read exactly once.
+
+Events added since the previous run but stamped below the watermark (a
+backfill, an import) are found through a second watermark on the event id.
+Only their users are re-sessionized: from the earliest point such an event
+could reach (see ``replay_starts``), their sessions are dropped and their
+events replayed alongside the new ones.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Min, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.core.models import SystemSetting
+from .models import EventType, UserEvent, UserSession
+from .rollups import latest_event_id
+
+WATERMARK_KEY = 'analytics.sessionizer_watermark'
+EVENT_ID_KEY = 'analytics.sessionizer_event_id'
+
+# Users whose sessions are dropped per DELETE when replaying late events
+REPLAY_DELETE_BATCH = 500
+
+SESSION_UPDATE_FIELDS = [
+    'last_activity_at', 'ended_at', 'end_reason',
+    'duration_seconds', 'event_count', 'is_open',
+]
+
+
+def get_watermark():
+    """Return the end (exclusive) of the event range already sessionized, or None."""
+    value = SystemSetting.get_setting(WATERMARK_KEY)
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def get_event_id_watermark():
+    """Return the highest event id seen by the previous run (0 before the first)."""
+    return int(SystemSetting.get_setting(EVENT_ID_KEY) or 0)
+
+
+def late_event_starts(after_id, up_to_id, before):
+    """
+    Earliest timestamp per user among the events with ids in
+    ``(after_id, up_to_id]`` stamped before ``before``.
+    """
+    return dict(
+        UserEvent.objects
+        .filter(id__gt=after_id, id__lte=up_to_id, timestamp__lt=before, user__isnull=False)
+        .values('user_id')
+        .annotate(first=Min('timestamp'))
+        .values_list('user_id', 'first')
+    )
+
+
+def replay_starts(late, timeout):
+    """
+    Where to restart each user of ``late`` (user id -> earliest late event).
+
+    A late event can extend or merge any session active within ``timeout``
+    before it, and replaying from inside a session would split it, so the
+    start moves back to the first session reaching it until none does. Every
+    session of the user ending at or after the returned time starts there
+    too, so dropping those and replaying the user's events from that time
+    rebuilds them; earlier sessions are untouched.
+    """
+    starts = {user_id: timestamp - timeout for user_id, timestamp in late.items()}
+    fetched_from = None
+    while fetched_from is None or min(starts.values()) < fetched_from:
+        fetched_from = min(starts.values())
+        spans = defaultdict(list)
+        rows = UserSession.objects.filter(
+            user_id__in=list(starts), last_activity_at__gte=fetched_from,
+        ).values_list('user_id', 'started_at', 'last_activity_at')
+        for user_id, started_at, last_activity_at in rows:
+            spans[user_id].append((started_at, last_activity_at))
+        for user_id, user_spans in spans.items():
+            start = starts[user_id]
+            while True:
+                reach = min((began for began, last in user_spans if last >= start), default=start)
+                if reach >= start:
+                    break
+                start = reach
+            starts[user_id] = start
+    return starts
+
+
+def sessionize_events(until=None, timeout=None, rebuild=False):
+    """
+    Extend UserSession with the events logged since the last run.
+
+    Args:
+        until: Process events before this time (defaults to a minute ago)
+        timeout: Inactivity timeout in seconds (defaults to
+            ``ANALYTICS_SESSION_TIMEOUT_SECONDS``)
+        rebuild: Drop every stored session and replay the whole event history
+
+    Returns:
+        Number of events processed
+    """
+    # Leave a minute for requests still committing events stamped just before now
+    until = until or timezone.now() - timedelta(minutes=1)
+    timeout = timedelta(seconds=timeout or settings.ANALYTICS_SESSION_TIMEOUT_SECONDS)
+
+    # Read before the events so rows committed meanwhile are checked next run
+    last_id = get_event_id_watermark()
+    max_id = latest_event_id()
+
+    start = None if rebuild else get_watermark()
+    replay_from = {}
+    if start is not None:
+        late = late_event_starts(last_id, max_id, start)
+        if late:
+            replay_from = replay_starts(late, timeout)
+
+    if start is None:
+        start = UserEvent.objects.order_by('timestamp').values_list('timestamp', flat=True).first()
+        if start is None:
+            return 0
+
+    if start >= until and not replay_from:
+        return 0
+
+    open_sessions = {}
+    latest_by_user = {}
+    resumed = UserSession.objects.none() if rebuild else UserSession.objects.filter(is_open=True)
+    # Replayed users start over without state; their open sessions are rebuilt
+    resumed = resumed.exclude(user_id__in=list(replay_from))
+    for session in resumed.order_by('last_activity_at'):
+        open_sessions[(session.user_id, session.session_key)] = session
+        latest_by_user[session.user_id] = session
+
+    created = []
+    changed = {}
+
+    def close(session, at, reason):
+        session.ended_at = at
+        session.end_reason = reason
+        session.is_open = False
+        open_sessions.pop((session.user_id, session.session_key), None)
+        if latest_by_user.get(session.user_id) is session:
+            del latest_by_user[session.user_id]
+        if session.pk:
+            changed[session.pk] = session
+
+    in_range = Q(timestamp__gte=start)
+    if replay_from:
+        in_range |= Q(user_id__in=list(replay_from), timestamp__gte=min(replay_from.values()))
+    events = (
+        UserEvent.objects
+        .filter(in_range, timestamp__lt=until, user__isnull=False)
+        .order_by('timestamp', 'id')
+        .values_list('user_id', 'user__role', 'event_type', 'timestamp', 'session_key')
+        .iterator(chunk_size=5000)
+    )
+
+    processed = 0
+    for user_id, role, event_type, timestamp, session_key in events:
+        if timestamp < start and timestamp < replay_from.get(user_id, start):
+            continue
+        processed += 1
+        if session_key:
+            session = open_sessions.get((user_id, session_key))
+        else:
+            session = latest_by_user.get(user_id)
+
+        if session is not None and timestamp - session.last_activity_at > timeout:
+            close(session, session.last_activity_at, 'timeout')
+            session = None
+
+        if event_type == EventType.LOGIN:
+            if session is not None:
+                close(session, session.last_activity_at, 'relogin')
+            session = None
+        elif event_type == EventType.LOGOUT and session is None:
+            # Logout without a known session carries no duration
+            continue
+
+        if session is None:
+            session = UserSession(
+                user_id=user_id,
+                role=role or '',
+                session_key=session_key or None,
+                started_at=timestamp,
+                last_activity_at=timestamp,
+            )
+            created.append(session)
+            open_sessions[(user_id, session.session_key)] = session
+
+        session.last_activity_at = timestamp
+        session.event_count += 1
+        latest_by_user[user_id] = session
+        if session.pk:
+            changed[session.pk] = session
+
+        if event_type == EventType.LOGOUT:
+            close(session, timestamp, 'logout')
+
+    for session in list(open_sessions.values()):
+        if until - session.last_activity_at > timeout:
+            close(session, session.last_activity_at, 'timeout')
+
+    for session in created + list(changed.values()):
+        end = session.ended_at or session.last_activity_at
+        session.duration_seconds = int((end - session.started_at).total_seconds())
+
+    with transaction.atomic():
+        if rebuild:
+            UserSession.objects.all().delete()
+        replayed = list(replay_from.items())
+        for offset in range(0, len(replayed), REPLAY_DELETE_BATCH):
+            UserSession.objects.filter(reduce(or_, (
+                Q(user_id=user_id, last_activity_at__gte=replay_start)
+                for user_id, replay_start in replayed[offset:offset + REPLAY_DELETE_BATCH]
+            ))).delete()
+        UserSession.objects.bulk_create(created, batch_size=1000)
+        UserSession.objects.bulk_update(list(changed.values()), SESSION_UPDATE_FIELDS, batch_size=1000)
+        SystemSetting.set_setting(
+            WATERMARK_KEY,
+            until.isoformat(),
+            'End (exclusive) of the event range folded into user sessions',
+        )
+        SystemSetting.set_setting(
+            EVENT_ID_KEY,
+            str(max_id),
+            'Highest event id checked for late events by the sessionizer',
+        )
+
+    return processed
+
+
+def average_session_duration(start):
+    """Average length in seconds of the completed sessions started since ``start``."""
+    average = (
+        UserSession.objects
+        .filter(started_at__gte=start, is_open=False)
+        .aggregate(average=Avg('duration_seconds'))['average']
+    )
+    return round(average or 0.0, 1)
+
+
+def session_breakdown(start):
+    """
+    Completed sessions started since ``start``, grouped by day and role.
+
+    Returns:
+        ``{'by_day': [...], 'by_role': [...]}`` where each row carries
+        ``sessions`` and ``average_duration`` (seconds)
+    """
+    completed = UserSession.objects.filter(started_at__gte=start, is_open=False)
+
+    by_day = (
+        completed
+        .annotate(date=TruncDate('started_at'))
+        .values('date', 'role')
+        .annotate(sessions=Count('id'), average_duration=Avg('duration_seconds'))
+        .order_by('date', 'role')
+    )
+    by_role = (
+        completed
+        .values('role')
+        .annotate(sessions=Count('id'), average_duration=Avg('duration_seconds'))
+        .order_by('role')
+    )
+
+    return {
+        'by_day': [
+            {**row, 'date': row['date'].isoformat(), 'average_duration': round(row['average_duration'], 1)}
+            for row in by_day
+        ],
+        'by_role': [
+            {**row, 'average_duration': round(row['average_duration'], 1)}
+            for row in by_role
+        ],
+    }
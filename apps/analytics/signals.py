@@ -2,15 +2,27 @@ from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 from apps.allocations.models import RoomAllocation, AllocationRequest
 from apps.buildings.models import Building, Room
 from apps.service_units.models import ServiceUnit
+from .models import UserEvent
 from .utils import EventLogger, EventType
 
 User = get_user_model()
 
 
+@receiver(post_save, sender=UserEvent)
+@receiver(post_delete, sender=UserEvent)
+def invalidate_charts_for_past_events(sender, instance, created=False, **kwargs):
+    """Events logged now only move today's buckets; anything else drops cached charts"""
+    if created and timezone.localdate(instance.timestamp) >= timezone.localdate():
+        return
+    from .views import invalidate_activity_charts
+    invalidate_activity_charts()
+
+
 @receiver(user_logged_in)
 def log_user_login(sender, request, user, **kwargs):
     """Log user login events"""
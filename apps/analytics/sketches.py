@@ -0,0 +1,247 @@
+"""
+Approximate distinct active users (DAU/WAU/MAU) with HyperLogLog sketches.
+
+``update_active_user_sketches`` folds new events into one ``ActiveUserSketch``
+per day and dimension value (everyone, each role, each service unit). Adding a
+user to a sketch is idempotent, so runs may overlap the previous range freely
+and late-committed events are still picked up; events added since the
+previous run are folded in whatever their timestamp, which covers backfills
+stamped far below the watermark. Readers union the daily
+registers of any date range; the union of sketches is exactly the sketch of
+the union, so weekly and monthly counts carry the same error as daily ones.
+
+Error bounds (precision 14, i.e. 16384 registers):
+
+* the relative standard error is 1.04 / sqrt(16384) ~= 0.81%, so about 95% of
+  estimates fall within +/-1.6% of the true count and 99.7% within +/-2.4%
+* below ~40k users the estimator switches to linear counting, which is
+  practically exact for the few hundred to few thousand users a day this
+  portal sees (errors come only from hash collisions between registers)
+
+Sketches of small sets are stored sparsely (3 bytes per non-empty register)
+and switch to the dense 16 KiB form once that is smaller.
+"""
+
+import hashlib
+import math
+import struct
+from datetime import datetime, timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.core.models import SystemSetting
+from .models import ActiveUserSketch, UserEvent
+from .rollups import latest_event_id
+
+PRECISION = 14
+REGISTER_COUNT = 1 << PRECISION
+RELATIVE_ERROR = 1.04 / math.sqrt(REGISTER_COUNT)
+
+WATERMARK_KEY = 'analytics.active_user_sketch_watermark'
+EVENT_ID_KEY = 'analytics.active_user_sketch_event_id'
+
+# Re-read this much before the watermark on every run to catch events that
+# were committed after a previous run but stamped before it
+OVERLAP = timedelta(minutes=5)
+
+_INDEX_SHIFT = 64 - PRECISION
+_RANK_MASK = (1 << _INDEX_SHIFT) - 1
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTER_COUNT)
+
+
+class HyperLogLog:
+    """Mergeable HyperLogLog sketch holding only its non-empty registers."""
+
+    __slots__ = ('registers',)
+
+    def __init__(self, registers=None):
+        self.registers = registers if registers is not None else {}
+
+    def add(self, item):
+        digest = hashlib.blake2b(str(item).encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'big')
+        index = value >> _INDEX_SHIFT
+        rank = _INDEX_SHIFT - (value & _RANK_MASK).bit_length() + 1
+        if rank > self.registers.get(index, 0):
+            self.registers[index] = rank
+
+    def update(self, other):
+        """Union ``other`` into this sketch."""
+        registers = self.registers
+        for index, rank in other.registers.items():
+            if rank > registers.get(index, 0):
+                registers[index] = rank
+        return self
+
+    def estimate(self):
+        registers = self.registers
+        if not registers:
+            return 0
+        zeros = REGISTER_COUNT - len(registers)
+        harmonic = zeros + sum(2.0 ** -rank for rank in registers.values())
+        estimate = _ALPHA * REGISTER_COUNT * REGISTER_COUNT / harmonic
+        if estimate <= 2.5 * REGISTER_COUNT and zeros:
+            estimate = REGISTER_COUNT * math.log(REGISTER_COUNT / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        registers = self.registers
+        if len(registers) * 3 < REGISTER_COUNT:
+            indexes = sorted(registers)
+            return (
+                b'S'
+                + struct.pack(f'<{len(indexes)}H', *indexes)
+                + bytes(registers[index] for index in indexes)
+            )
+        dense = bytearray(REGISTER_COUNT)
+        for index, rank in registers.items():
+            dense[index] = rank
+        return b'D' + bytes(dense)
+
+    @classmethod
+    def from_bytes(cls, data):
+        data = bytes(data)
+        if not data:
+            return cls()
+        if data[:1] == b'D':
+            return cls({index: rank for index, rank in enumerate(data[1:]) if rank})
+        count = (len(data) - 1) // 3
+        indexes = struct.unpack_from(f'<{count}H', data, 1)
+        return cls(dict(zip(indexes, data[1 + 2 * count:])))
+
+
+def get_watermark():
+    """Return the time up to which events have been folded into sketches, or None."""
+    value = SystemSetting.get_setting(WATERMARK_KEY)
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+
+def get_event_id_watermark():
+    """Return the highest event id folded in by the previous run (0 before the first)."""
+    return int(SystemSetting.get_setting(EVENT_ID_KEY) or 0)
+
+
+def update_active_user_sketches(until=None, since=None):
+    """
+    Add the users active since the last run to the daily sketches.
+
+    Args:
+        until: Fold events before this time (defaults to now)
+        since: Start from this time instead of the stored watermark
+
+    Returns:
+        Number of sketches written
+    """
+    until = until or timezone.now()
+    start = since or get_watermark()
+    last_id = get_event_id_watermark()
+    max_id = latest_event_id()
+    events = UserEvent.objects.filter(timestamp__lt=until, user__isnull=False)
+    if start is not None:
+        events = events.filter(Q(timestamp__gte=start - OVERLAP) | Q(id__gt=last_id, id__lte=max_id))
+
+    # One row per (day, user): the sketches only need distinct users
+    active = (
+        events
+        .annotate(date=TruncDate('timestamp'))
+        .values_list('date', 'user_id', 'user__role', 'user__service_unit_id')
+        .distinct()
+        .order_by()
+    )
+
+    sketches = {}
+    for date, user_id, role, service_unit_id in active.iterator(chunk_size=5000):
+        keys = [(date, 'all', '')]
+        if role:
+            keys.append((date, 'role', role))
+        if service_unit_id:
+            keys.append((date, 'service_unit', str(service_unit_id)))
+        for key in keys:
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketch = sketches[key] = HyperLogLog()
+            sketch.add(user_id)
+
+    with transaction.atomic():
+        dates = {date for date, _, _ in sketches}
+        stored = ActiveUserSketch.objects.select_for_update().filter(date__in=dates)
+        for row in stored:
+            sketch = sketches.get((row.date, row.dimension, row.value))
+            if sketch is not None:
+                sketch.update(HyperLogLog.from_bytes(row.registers))
+
+        ActiveUserSketch.objects.bulk_create(
+            [
+                ActiveUserSketch(date=date, dimension=dimension, value=value, registers=sketch.to_bytes())
+                for (date, dimension, value), sketch in sketches.items()
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['date', 'dimension', 'value'],
+            update_fields=['registers', 'updated_at'],
+        )
+        SystemSetting.set_setting(
+            WATERMARK_KEY,
+            until.isoformat(),
+            'End (exclusive) of the event range folded into active user sketches',
+        )
+        SystemSetting.set_setting(
+            EVENT_ID_KEY,
+            str(max_id),
+            'Highest event id folded into active user sketches',
+        )
+
+    return len(sketches)
+
+
+def active_user_windows(windows=(1, 7, 30), end_date=None, dimension=None):
+    """
+    Estimate distinct active users over trailing windows ending ``end_date``.
+
+    Reads every sketch of the longest window in one query and unions the days
+    newest first, so the shorter windows come for free.
+
+    Returns:
+        ``{(dimension, value): {days: estimate, ...}}``
+    """
+    end_date = end_date or timezone.localdate()
+    longest = max(windows)
+    rows = ActiveUserSketch.objects.filter(
+        date__gt=end_date - timedelta(days=longest),
+        date__lte=end_date,
+    )
+    if dimension:
+        rows = rows.filter(dimension=dimension)
+
+    by_key = {}
+    for date, row_dimension, value, registers in rows.values_list('date', 'dimension', 'value', 'registers'):
+        by_key.setdefault((row_dimension, value), {})[date] = registers
+
+    results = {}
+    for key, days in by_key.items():
+        union = HyperLogLog()
+        estimates = {}
+        for offset in range(longest):
+            registers = days.get(end_date - timedelta(days=offset))
+            if registers is not None:
+                union.update(HyperLogLog.from_bytes(registers))
+            if offset + 1 in windows:
+                estimates[offset + 1] = union.estimate()
+        results[key] = estimates
+    return results
+
+
+def estimate_active_users(start_date, end_date, dimension='all', value=''):
+    """Estimated distinct users active between two dates (inclusive)."""
+    union = HyperLogLog()
+    registers = ActiveUserSketch.objects.filter(
+        date__gte=start_date, date__lte=end_date, dimension=dimension, value=value,
+    ).values_list('registers', flat=True)
+    for data in registers:
+        union.update(HyperLogLog.from_bytes(data))
+    return union.estimate()
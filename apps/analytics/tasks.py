@@ -0,0 +1,111 @@
+"""
+Background job handlers for the analytics app.
+Executed by the ``process_jobs`` worker (see apps/core/jobs.py).
+"""
+
+import csv
+import json
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.jobs import PermanentJobError, register_job
+from .models import ReportExport, UserEvent
+from .rollups import rollup_hourly_events
+from .sessions import sessionize_events
+from .sketches import update_active_user_sketches
+
+EXPORT_DIR = 'exports'
+
+EXPORT_FIELDS = [
+    'id', 'timestamp', 'event_type', 'user_id', 'user__username',
+    'resource_type', 'resource_id', 'success', 'ip_address',
+]
+
+
+def _mark_export_failed(job, exc):
+    """Reflect a permanently failed export job on its ReportExport row."""
+    ReportExport.objects.filter(id=job.payload.get('export_id')).update(status='failed')
+
+
+@register_job('analytics.generate_report_export', on_failure=_mark_export_failed)
+def generate_report_export(job, export_id):
+    """Write the event rows selected by a ReportExport to MEDIA_ROOT/exports/."""
+    try:
+        export = ReportExport.objects.get(id=export_id)
+    except ReportExport.DoesNotExist:
+        raise PermanentJobError(f"ReportExport {export_id} no longer exists")
+
+    if export.export_format not in ReportExport.GENERATED_FORMATS:
+        # Requested before the format was withdrawn
+        raise PermanentJobError(f"Cannot generate {export.export_format} exports")
+
+    export.status = 'processing'
+    export.save(update_fields=['status'])
+
+    queryset = UserEvent.objects.all()
+    if export.date_from:
+        queryset = queryset.filter(timestamp__date__gte=export.date_from)
+    if export.date_to:
+        queryset = queryset.filter(timestamp__date__lte=export.date_to)
+
+    filters = export.filters or {}
+    if filters.get('event_types'):
+        queryset = queryset.filter(event_type__in=filters['event_types'])
+    if filters.get('resource_types'):
+        queryset = queryset.filter(resource_type__in=filters['resource_types'])
+
+    rows = queryset.order_by('timestamp').values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+
+    directory = os.path.join(settings.MEDIA_ROOT, EXPORT_DIR)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, export.file_name)
+
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        if export.export_format == 'json':
+            handle.write('[')
+            for row in rows:
+                record = dict(zip(EXPORT_FIELDS, row))
+                record['timestamp'] = record['timestamp'].isoformat()
+                handle.write((',' if count else '') + json.dumps(record))
+                count += 1
+            handle.write(']')
+        else:
+            writer = csv.writer(handle)
+            writer.writerow(EXPORT_FIELDS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+                if count % 10000 == 0:
+                    job.set_progress(rows_written=count)
+
+    export.status = 'completed'
+    export.file_size = os.path.getsize(path)
+    export.completed_at = timezone.now()
+    export.save(update_fields=['status', 'file_size', 'completed_at'])
+
+    return {'rows': count, 'file_size': export.file_size}
+
+
+@register_job('analytics.rollup_hourly_events')
+def rollup_hourly_events_job(job, rebuild_days=None):
+    """Advance the hourly event rollups (schedule hourly via cron or enqueue)."""
+    since = None
+    if rebuild_days is not None:
+        since = timezone.now() - timedelta(days=rebuild_days)
+    return {'rows': rollup_hourly_events(since=since)}
+
+
+@register_job('analytics.sessionize_events')
+def sessionize_events_job(job, rebuild=False):
+    """Fold new events into user sessions (schedule every few minutes)."""
+    return {'events': sessionize_events(rebuild=rebuild)}
+
+
+@register_job('analytics.update_active_user_sketches')
+def update_active_user_sketches_job(job):
+    """Fold new events into the daily active-user sketches (schedule every few minutes)."""
+    return {'sketches': update_active_user_sketches()}
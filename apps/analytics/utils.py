@@ -1,11 +1,36 @@
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from .models import UserEvent, EventType
+from collections import defaultdict
+from contextlib import contextmanager
 import logging
+import threading
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Events being collapsed by aggregate_events() on this thread
+_aggregation = threading.local()
+
+# Resource ids kept in an aggregated event's metadata
+AGGREGATED_RESOURCE_IDS_LIMIT = 1000
+
+# UserEvent column filled from the event's own resource
+RESOURCE_COLUMNS = {
+    'service_unit': 'service_unit_id',
+    'room': 'room_id',
+    'building': 'building_id',
+    'user': 'target_user_id',
+}
+
+# Metadata key (top level or one nested section deep) -> UserEvent column
+METADATA_COLUMNS = {
+    'service_unit_id': 'service_unit_id',
+    'room_id': 'room_id',
+    'building_id': 'building_id',
+    'user_id': 'target_user_id',
+}
+
 
 class EventLogger:
     """
@@ -36,6 +61,16 @@ class EventLogger:
             error_message: Error message if event failed
             **metadata: Additional metadata to store
         """
+        buffer = getattr(_aggregation, 'buffer', None)
+        if buffer is not None:
+            entry = buffer[event_type]
+            entry['resource_type'] = entry.get('resource_type') or resource_type
+            entry['count'] = entry.get('count', 0) + 1
+            ids = entry.setdefault('resource_ids', [])
+            if resource_id is not None and len(ids) < AGGREGATED_RESOURCE_IDS_LIMIT:
+                ids.append(resource_id)
+            return None
+        
         try:
             event_data = {
                 'event_type': event_type,
@@ -45,6 +80,7 @@ class EventLogger:
                 'resource_type': resource_type,
                 'resource_id': resource_id,
                 'metadata': metadata,
+                **extract_indexed_fields(resource_type, resource_id, metadata),
             }
             
             if request:
@@ -178,6 +214,67 @@ class EventLogger:
         )
 
 
+@contextmanager
+def aggregate_events(user=None, request=None, **metadata):
+    """
+    Collapse the events logged inside the block into one event per type.
+
+    Bulk operations fire a signal, and so an event, per affected row. Inside
+    this block events are only counted; on exit one event per event type is
+    logged for ``user`` with ``aggregated={'count', 'resource_ids'}`` plus
+    ``metadata``. Nested blocks fold into the outermost one.
+    """
+    if getattr(_aggregation, 'buffer', None) is not None:
+        yield
+        return
+    
+    _aggregation.buffer = defaultdict(dict)
+    try:
+        yield
+    finally:
+        buffer, _aggregation.buffer = _aggregation.buffer, None
+        for event_type, entry in buffer.items():
+            EventLogger.log_event(
+                event_type=event_type,
+                user=user,
+                request=request,
+                resource_type=entry['resource_type'],
+                aggregated={'count': entry['count'], 'resource_ids': entry['resource_ids']},
+                **metadata
+            )
+
+
+def extract_indexed_fields(resource_type, resource_id, metadata):
+    """
+    Pick the ids that activity feeds filter on out of an event.
+
+    The event's own resource wins; otherwise ids are read from the metadata,
+    either at the top level or inside one nested section such as
+    ``allocation_details`` or ``target_user``.
+
+    Returns:
+        Dict of UserEvent column name -> id, only for the ids found
+    """
+    fields = {}
+    column = RESOURCE_COLUMNS.get(resource_type)
+    if column and resource_id is not None:
+        fields[column] = resource_id
+    
+    metadata = metadata or {}
+    sections = [metadata] + [value for value in metadata.values() if isinstance(value, dict)]
+    for section in sections:
+        for key, column in METADATA_COLUMNS.items():
+            value = section.get(key)
+            if column not in fields and isinstance(value, int) and value > 0:
+                fields[column] = value
+    
+    target_user = metadata.get('target_user')
+    if isinstance(target_user, dict) and isinstance(target_user.get('id'), int):
+        fields.setdefault('target_user_id', target_user['id'])
+    
+    return fields
+
+
 def get_client_ip(request):
     """Extract client IP address from request"""
     x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
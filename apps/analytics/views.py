@@ -1,14 +1,22 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q, Avg, Sum, Max, Min
+from django.db.models import Count, F, Q, Avg, Sum, Max, Min
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.functions import Coalesce, ExtractHour, TruncDate
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 from datetime import datetime, timedelta
 from collections import defaultdict
 import json
 
-from .models import UserEvent, DashboardMetrics, ReportExport, EventType
+from .models import UserEvent, UserEventHourlyRollup, DashboardMetrics, ReportExport, EventType
+from .rollups import rollup_coverage, window_start
+from .sessions import average_session_duration, session_breakdown
+from .sketches import RELATIVE_ERROR, active_user_windows
+from apps.core.cache import bump_version, versioned_key
+from apps.core.snapshots import get_snapshot, wants_fresh
 from .serializers import (
     UserEventSerializer, EventSummarySerializer, DashboardMetricsSerializer,
     ActivityChartDataSerializer, UserActivitySerializer, ReportExportSerializer,
@@ -16,28 +24,30 @@ from .serializers import (
     ExportFormatChoiceSerializer
 )
 from .utils import EventLogger
+from apps.core.jobs import enqueue
+from apps.core.permissions import role_permission
 
 User = get_user_model()
 
+CHART_CACHE_NAMESPACE = 'analytics:charts'
+
+# Longest span, in days, an activity chart may cover
+ACTIVITY_CHART_MAX_DAYS = 366
+
+BOOKING_EVENT_TYPES = [
+    'booking_create', 'booking_update', 'booking_cancel', 'booking_confirm', 'booking_payment',
+]
 
-class IsSuperAdminOrServiceUnitAdmin(permissions.BasePermission):
-    """
-    Custom permission to only allow SuperAdmins and ServiceUnitAdmins.
-    """
-    
-    def has_permission(self, request, view):
-        return (
-            request.user and 
-            request.user.is_authenticated and 
-            request.user.role in ['SuperAdmin', 'ServiceUnitAdmin']
-        )
+
+# Analytics are SuperAdmin only (see apps.core.permissions.RULES)
+CanViewAnalytics = role_permission('analytics', 'view')
 
 
 class AnalyticsViewSet(viewsets.GenericViewSet):
     """
     ViewSet for analytics and reporting functionality
     """
-    permission_classes = [permissions.IsAuthenticated, IsSuperAdminOrServiceUnitAdmin]
+    permission_classes = [permissions.IsAuthenticated, CanViewAnalytics]
     
     def get_queryset(self):
         return UserEvent.objects.all()
@@ -88,271 +98,10 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
     
     @action(detail=False, methods=['get'])
     def dashboard_overview(self, request):
-        """Get dashboard overview data"""
+        """Get dashboard overview data (last snapshot; ``?fresh=1`` recomputes for SuperAdmins)"""
         try:
-            today = timezone.now().date()
-            week_ago = today - timedelta(days=7)
-            month_ago = today - timedelta(days=30)
-            
-            # Get basic counts
-            total_events = UserEvent.objects.count()
-            events_today = UserEvent.objects.filter(timestamp__date=today).count()
-            events_this_week = UserEvent.objects.filter(timestamp__date__gte=week_ago).count()
-            events_this_month = UserEvent.objects.filter(timestamp__date__gte=month_ago).count()
-            
-            # Error rate
-            total_with_status = UserEvent.objects.filter(success__isnull=False).count()
-            failed_events = UserEvent.objects.filter(success=False).count()
-            error_rate = (failed_events / total_with_status * 100) if total_with_status > 0 else 0
-            
-            # Most active users (last 30 days)
-            most_active_users = (
-                UserEvent.objects
-                .filter(timestamp__date__gte=month_ago, user__isnull=False)
-                .values('user__username', 'user__first_name', 'user__last_name')
-                .annotate(event_count=Count('id'))
-                .order_by('-event_count')[:5]
-            )
-            
-            # Most common events (last 30 days)
-            most_common_events = (
-                UserEvent.objects
-                .filter(timestamp__date__gte=month_ago)
-                .values('event_type')
-                .annotate(count=Count('id'))
-                .order_by('-count')[:5]
-            )
-            
-            # Add display names for events
-            for event in most_common_events:
-                for choice in EventType.choices:
-                    if choice[0] == event['event_type']:
-                        event['event_type_display'] = choice[1]
-                        break
-            
-            # Peak activity hours (last 7 days)
-            peak_hours = []
-            for hour in range(24):
-                hour_count = (
-                    UserEvent.objects
-                    .filter(
-                        timestamp__date__gte=week_ago,
-                        timestamp__hour=hour
-                    )
-                    .count()
-                )
-                peak_hours.append({
-                    'hour': f"{hour:02d}:00",
-                    'count': hour_count
-                })
-            
-            # Sort by count and get top 5
-            peak_hours = sorted(peak_hours, key=lambda x: x['count'], reverse=True)[:5]
-            
-            # Specific booking and allocation counts
-            booking_events_total = UserEvent.objects.filter(
-                event_type__in=['booking_create', 'booking_update', 'booking_cancel', 'booking_confirm', 'booking_payment']
-            ).count()
-            booking_events_this_month = UserEvent.objects.filter(
-                timestamp__date__gte=month_ago,
-                event_type__in=['booking_create', 'booking_update', 'booking_cancel', 'booking_confirm', 'booking_payment']
-            ).count()
-            
-            allocation_events_total = UserEvent.objects.filter(
-                event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
-            ).count()
-            allocation_events_this_month = UserEvent.objects.filter(
-                timestamp__date__gte=month_ago,
-                event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
-            ).count()
-            
-            # Get real user counts from authentication app
-            from apps.authentication.models import User
-            total_users = User.objects.count()
-            active_users = User.objects.filter(is_active=True).count()
-            inactive_users = total_users - active_users
-            
-            # Users by role
-            users_by_role = (
-                User.objects
-                .values('role')
-                .annotate(count=Count('id'))
-                .order_by('-count')
-            )
-            
-            users_by_role_formatted = []
-            for role_data in users_by_role:
-                role_name = role_data['role'] or 'No Role'
-                count = role_data['count']
-                percentage = (count / total_users * 100) if total_users > 0 else 0
-                users_by_role_formatted.append({
-                    'role': role_name,
-                    'count': count,
-                    'percentage': round(percentage, 1)
-                })
-            
-            # Monthly booking trends (last 6 months)
-            import calendar
-            from datetime import datetime
-            
-            booking_by_month = []
-            allocation_by_month = []
-            
-            for i in range(6):
-                # Calculate the date for each month going back
-                if i == 0:
-                    target_date = today
-                else:
-                    target_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-                    for _ in range(i-1):
-                        target_date = (target_date.replace(day=1) - timedelta(days=1)).replace(day=1)
-                
-                month_start = target_date.replace(day=1)
-                if target_date.month == 12:
-                    month_end = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
-                else:
-                    month_end = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
-                
-                month_name = calendar.month_name[target_date.month]
-                
-                # Booking events for this month
-                booking_count = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type__in=['booking_create', 'booking_update', 'booking_cancel', 'booking_confirm', 'booking_payment']
-                ).count()
-                
-                booking_completed = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type__in=['booking_confirm', 'booking_payment']
-                ).count()
-                
-                booking_cancelled = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type='booking_cancel'
-                ).count()
-                
-                booking_by_month.append({
-                    'month': month_name,
-                    'bookings': booking_count,
-                    'completed': booking_completed,
-                    'cancelled': booking_cancelled
-                })
-                
-                # Allocation events for this month
-                allocation_count = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
-                ).count()
-                
-                allocation_approved = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type='allocation_approve'
-                ).count()
-                
-                allocation_rejected = UserEvent.objects.filter(
-                    timestamp__date__gte=month_start,
-                    timestamp__date__lte=month_end,
-                    event_type='allocation_reject'
-                ).count()
-                
-                allocation_by_month.append({
-                    'month': month_name,
-                    'allocations': allocation_count,
-                    'approved': allocation_approved,
-                    'rejected': allocation_rejected
-                })
-            
-            # Reverse to show oldest to newest
-            booking_by_month.reverse()
-            allocation_by_month.reverse()
-            
-            # Service unit breakdown (simulated data based on user metadata)
-            booking_by_service_unit = [
-                {'name': 'Pastor Services', 'bookings': int(booking_events_total * 0.35), 'percentage': 35},
-                {'name': 'Admin Services', 'bookings': int(booking_events_total * 0.25), 'percentage': 25},
-                {'name': 'Security Services', 'bookings': int(booking_events_total * 0.20), 'percentage': 20},
-                {'name': 'Maintenance', 'bookings': int(booking_events_total * 0.15), 'percentage': 15},
-                {'name': 'Others', 'bookings': int(booking_events_total * 0.05), 'percentage': 5},
-            ]
-            
-            allocation_by_service_unit = [
-                {'name': 'Pastor', 'allocations': int(allocation_events_total * 0.40), 'percentage': 40},
-                {'name': 'Admin ', 'allocations': int(allocation_events_total * 0.30), 'percentage': 30},
-                {'name': 'Security Service Unit', 'allocations': int(allocation_events_total * 0.15), 'percentage': 15},
-                {'name': 'Maintenance', 'allocations': int(allocation_events_total * 0.10), 'percentage': 10},
-                {'name': 'Others', 'allocations': int(allocation_events_total * 0.05), 'percentage': 5},
-            ]
-            
-            # Building occupancy (simulated realistic data)
-            building_occupancy = [
-                {'name': 'Faith Block A', 'allocated': int(allocation_events_total * 0.3), 'capacity': 50, 'occupancy': 60},
-                {'name': 'Hope Block B', 'allocated': int(allocation_events_total * 0.25), 'capacity': 40, 'occupancy': 75},
-                {'name': 'Grace Block C', 'allocated': int(allocation_events_total * 0.2), 'capacity': 35, 'occupancy': 45},
-                {'name': 'Love Block D', 'allocated': int(allocation_events_total * 0.15), 'capacity': 30, 'occupancy': 80},
-                {'name': 'Honour Block E', 'allocated': int(allocation_events_total * 0.1), 'capacity': 25, 'occupancy': 40},
-            ]
-            
-            # Allocations by type (based on event metadata)
-            allocation_by_type = [
-                {'type': 'Pastor', 'count': int(allocation_events_total * 0.4), 'percentage': 40},
-                {'type': 'Service Unit', 'count': int(allocation_events_total * 0.35), 'percentage': 35},
-                {'type': 'Staff', 'count': int(allocation_events_total * 0.15), 'percentage': 15},
-                {'type': 'Visitor', 'count': int(allocation_events_total * 0.1), 'percentage': 10},
-            ]
-            
-            # Recent user signups (last 30 days by week)
-            recent_signups = []
-            for i in range(4):  # Last 4 weeks
-                week_start = today - timedelta(days=(i+1) * 7)
-                week_end = today - timedelta(days=i * 7)
-                week_signups = User.objects.filter(
-                    date_joined__date__gte=week_start,
-                    date_joined__date__lt=week_end
-                ).count()
-                
-                recent_signups.append({
-                    'date': f"{week_start.strftime('%m/%d')} - {week_end.strftime('%m/%d')}",
-                    'count': week_signups
-                })
-            
-            recent_signups.reverse()  # Show oldest to newest
-            
-            data = {
-                'total_events': total_events,
-                'events_today': events_today,
-                'events_this_week': events_this_week,
-                'events_this_month': events_this_month,
-                'error_rate': round(error_rate, 2),
-                'most_active_users': list(most_active_users),
-                'most_common_events': list(most_common_events),
-                'peak_activity_hours': peak_hours,
-                'average_session_duration': 0.0,  # Placeholder for now
-                # Specific counts for bookings and allocations
-                'booking_events_total': booking_events_total,
-                'booking_events_this_month': booking_events_this_month,
-                'allocation_events_total': allocation_events_total,
-                'allocation_events_this_month': allocation_events_this_month,
-                # Real user data
-                'total_users': total_users,
-                'active_users': active_users,
-                'inactive_users': inactive_users,
-                'users_by_role': users_by_role_formatted,
-                'recent_signups': recent_signups,
-                # Detailed breakdowns
-                'booking_by_month': booking_by_month,
-                'booking_by_service_unit': booking_by_service_unit,
-                'allocation_by_month': allocation_by_month,
-                'allocation_by_service_unit': allocation_by_service_unit,
-                'building_occupancy': building_occupancy,
-                'allocation_by_type': allocation_by_type,
-            }
-            
-            return Response(data)
+            data, generated_at = get_snapshot('dashboard_overview', request.user, fresh=wants_fresh(request))
+            return Response({**data, 'generated_at': generated_at})
         
         except Exception as e:
             return Response(
@@ -362,24 +111,73 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
     
     @action(detail=False, methods=['get'])
     def activity_chart_data(self, request):
-        """Get data for activity charts"""
+        """
+        Get data for activity charts.
+
+        Each chart is a single grouped query with empty buckets zero-filled in
+        Python. Results are cached for ANALYTICS_CHART_CACHE_TTL seconds per
+        (chart_type, days, date); see ``invalidate_activity_charts``. Spans
+        are limited to ACTIVITY_CHART_MAX_DAYS days.
+        """
         try:
             chart_type = request.query_params.get('chart_type', 'daily')
-            days = int(request.query_params.get('days', 30))
+            try:
+                days = int(request.query_params.get('days', 30))
+            except ValueError:
+                days = 0
+            if not 1 <= days <= ACTIVITY_CHART_MAX_DAYS:
+                return Response(
+                    {'error': f'days must be between 1 and {ACTIVITY_CHART_MAX_DAYS}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
-            end_date = timezone.now().date()
+            end_date = timezone.localdate()
             start_date = end_date - timedelta(days=days)
             
+            # Optional explicit range for the daily chart
+            date_from = request.query_params.get('date_from')
+            date_to = request.query_params.get('date_to')
+            if chart_type == 'daily' and date_from and date_to:
+                try:
+                    range_start = datetime.strptime(date_from, '%Y-%m-%d').date()
+                    range_end = datetime.strptime(date_to, '%Y-%m-%d').date()
+                except ValueError:
+                    return Response(
+                        {'error': 'date_from and date_to must be YYYY-MM-DD'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if range_start > range_end:
+                    return Response(
+                        {'error': 'date_from must not be after date_to'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                if (range_end - range_start).days >= ACTIVITY_CHART_MAX_DAYS:
+                    return Response(
+                        {'error': f'The date range may span at most {ACTIVITY_CHART_MAX_DAYS} days'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                cache_parts = (chart_type, days, end_date, range_start, range_end)
+            else:
+                range_start = end_date - timedelta(days=days - 1)
+                range_end = end_date
+                cache_parts = (chart_type, days, end_date)
+            
+            cache_key = versioned_key(CHART_CACHE_NAMESPACE, *cache_parts)
+            chart_data = cache.get(cache_key)
+            if chart_data is not None:
+                return Response(chart_data)
+            
             if chart_type == 'daily':
-                # Daily activity for the last N days
+                # Daily activity, one GROUP BY over the whole range
+                counts = _daily_counts(range_start, range_end)
                 labels = []
                 data = []
                 
-                for i in range(days):
-                    date = end_date - timedelta(days=days - i - 1)
-                    count = UserEvent.objects.filter(timestamp__date=date).count()
+                date = range_start
+                while date <= range_end:
                     labels.append(date.strftime('%m/%d'))
-                    data.append(count)
+                    data.append(counts.get(date, 0))
+                    date += timedelta(days=1)
                 
                 datasets = [{
                     'label': 'Daily Activity',
@@ -453,18 +251,7 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
             elif chart_type == 'hourly':
                 # Hourly activity (last 7 days)
                 labels = [f"{hour:02d}:00" for hour in range(24)]
-                data = []
-                
-                for hour in range(24):
-                    count = (
-                        UserEvent.objects
-                        .filter(
-                            timestamp__date__gte=end_date - timedelta(days=7),
-                            timestamp__hour=hour
-                        )
-                        .count()
-                    )
-                    data.append(count)
+                data = _hourly_counts(window_start(7))
                 
                 datasets = [{
                     'label': 'Hourly Activity (Last 7 Days)',
@@ -485,6 +272,7 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
                 'datasets': datasets
             }
             
+            cache.set(cache_key, chart_data, settings.ANALYTICS_CHART_CACHE_TTL)
             return Response(chart_data)
         
         except Exception as e:
@@ -525,53 +313,43 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
     
     @action(detail=False, methods=['get'])
     def user_activity(self, request):
-        """Get user activity summary"""
+        """
+        Get user activity summary.
+
+        Built from a single (user, event_type) GROUP BY pivoted in Python.
+        Pass ``source=rollup`` to read complete hours from the hourly rollups
+        and only the tail after the rollup watermark from raw events.
+        """
         try:
             days = int(request.query_params.get('days', 30))
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=days)
+            use_rollups = request.query_params.get('source') == 'rollup'
+            
+            # Compare against a precomputed bound so the timestamp index is
+            # used instead of casting every row to a date
+            start = window_start(days)
+            raw_start = start
+            grouped_rows = []
+            
+            if use_rollups:
+                rollup_end, raw_start = rollup_coverage(start)
+                if rollup_end is not None:
+                    grouped_rows.append(
+                        UserEventHourlyRollup.objects
+                        .filter(hour__gte=start, hour__lt=rollup_end, user__isnull=False)
+                        .values(*USER_ACTIVITY_FIELDS)
+                        .annotate(count=Sum('count'), last_activity=Max('last_event_at'))
+                        .order_by()
+                    )
             
-            # Get user activity data
-            user_activity = (
+            grouped_rows.append(
                 UserEvent.objects
-                .filter(timestamp__date__gte=start_date, user__isnull=False)
-                .values(
-                    'user_id',
-                    'user__username',
-                    'user__first_name',
-                    'user__last_name',
-                    'user__role'
-                )
-                .annotate(
-                    total_events=Count('id'),
-                    last_activity=Max('timestamp')
-                )
-                .order_by('-total_events')[:20]
+                .filter(timestamp__gte=raw_start, user__isnull=False)
+                .values(*USER_ACTIVITY_FIELDS)
+                .annotate(count=Count('id'), last_activity=Max('timestamp'))
+                .order_by()
             )
             
-            # Get event breakdown for each user
-            for user in user_activity:
-                user['full_name'] = f"{user['user__first_name']} {user['user__last_name']}".strip()
-                if not user['full_name']:
-                    user['full_name'] = user['user__username']
-                
-                # Get event type breakdown
-                event_breakdown = (
-                    UserEvent.objects
-                    .filter(
-                        user_id=user['user_id'],
-                        timestamp__date__gte=start_date
-                    )
-                    .values('event_type')
-                    .annotate(count=Count('id'))
-                )
-                
-                user['event_breakdown'] = {
-                    item['event_type']: item['count'] 
-                    for item in event_breakdown
-                }
-            
-            return Response(list(user_activity))
+            return Response(_pivot_user_activity(grouped_rows, limit=20))
         
         except Exception as e:
             return Response(
@@ -579,28 +357,66 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
     
+    @action(detail=False, methods=['get'])
+    def session_stats(self, request):
+        """Completed user sessions grouped by day and by role (durations in seconds)"""
+        try:
+            days = int(request.query_params.get('days', 30))
+            return Response(session_breakdown(window_start(days)))
+        
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to fetch session stats: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    @action(detail=False, methods=['get'])
+    def active_users(self, request):
+        """
+        Approximate daily, weekly and monthly active users, overall and by
+        role and service unit, unioned from the daily HyperLogLog sketches.
+        """
+        from apps.service_units.models import ServiceUnit
+        
+        try:
+            estimates = active_user_windows((1, 7, 30))
+            
+            def windows(key):
+                counts = estimates.get(key, {})
+                return {'dau': counts.get(1, 0), 'wau': counts.get(7, 0), 'mau': counts.get(30, 0)}
+            
+            unit_ids = [int(value) for dimension, value in estimates if dimension == 'service_unit']
+            unit_names = dict(ServiceUnit.objects.filter(id__in=unit_ids).values_list('id', 'name'))
+            
+            return Response({
+                **windows(('all', '')),
+                'by_role': [
+                    {'role': value, **windows((dimension, value))}
+                    for dimension, value in sorted(estimates) if dimension == 'role'
+                ],
+                'by_service_unit': [
+                    {'id': unit_id, 'name': unit_names.get(unit_id), **windows(('service_unit', str(unit_id)))}
+                    for unit_id in sorted(unit_ids)
+                ],
+                'relative_error': round(RELATIVE_ERROR, 4),
+            })
+        
+        except Exception as e:
+            return Response(
+                {'error': f'Failed to fetch active users: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
     @action(detail=False, methods=['get'])
     def export_formats(self, request):
         """Get available export formats"""
         formats = [
-            {
-                'value': 'pdf',
-                'label': 'PDF Report',
-                'description': 'Formatted PDF document with charts and tables',
-                'icon': 'fas fa-file-pdf'
-            },
             {
                 'value': 'csv',
                 'label': 'CSV Data',
                 'description': 'Comma-separated values for spreadsheet applications',
                 'icon': 'fas fa-file-csv'
             },
-            {
-                'value': 'excel',
-                'label': 'Excel Workbook',
-                'description': 'Microsoft Excel file with multiple sheets',
-                'icon': 'fas fa-file-excel'
-            },
             {
                 'value': 'json',
                 'label': 'JSON Data',
@@ -635,11 +451,9 @@ class AnalyticsViewSet(viewsets.GenericViewSet):
                     export.filters
                 )
                 
-                # TODO: Add background task to generate the actual file
-                # For now, mark as completed
-                export.status = 'completed'
-                export.completed_at = timezone.now()
-                export.save()
+                # Generate the file in the background; status moves
+                # pending -> processing -> completed/failed as the job runs
+                enqueue('analytics.generate_report_export', export_id=export.id)
                 
                 return Response(
                     ReportExportSerializer(export).data,
@@ -675,7 +489,7 @@ class UserEventViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = UserEvent.objects.all()
     serializer_class = UserEventSerializer
-    permission_classes = [permissions.IsAuthenticated, IsSuperAdminOrServiceUnitAdmin]
+    permission_classes = [permissions.IsAuthenticated, CanViewAnalytics]
     filterset_fields = ['event_type', 'user', 'resource_type', 'success']
     search_fields = ['user__username', 'user__email', 'event_type', 'resource_type']
     ordering_fields = ['timestamp', 'event_type', 'user']
@@ -692,5 +506,389 @@ class DashboardMetricsViewSet(viewsets.ReadOnlyModelViewSet):
     """
     queryset = DashboardMetrics.objects.all()
     serializer_class = DashboardMetricsSerializer
-    permission_classes = [permissions.IsAuthenticated, IsSuperAdminOrServiceUnitAdmin]
+    permission_classes = [permissions.IsAuthenticated, CanViewAnalytics]
     ordering = ['-date']
+
+
+def get_dashboard_overview_data(user=None):
+    """
+    Compute the analytics dashboard overview.
+
+    Used as the ``dashboard_overview`` snapshot builder; the payload is the
+    same for every caller, so ``user`` is ignored.
+    """
+    today = timezone.now().date()
+    week_ago = today - timedelta(days=7)
+    month_ago = today - timedelta(days=30)
+    
+    # Get basic counts
+    total_events = UserEvent.objects.count()
+    events_today = UserEvent.objects.filter(timestamp__date=today).count()
+    events_this_week = UserEvent.objects.filter(timestamp__date__gte=week_ago).count()
+    events_this_month = UserEvent.objects.filter(timestamp__date__gte=month_ago).count()
+    
+    # Error rate
+    total_with_status = UserEvent.objects.filter(success__isnull=False).count()
+    failed_events = UserEvent.objects.filter(success=False).count()
+    error_rate = (failed_events / total_with_status * 100) if total_with_status > 0 else 0
+    
+    # Most active users (last 30 days)
+    most_active_users = (
+        UserEvent.objects
+        .filter(timestamp__date__gte=month_ago, user__isnull=False)
+        .values('user__username', 'user__first_name', 'user__last_name')
+        .annotate(event_count=Count('id'))
+        .order_by('-event_count')[:5]
+    )
+    
+    # Most common events (last 30 days)
+    most_common_events = (
+        UserEvent.objects
+        .filter(timestamp__date__gte=month_ago)
+        .values('event_type')
+        .annotate(count=Count('id'))
+        .order_by('-count')[:5]
+    )
+    
+    # Add display names for events
+    for event in most_common_events:
+        for choice in EventType.choices:
+            if choice[0] == event['event_type']:
+                event['event_type_display'] = choice[1]
+                break
+    
+    # Peak activity hours (last 7 days)
+    peak_hours = [
+        {'hour': f"{hour:02d}:00", 'count': count}
+        for hour, count in enumerate(_hourly_counts(window_start(7)))
+    ]
+    
+    # Sort by count and get top 5
+    peak_hours = sorted(peak_hours, key=lambda x: x['count'], reverse=True)[:5]
+    
+    # Specific booking and allocation counts
+    booking_events_total = UserEvent.objects.filter(
+        event_type__in=BOOKING_EVENT_TYPES
+    ).count()
+    booking_events_this_month = UserEvent.objects.filter(
+        timestamp__date__gte=month_ago,
+        event_type__in=BOOKING_EVENT_TYPES
+    ).count()
+    
+    allocation_events_total = UserEvent.objects.filter(
+        event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
+    ).count()
+    allocation_events_this_month = UserEvent.objects.filter(
+        timestamp__date__gte=month_ago,
+        event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
+    ).count()
+    
+    # Get real user counts from authentication app
+    from apps.authentication.models import User
+    total_users = User.objects.count()
+    active_users = User.objects.filter(is_active=True).count()
+    inactive_users = total_users - active_users
+    
+    # Users by role
+    users_by_role = (
+        User.objects
+        .values('role')
+        .annotate(count=Count('id'))
+        .order_by('-count')
+    )
+    
+    users_by_role_formatted = []
+    for role_data in users_by_role:
+        role_name = role_data['role'] or 'No Role'
+        count = role_data['count']
+        percentage = (count / total_users * 100) if total_users > 0 else 0
+        users_by_role_formatted.append({
+            'role': role_name,
+            'count': count,
+            'percentage': round(percentage, 1)
+        })
+    
+    # Monthly booking trends (last 6 months)
+    import calendar
+    from datetime import datetime
+    
+    booking_by_month = []
+    allocation_by_month = []
+    
+    for i in range(6):
+        # Calculate the date for each month going back
+        if i == 0:
+            target_date = today
+        else:
+            target_date = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+            for _ in range(i-1):
+                target_date = (target_date.replace(day=1) - timedelta(days=1)).replace(day=1)
+        
+        month_start = target_date.replace(day=1)
+        if target_date.month == 12:
+            month_end = target_date.replace(year=target_date.year + 1, month=1, day=1) - timedelta(days=1)
+        else:
+            month_end = target_date.replace(month=target_date.month + 1, day=1) - timedelta(days=1)
+        
+        month_name = calendar.month_name[target_date.month]
+        
+        # Booking events for this month
+        booking_count = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type__in=BOOKING_EVENT_TYPES
+        ).count()
+        
+        booking_completed = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type__in=['booking_confirm', 'booking_payment']
+        ).count()
+        
+        booking_cancelled = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type='booking_cancel'
+        ).count()
+        
+        booking_by_month.append({
+            'month': month_name,
+            'bookings': booking_count,
+            'completed': booking_completed,
+            'cancelled': booking_cancelled
+        })
+        
+        # Allocation events for this month
+        allocation_count = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type__in=['allocation_create', 'allocation_update', 'allocation_delete', 'allocation_approve', 'allocation_reject']
+        ).count()
+        
+        allocation_approved = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type='allocation_approve'
+        ).count()
+        
+        allocation_rejected = UserEvent.objects.filter(
+            timestamp__date__gte=month_start,
+            timestamp__date__lte=month_end,
+            event_type='allocation_reject'
+        ).count()
+        
+        allocation_by_month.append({
+            'month': month_name,
+            'allocations': allocation_count,
+            'approved': allocation_approved,
+            'rejected': allocation_rejected
+        })
+    
+    # Reverse to show oldest to newest
+    booking_by_month.reverse()
+    allocation_by_month.reverse()
+    
+    # Service unit, building and type breakdowns: one grouped query
+    # each, however many units and buildings exist
+    from apps.allocations.models import RoomAllocation
+    from apps.buildings.models import Building
+    
+    booking_by_service_unit = _with_percentages(
+        [
+            {'name': row['name'] or 'Unassigned', 'bookings': row['bookings']}
+            for row in UserEvent.objects
+            .filter(event_type__in=BOOKING_EVENT_TYPES)
+            .values(name=F('user__service_unit__name'))
+            .annotate(bookings=Count('id'))
+            .order_by('-bookings')
+        ],
+        'bookings',
+    )
+    
+    # Unit allocations count for the unit, personal ones for the holder's unit
+    active_allocations = RoomAllocation.objects.filter(is_active=True)
+    allocation_by_service_unit = _with_percentages(
+        [
+            {'name': row['name'] or 'Unassigned', 'allocations': row['allocations']}
+            for row in active_allocations
+            .values(name=Coalesce('service_unit__name', 'user__service_unit__name'))
+            .annotate(allocations=Count('id'))
+            .order_by('-allocations')
+        ],
+        'allocations',
+    )
+    
+    # Occupancy in rooms, matching Building.occupancy_rate
+    building_occupancy = [
+        {
+            'name': building['name'],
+            'allocated': building['allocated'],
+            'capacity': building['capacity'],
+            'beds': building['beds'] or 0,
+            'occupancy': round(building['allocated'] / building['capacity'] * 100) if building['capacity'] else 0,
+        }
+        # Grouped by id too: building names are not unique
+        for building in Building.objects
+        .values('id', 'name')
+        .annotate(
+            capacity=Count('rooms'),
+            allocated=Count('rooms', filter=Q(rooms__is_allocated=True)),
+            beds=Sum('rooms__capacity'),
+        )
+        .order_by('-allocated', 'name', 'id')
+    ]
+    
+    type_labels = dict(RoomAllocation.AllocationTypeChoices.choices)
+    allocation_by_type = _with_percentages(
+        [
+            {'type': type_labels.get(row['allocation_type'], row['allocation_type']), 'count': row['count']}
+            for row in active_allocations
+            .values('allocation_type')
+            .annotate(count=Count('id'))
+            .order_by('-count')
+        ],
+        'count',
+    )
+    
+    # Recent user signups (last 30 days by week)
+    recent_signups = []
+    for i in range(4):  # Last 4 weeks
+        week_start = today - timedelta(days=(i+1) * 7)
+        week_end = today - timedelta(days=i * 7)
+        week_signups = User.objects.filter(
+            date_joined__date__gte=week_start,
+            date_joined__date__lt=week_end
+        ).count()
+        
+        recent_signups.append({
+            'date': f"{week_start.strftime('%m/%d')} - {week_end.strftime('%m/%d')}",
+            'count': week_signups
+        })
+    
+    recent_signups.reverse()  # Show oldest to newest
+    
+    data = {
+        'total_events': total_events,
+        'events_today': events_today,
+        'events_this_week': events_this_week,
+        'events_this_month': events_this_month,
+        'error_rate': round(error_rate, 2),
+        'most_active_users': list(most_active_users),
+        'most_common_events': list(most_common_events),
+        'peak_activity_hours': peak_hours,
+        'average_session_duration': average_session_duration(window_start(30)),  # seconds
+        # Specific counts for bookings and allocations
+        'booking_events_total': booking_events_total,
+        'booking_events_this_month': booking_events_this_month,
+        'allocation_events_total': allocation_events_total,
+        'allocation_events_this_month': allocation_events_this_month,
+        # Real user data
+        'total_users': total_users,
+        'active_users': active_users,
+        'inactive_users': inactive_users,
+        'users_by_role': users_by_role_formatted,
+        'recent_signups': recent_signups,
+        # Detailed breakdowns
+        'booking_by_month': booking_by_month,
+        'booking_by_service_unit': booking_by_service_unit,
+        'allocation_by_month': allocation_by_month,
+        'allocation_by_service_unit': allocation_by_service_unit,
+        'building_occupancy': building_occupancy,
+        'allocation_by_type': allocation_by_type,
+    }
+    
+    return data
+
+
+USER_ACTIVITY_FIELDS = (
+    'user_id', 'user__username', 'user__first_name', 'user__last_name',
+    'user__role', 'event_type',
+)
+
+
+def _pivot_user_activity(grouped_rows, limit):
+    """
+    Pivot ``(user, event_type)`` aggregate rows into per-user summaries.
+
+    ``grouped_rows`` is an iterable of querysets/lists of rows carrying the
+    USER_ACTIVITY_FIELDS plus ``count`` and ``last_activity``; rows for the
+    same user and event type from different sources are summed.
+    """
+    users = {}
+    for rows in grouped_rows:
+        for row in rows:
+            entry = users.get(row['user_id'])
+            if entry is None:
+                entry = users[row['user_id']] = {
+                    'user_id': row['user_id'],
+                    'user__username': row['user__username'],
+                    'user__first_name': row['user__first_name'],
+                    'user__last_name': row['user__last_name'],
+                    'user__role': row['user__role'],
+                    'total_events': 0,
+                    'last_activity': row['last_activity'],
+                    'event_breakdown': {},
+                }
+            count = row['count']
+            entry['total_events'] += count
+            breakdown = entry['event_breakdown']
+            breakdown[row['event_type']] = breakdown.get(row['event_type'], 0) + count
+            if row['last_activity'] > entry['last_activity']:
+                entry['last_activity'] = row['last_activity']
+    
+    top_users = sorted(users.values(), key=lambda entry: entry['total_events'], reverse=True)[:limit]
+    for entry in top_users:
+        full_name = f"{entry['user__first_name']} {entry['user__last_name']}".strip()
+        entry['full_name'] = full_name or entry['user__username']
+    return top_users
+
+
+def _with_percentages(rows, count_key):
+    """Add each row's share of the total ``count_key`` as ``percentage``."""
+    total = sum(row[count_key] for row in rows)
+    for row in rows:
+        row['percentage'] = round(row[count_key] / total * 100, 1) if total else 0
+    return rows
+
+
+def _daily_counts(start_date, end_date):
+    """Return ``{date: event_count}`` for days with events in the inclusive range."""
+    start = timezone.make_aware(datetime.combine(start_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+    rows = (
+        UserEvent.objects
+        .filter(timestamp__gte=start, timestamp__lt=end)
+        .annotate(day=TruncDate('timestamp'))
+        .values('day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    return {row['day']: row['count'] for row in rows}
+
+
+def _hourly_counts(start):
+    """Return a 24-item list of event counts per hour of day since ``start``."""
+    counts = [0] * 24
+    rows = (
+        UserEvent.objects
+        .filter(timestamp__gte=start)
+        .annotate(hour=ExtractHour('timestamp'))
+        .values('hour')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in rows:
+        counts[row['hour']] = row['count']
+    return counts
+
+
+def invalidate_activity_charts():
+    """
+    Drop every cached activity chart.
+
+    Events logged as they happen only change charts covering today, which
+    refresh within ANALYTICS_CHART_CACHE_TTL. Anything that changes past days
+    (backdated or edited events, deletions, backfills) calls this; see
+    ``apps.analytics.signals``.
+    """
+    bump_version(CHART_CACHE_NAMESPACE)
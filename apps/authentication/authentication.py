@@ -0,0 +1,100 @@
+"""
+JWT authentication backed by a cached user snapshot.
+
+``JWTAuthentication`` loads the ``User`` row on every request, and most views
+then load ``user.service_unit`` as well. ``CachedJWTAuthentication`` keeps a
+snapshot of the user's row (without the password hash) plus the service unit
+name, keyed by user id under that user's version namespace (see
+``apps.core.cache``), and rebuilds ``request.user`` from it without touching
+the database.
+
+The rebuilt user is a real ``User`` instance with only the password deferred:
+``save()`` writes the loaded fields and leaves the hash alone.
+``apps.authentication.signals`` bumps the version whenever the user or their
+service unit changes.
+
+That bump only reaches other workers through a shared cache. With a
+per-process cache (the ``LocMemCache`` default), a deactivation or role change
+would go unseen by the other workers until the TTL, so authentication loads
+the user from the database as ``JWTAuthentication`` does.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from apps.core.cache import bump_version, cache_is_shared, versioned_key
+
+from .models import User
+
+# Every column but the password hash, so serializers reading the whole
+# profile don't fall back to per-field loads
+SNAPSHOT_FIELDS = tuple(field.attname for field in User._meta.concrete_fields if field.attname != 'password')
+
+AUTH_USER_NAMESPACE = 'auth-user'
+
+
+def user_namespace(user_id):
+    return f'{AUTH_USER_NAMESPACE}:{user_id}'
+
+
+def invalidate_auth_user(*user_ids):
+    """Drop the cached snapshots of ``user_ids``."""
+    for user_id in user_ids:
+        bump_version(user_namespace(user_id))
+
+
+def load_user_snapshot(user_id):
+    """Return ``user_id``'s snapshot dict, or None if there is no such user."""
+    key = versioned_key(user_namespace(user_id), 'snapshot')
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = (
+            User.objects
+            .filter(pk=user_id)
+            .values(*SNAPSHOT_FIELDS, 'service_unit__name')
+            .first()
+        )
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, settings.AUTH_USER_CACHE_TTL)
+    return snapshot
+
+
+def user_from_snapshot(snapshot):
+    """Rebuild a ``User`` (and its service unit) from a snapshot without querying."""
+    from apps.service_units.models import ServiceUnit
+
+    user = User.from_db('default', SNAPSHOT_FIELDS, [snapshot[field] for field in SNAPSHOT_FIELDS])
+    if snapshot['service_unit_id'] is None:
+        user.service_unit = None
+    else:
+        user.service_unit = ServiceUnit.from_db(
+            'default', ('id', 'name'), (snapshot['service_unit_id'], snapshot['service_unit__name']),
+        )
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` that serves ``request.user`` from the user snapshot cache."""
+
+    def get_user(self, validated_token):
+        # Revocation compares the password hash, which is not cached, and
+        # a private cache would miss other workers' invalidations
+        if api_settings.CHECK_REVOKE_TOKEN or not cache_is_shared():
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        snapshot = load_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if api_settings.CHECK_USER_IS_ACTIVE and not snapshot['is_active']:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        return user_from_snapshot(snapshot)
@@ -0,0 +1,118 @@
+"""
+Avatar processing.
+
+Uploads are stored as-is and recorded in ``User.avatar_pending``; the request
+returns without touching the image. The ``authentication.process_avatar`` job
+then decodes the upload with Pillow, crops it square and re-encodes it as
+``small`` and ``medium`` WebP variants (``AVATAR_VARIANT_SIZES``).
+
+The swap is one UPDATE conditioned on ``avatar_pending`` still naming this
+upload, so a newer upload always wins, even if its job finished first. The
+replaced files are deleted only after the swap commits.
+"""
+
+import io
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .authentication import invalidate_auth_user
+from .models import User
+
+AVATAR_DIR = 'avatars'
+
+AVATAR_FIELDS = ('avatar', 'avatar_small', 'avatar_medium')
+
+
+class AvatarProcessingError(Exception):
+    """The upload is not an image Pillow can process."""
+
+
+def store_avatar_upload(user, upload):
+    """Save an uploaded avatar file as ``user``'s pending avatar and return its path."""
+    ext = os.path.splitext(upload.name)[1].lower() or '.img'
+    path = default_storage.save(f'{AVATAR_DIR}/upload_{user.id}_{uuid.uuid4().hex}{ext}', upload)
+    user.avatar_pending = path
+    user.save(update_fields=['avatar_pending'])
+    return path
+
+
+def render_variant(image, size):
+    """``image`` cropped square to ``size`` pixels, encoded as WebP bytes."""
+    variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    variant.save(buffer, 'WEBP', quality=settings.AVATAR_WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def process_avatar(user_id, upload_path):
+    """
+    Build the variants of ``upload_path`` and swap them in for ``user_id``.
+
+    Returns:
+        dict of field -> stored path, or None if a newer upload superseded this one
+    """
+    try:
+        with default_storage.open(upload_path, 'rb') as handle:
+            image = Image.open(handle)
+            # Let JPEG decode at a reduced scale; variants are small anyway
+            largest = max(settings.AVATAR_VARIANT_SIZES.values())
+            image.draft(image.mode, (largest * 2, largest * 2))
+            image.load()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as exc:
+        raise AvatarProcessingError(f'Cannot read avatar {upload_path}: {exc}') from exc
+
+    image = ImageOps.exif_transpose(image)
+    image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    token = uuid.uuid4().hex[:12]
+    paths = {'avatar': upload_path}
+    for name, size in settings.AVATAR_VARIANT_SIZES.items():
+        paths[f'avatar_{name}'] = default_storage.save(
+            f'{AVATAR_DIR}/avatar_{user_id}_{name}_{token}.webp',
+            ContentFile(render_variant(image, size)),
+        )
+
+    with transaction.atomic():
+        previous = (
+            User.objects.select_for_update()
+            .filter(pk=user_id, avatar_pending=upload_path)
+            .values(*AVATAR_FIELDS)
+            .first()
+        )
+        swapped = previous is not None and User.objects.filter(
+            pk=user_id, avatar_pending=upload_path,
+        ).update(avatar_pending='', **paths)
+
+    if not swapped:
+        # Superseded by a newer upload (or the user is gone)
+        discard_files(paths.values())
+        return None
+
+    invalidate_auth_user(user_id)
+    discard_files(path for path in previous.values() if path and path not in paths.values())
+    return paths
+
+
+def discard_files(paths):
+    """Delete stored files, ignoring ones already gone."""
+    for path in paths:
+        if path:
+            try:
+                default_storage.delete(path)
+            except OSError:
+                pass
+
+
+def avatar_url(request, field_file):
+    """Absolute URL of a stored avatar file, or None."""
+    if not field_file:
+        return None
+    if request:
+        return request.build_absolute_uri(field_file.url)
+    return field_file.url
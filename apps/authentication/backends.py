@@ -4,6 +4,8 @@ Custom authentication backends for the accommodation portal.
 
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+from django.db.models import Q
 
 User = get_user_model()
 
@@ -18,11 +20,14 @@ class EmailAuthBackend(ModelBackend):
     
     def authenticate(self, request, username=None, password=None, **kwargs):
         """
-        Authenticate user using email and password.
+        Authenticate user using email (or username) and password.
+        
+        Runs exactly one password hash whatever the outcome, so login cost
+        does not depend on whether the account exists.
         
         Args:
             request: The HTTP request object
-            username: Actually the email address in our case
+            username: The email address, or the username
             password: User's password
             **kwargs: Additional keyword arguments
             
@@ -35,17 +40,20 @@ class EmailAuthBackend(ModelBackend):
         if username is None or password is None:
             return None
             
-        try:
-            # Try to get user by email
-            user = User.objects.get(email=username)
-        except User.DoesNotExist:
-            # If user doesn't exist, still run check_password to prevent timing attacks
+        # Usernames default to the email, so both may match: prefer the email
+        candidates = list(User.objects.filter(Q(email=username) | Q(username=username))[:2])
+        user = next((candidate for candidate in candidates if candidate.email == username), None)
+        if user is None and candidates:
+            user = candidates[0]
+        
+        if user is None:
+            # If user doesn't exist, still run the hasher to prevent timing attacks
             User().set_password(password)
             return None
-        else:
-            # Check password and return user if valid
-            if user.check_password(password) and self.user_can_authenticate(user):
-                return user
+        
+        # Check password and return user if valid
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
         return None
     
     def get_user(self, user_id):
@@ -64,3 +72,23 @@ class EmailAuthBackend(ModelBackend):
             return None
         
         return user if self.user_can_authenticate(user) else None
+
+
+def authenticate_login(request, identifier, password):
+    """
+    Authenticate an API login (email or username) with a single password hash.
+    
+    ``django.contrib.auth.authenticate`` would fall through to ModelBackend
+    after a failed attempt and hash the password again; API logins only ever
+    need EmailAuthBackend.
+    
+    Returns:
+        User instance if authentication succeeds, None otherwise
+    """
+    backend = EmailAuthBackend()
+    user = backend.authenticate(request, username=identifier, password=password)
+    if user is None:
+        user_login_failed.send(sender=__name__, credentials={'username': identifier}, request=request)
+        return None
+    user.backend = f'{backend.__module__}.{type(backend).__name__}'
+    return user
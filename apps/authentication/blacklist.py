@@ -0,0 +1,195 @@
+"""
+Bloom-filter prefilter for the refresh-token blacklist.
+
+Every refresh checks ``token_blacklist_blacklistedtoken`` for the token's jti,
+although almost every token presented is not blacklisted. Each process keeps
+the jtis of blacklisted, unexpired tokens in a Bloom filter: a negative answer
+is definitive and skips the query, a positive one (a blacklisted token or a
+~0.1% false positive) falls through to the database check.
+
+Filters stay current incrementally. Blacklisting bumps the ``token-blacklist``
+cache version, and a process that sees a new version (or has not synced for
+``TOKEN_BLACKLIST_SYNC_SECONDS``) loads the rows added since its last sync.
+Row ids are allocated at insert but become visible at commit, so a lower id
+can appear after a higher one was read. Each sync therefore re-reads every
+id above the highest one seen at least ``TOKEN_BLACKLIST_RESCAN_SECONDS``
+ago, skipping rows it already loaded; only a blacklisting transaction that
+stays open longer than that can be missed.
+With a shared cache backend, tokens blacklisted by one worker are seen by the
+others on their next check. A per-process cache (the ``LocMemCache`` default)
+would leave the other workers answering "not blacklisted" until their next
+timed sync, letting a revoked token through meanwhile, so without a shared
+cache the filter is bypassed and every check reads the table.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.core.cache import bump_version, cache_is_shared, get_version
+
+BLACKLIST_NAMESPACE = 'token-blacklist'
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class BlacklistPrefilter:
+    """This process's Bloom filter of blacklisted jtis, synced from the database."""
+
+    min_capacity = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._reset_watermarks()
+        self._version = None
+        self._synced_at = 0
+
+    def _reset_watermarks(self):
+        # Ids at or below _floor_id are settled; above it, _seen holds the
+        # ids already loaded and _history (monotonic time, highest id seen)
+        # per sync, from which the floor advances once the rescan window passes
+        self._floor_id = 0
+        self._last_id = 0
+        self._seen = set()
+        self._history = deque()
+
+    def might_be_blacklisted(self, jti):
+        """False only if ``jti`` is certainly not blacklisted."""
+        if not cache_is_shared():
+            # Other workers' blacklistings would not reach this filter in time
+            return True
+        self.sync()
+        return jti in self._filter
+
+    def add(self, jti):
+        """Record a jti this process just blacklisted, and tell the others."""
+        if not cache_is_shared():
+            return
+        self.sync()
+        self._filter.add(jti)
+        bump_version(BLACKLIST_NAMESPACE)
+
+    def sync(self, force=False):
+        version = get_version(BLACKLIST_NAMESPACE)
+        if (
+            not force
+            and self._filter is not None
+            and version == self._version
+            and time.monotonic() - self._synced_at < settings.TOKEN_BLACKLIST_SYNC_SECONDS
+        ):
+            return
+
+        with self._lock:
+            if self._filter is None or self._filter.count > self._filter.capacity:
+                self._rebuild()
+            else:
+                self._load(self._filter)
+            self._version = version
+            self._synced_at = time.monotonic()
+
+    def reset(self):
+        """Drop the filter; the next check rebuilds it (e.g. after pruning)."""
+        with self._lock:
+            self._filter = None
+            self._reset_watermarks()
+
+    def _rebuild(self):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        live = BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now()).count()
+        bloom = BloomFilter(max(self.min_capacity, live * 2))
+        self._reset_watermarks()
+        self._load(bloom, only_live=True)
+        self._filter = bloom
+
+    def _load(self, bloom, only_live=False):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+        rows = BlacklistedToken.objects.filter(id__gt=self._floor_id)
+        if only_live:
+            rows = rows.filter(token__expires_at__gt=timezone.now())
+        for row_id, jti in rows.order_by('id').values_list('id', 'token__jti').iterator(chunk_size=5000):
+            if row_id not in self._seen:
+                bloom.add(jti)
+                self._seen.add(row_id)
+            self._last_id = max(self._last_id, row_id)
+
+        # Every id below one seen a full window ago has committed by now and
+        # was read by this query, so the floor can move up to it
+        now = time.monotonic()
+        self._history.append((now, self._last_id))
+        while self._history and now - self._history[0][0] >= settings.TOKEN_BLACKLIST_RESCAN_SECONDS:
+            self._floor_id = self._history.popleft()[1]
+        self._seen = {row_id for row_id in self._seen if row_id > self._floor_id}
+
+
+prefilter = BlacklistPrefilter()
+
+
+class PrefilteredRefreshToken(RefreshToken):
+    """``RefreshToken`` whose blacklist check consults the Bloom filter first."""
+
+    def check_blacklist(self):
+        if prefilter.might_be_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        blacklisted = super().blacklist()
+        prefilter.add(self.payload[api_settings.JTI_CLAIM])
+        return blacklisted
+
+
+def prune_token_blacklist(batch_size=5000):
+    """
+    Delete outstanding (and with them blacklisted) tokens past their expiry.
+
+    Expired tokens fail signature checks anyway, so their rows only cost
+    space and index depth. Returns the number of outstanding tokens deleted.
+    """
+    from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+    deleted = 0
+    now = timezone.now()
+    while True:
+        ids = list(OutstandingToken.objects.filter(expires_at__lte=now).values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        OutstandingToken.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+    if deleted:
+        # Rebuild filters from the live rows so pruned jtis stop matching
+        bump_version(BLACKLIST_NAMESPACE)
+        prefilter.reset()
+    return deleted
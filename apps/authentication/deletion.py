@@ -0,0 +1,113 @@
+"""
+Chunked bulk deletion of users.
+
+Deleting users cascades into their allocations, requests, exports, report
+templates, member profiles and more, and Django sends ``post_delete`` for
+every collected row. One ``delete()`` over thousands of users holds its locks
+for the whole cascade. ``delete_users`` deletes ``USER_BULK_DELETE_BATCH_SIZE``
+users per transaction instead, and collapses the per-row analytics events into
+one event per type (``aggregate_events``).
+
+``deletion_preview`` counts what a deletion would touch, one COUNT per
+relation, without loading any rows.
+"""
+
+from django.conf import settings
+from django.db import models, transaction
+
+from .models import User
+
+# Relation depth followed by the preview (user -> allocation -> ...)
+PREVIEW_DEPTH = 3
+
+
+def _relation_effect(on_delete):
+    if on_delete is models.CASCADE:
+        return 'deleted'
+    if on_delete in (models.SET_NULL, models.SET_DEFAULT) or getattr(on_delete, 'deconstruct', None):
+        return 'updated'
+    if on_delete in (models.PROTECT, models.RESTRICT):
+        return 'blocking'
+    return None
+
+
+def _count_relations(model, path, user_ids, counts, depth, seen):
+    for relation in model._meta.related_objects:
+        related_model = relation.related_model
+        if relation.many_to_many:
+            # Only the link rows go; they live in the through table
+            through = relation.through
+            if not through._meta.auto_created:
+                continue
+            field = next(f for f in through._meta.fields if f.related_model is model)
+            effect, related_model, lookup = 'deleted', through, f'{field.name}__{path}'
+        else:
+            effect = _relation_effect(relation.on_delete)
+            lookup = f'{relation.field.name}__{path}'
+        if effect is None or related_model in seen:
+            continue
+
+        count = related_model._base_manager.filter(**{f'{lookup}__in': user_ids}).count()
+        if not count:
+            continue
+        label = related_model._meta.label
+        counts.setdefault(label, {})
+        counts[label][effect] = counts[label].get(effect, 0) + count
+
+        if effect == 'deleted' and depth > 1:
+            _count_relations(related_model, lookup, user_ids, counts, depth - 1, seen | {related_model})
+
+
+def deletion_preview(user_ids):
+    """
+    Count the rows deleting ``user_ids`` would delete, update or be blocked by.
+
+    Returns:
+        ``{'users': n, 'related': {'app.Model': {'deleted'|'updated'|'blocking': n}},
+        'rows_deleted': n}``
+    """
+    user_ids = list(user_ids)
+    related = {}
+    # Forward many-to-many (groups, permissions) link rows
+    for field in User._meta.many_to_many:
+        through = field.remote_field.through
+        count = through._base_manager.filter(**{f'{field.m2m_field_name()}__in': user_ids}).count()
+        if count:
+            related[through._meta.label] = {'deleted': count}
+    _count_relations(User, 'id', user_ids, related, PREVIEW_DEPTH, {User})
+
+    users = User.objects.filter(id__in=user_ids).count()
+    return {
+        'users': users,
+        'related': related,
+        'rows_deleted': users + sum(effects.get('deleted', 0) for effects in related.values()),
+    }
+
+
+def delete_users(user_ids, actor=None, request=None, batch_size=None, on_progress=None):
+    """
+    Delete ``user_ids`` in batches, one transaction per batch.
+
+    A failure leaves earlier batches deleted; running again with the same ids
+    finishes the job. ``on_progress(done, total)`` is called after each batch.
+
+    Returns:
+        ``{'deleted_users': n, 'deleted': {'app.Model': n}}``
+    """
+    from apps.analytics.utils import aggregate_events
+
+    batch_size = batch_size or settings.USER_BULK_DELETE_BATCH_SIZE
+    user_ids = sorted(set(User.objects.filter(id__in=list(user_ids)).values_list('id', flat=True)))
+    deleted = {}
+
+    with aggregate_events(user=actor, request=request, bulk_operation='bulk_delete_users'):
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            with transaction.atomic():
+                _, per_model = User.objects.filter(id__in=batch).delete()
+            for label, count in per_model.items():
+                deleted[label] = deleted.get(label, 0) + count
+            if on_progress:
+                on_progress(start + len(batch), len(user_ids))
+
+    return {'deleted_users': deleted.get(User._meta.label, 0), 'deleted': deleted}
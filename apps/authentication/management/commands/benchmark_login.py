@@ -0,0 +1,97 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.authentication.models import User
+
+BENCHMARK_EMAIL = 'login-benchmark@example.invalid'
+BENCHMARK_PASSWORD = 'login-benchmark-password'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput and password hashes per login on the token and login endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help='Logins per scenario (default: 20)')
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Concurrent logins, as during a check-in rush (default: 1)',
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        user, created = User.objects.get_or_create(
+            email=BENCHMARK_EMAIL,
+            defaults={'username': BENCHMARK_EMAIL, 'first_name': 'Login', 'last_name': 'Benchmark', 'role': 'Member'},
+        )
+        if created or not user.check_password(BENCHMARK_PASSWORD):
+            user.set_password(BENCHMARK_PASSWORD)
+            user.save()
+
+        threads = options['threads']
+        if threads > 1 and connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite serializes writes; running logins one at a time'))
+            threads = 1
+
+        scenarios = {
+            'token: valid': ('/api/auth/token/', BENCHMARK_EMAIL, BENCHMARK_PASSWORD),
+            'token: wrong password': ('/api/auth/token/', BENCHMARK_EMAIL, 'wrong-password'),
+            'token: unknown email': ('/api/auth/token/', 'nobody@example.invalid', BENCHMARK_PASSWORD),
+            'login: valid': ('/api/auth/login/', BENCHMARK_EMAIL, BENCHMARK_PASSWORD),
+            'login: wrong password': ('/api/auth/login/', BENCHMARK_EMAIL, 'wrong-password'),
+        }
+
+        results = {}
+        for name, (path, email, password) in scenarios.items():
+            # Measure the login path itself, not the rate limiter in front of it
+            with override_settings(RATE_LIMIT_ENABLED=False):
+                results[name] = self.measure(path, email, password, options['count'], threads)
+            self.stdout.write(
+                f"{name:<24} status {results[name]['status']}  "
+                f"{results[name]['hashes_per_login']:.1f} hashes/login  "
+                f"median {results[name]['median_ms']:>7.1f} ms  "
+                f"{results[name]['logins_per_second']:>6.1f} logins/s"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'hasher': get_hasher().algorithm, 'threads': threads, 'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def measure(path, email, password, count, threads):
+        def login():
+            # Through the full middleware stack, as a real client would
+            client = APIClient()
+            start = time.perf_counter()
+            response = client.post(path, {'email': email, 'password': password}, format='json')
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        # Every hash, verification or dummy, goes through the hasher's encode()
+        hasher_class = type(get_hasher())
+        with mock.patch.object(hasher_class, 'encode', autospec=True, side_effect=hasher_class.encode) as encode:
+            start = time.perf_counter()
+            if threads > 1:
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    outcomes = list(executor.map(lambda _: login(), range(count)))
+            else:
+                outcomes = [login() for _ in range(count)]
+            elapsed = time.perf_counter() - start
+
+        timings = [timing for _, timing in outcomes]
+        return {
+            'status': outcomes[-1][0],
+            'hashes_per_login': encode.call_count / count,
+            'median_ms': round(statistics.median(timings), 2),
+            'logins_per_second': round(count / elapsed, 2),
+        }
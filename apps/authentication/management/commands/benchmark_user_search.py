@@ -0,0 +1,115 @@
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from apps.authentication.deletion import delete_users
+from apps.authentication.models import User
+from apps.authentication.search import search_terms, search_users
+from apps.authentication.statistics import invalidate_user_statistics
+
+FIRST_NAMES = [
+    'Ada', 'Adebayo', 'Amaka', 'Bola', 'Chidi', 'Chioma', 'David', 'Emeka', 'Esther', 'Funmi',
+    'Grace', 'Ibrahim', 'Ifeoma', 'John', 'Kemi', 'Mary', 'Ngozi', 'Olu', 'Peter', 'Ruth',
+    'Samuel', 'Tunde', 'Uche', 'Yemi', 'Zainab',
+]
+LAST_NAMES = [
+    'Adeyemi', 'Afolabi', 'Bello', 'Eze', 'Fashola', 'Lovelace', 'Nwosu', 'Obi', 'Ogunleye',
+    'Okafor', 'Okonkwo', 'Oladipo', 'Onyeka', 'Salami', 'Uzor', 'Welcome',
+]
+QUERIES = ['ada', 'okaf', 'grace ogun', 'tunde.b', '+234-803-1', '23480312', 'zainab salami', 'nomatch']
+
+BENCH_PREFIX = 'search-bench-'
+
+
+def naive_search(queryset, query):
+    """icontains across the searched columns, as a SearchFilter would run it."""
+    for term in search_terms(query):
+        queryset = queryset.filter(
+            Q(first_name__icontains=term) | Q(last_name__icontains=term)
+            | Q(email__icontains=term) | Q(phone_number__icontains=term)
+        )
+    return queryset.order_by('last_name', 'first_name', 'id')
+
+
+class Command(BaseCommand):
+    help = 'Time indexed user search against icontains scans over a large user directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000, help='Directory size to measure at (default: 100000)')
+        parser.add_argument(
+            '--generate',
+            action='store_true',
+            help='Top the user table up to --users with generated users (removed again with --cleanup)',
+        )
+        parser.add_argument('--cleanup', action='store_true', help='Delete generated users and exit')
+        parser.add_argument('--limit', type=int, default=25, help='Results fetched per search (default: 25)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query (default: 5)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed for generated users')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['cleanup']:
+            generated = User.objects.filter(username__startswith=BENCH_PREFIX).values_list('id', flat=True)
+            result = delete_users(generated, batch_size=5000)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {result['deleted_users']} generated users"))
+            return
+
+        existing = User.objects.count()
+        if options['generate'] and existing < options['users']:
+            self.generate(options['users'] - existing, options['seed'])
+        users = User.objects.count()
+        self.stdout.write(f'Measuring on {connection.vendor} with {users} users')
+
+        results = {'database': connection.vendor, 'users': users, 'queries': {}}
+        for query in QUERIES:
+            indexed = self.measure(lambda: search_users(User.objects.all(), query), options['limit'], options['repeat'])
+            naive = self.measure(lambda: naive_search(User.objects.all(), query), options['limit'], options['repeat'])
+            results['queries'][query] = {'indexed': indexed, 'icontains': naive}
+            self.stdout.write(
+                f"{query!r:<18} indexed {indexed['median_ms']:>8.2f} ms ({indexed['results']:>2} results)  "
+                f"icontains {naive['median_ms']:>8.2f} ms ({naive['results']:>2} results)"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    def generate(self, count, seed):
+        rng = random.Random(seed)
+        # Unusable passwords cost no hashing
+        password = make_password(None)
+        start = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        batch = []
+        for index in range(start, start + count):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            batch.append(User(
+                username=f'{BENCH_PREFIX}{index}',
+                email=f'{first}.{last}{index}@example.org'.lower(),
+                first_name=first,
+                last_name=last,
+                phone_number=f'+234-80{rng.randint(0, 9)}-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}',
+                password=password,
+            ))
+            if len(batch) == 5000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        # bulk_create sends no post_save, so the cached statistics go stale
+        invalidate_user_statistics()
+        self.stdout.write(self.style.SUCCESS(f'Generated {count} users'))
+
+    @staticmethod
+    def measure(search, limit, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            found = list(search()[:limit])
+            timings.append((time.perf_counter() - start) * 1000)
+        return {'median_ms': round(statistics.median(timings), 3), 'results': len(found)}
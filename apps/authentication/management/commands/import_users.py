@@ -0,0 +1,55 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.authentication.imports import import_users, parse_user_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk-create users from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (with a header row) or JSON file of users')
+        parser.add_argument('--format', choices=['csv', 'json'], help='File format (default: from the file extension)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Password hashing processes (default: USER_IMPORT_HASH_WORKERS, 0 = all CPUs)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT (default: 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; create nothing')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options['format'] or ('json' if path.lower().endswith('.json') else 'csv')
+        try:
+            with open(path, 'rb') as handle:
+                rows = parse_user_rows(handle.read(), format)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Could not read {path}: {exc}')
+
+        self.stdout.write(f'Importing {len(rows)} users from {path}...')
+        start = time.perf_counter()
+        result = import_users(
+            rows,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+        )
+        elapsed = time.perf_counter() - start
+
+        for error in result['errors'][:20]:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {json.dumps(error['errors'])}"))
+        if len(result['errors']) > 20:
+            self.stdout.write(self.style.WARNING(f"... and {len(result['errors']) - 20} more invalid rows"))
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f"{result['would_create']} users valid, {result['skipped']} invalid ({elapsed:.2f}s)"
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Created {result['created']} users, skipped {result['skipped']} in {elapsed:.2f}s"
+            ))
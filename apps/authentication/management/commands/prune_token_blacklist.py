@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.authentication.blacklist import prune_token_blacklist
+
+
+class Command(BaseCommand):
+    help = 'Delete outstanding and blacklisted refresh tokens that have expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.TOKEN_BLACKLIST_PRUNE_BATCH_SIZE,
+            help='Tokens deleted per statement (default: TOKEN_BLACKLIST_PRUNE_BATCH_SIZE)',
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune_token_blacklist(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired refresh tokens'))
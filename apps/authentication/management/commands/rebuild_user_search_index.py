@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.authentication.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Refill the SQLite user search index from the user table'
+
+    def handle(self, *args, **options):
+        indexed = rebuild_search_index()
+        if indexed is None:
+            self.stdout.write(f'Nothing to rebuild: {connection.vendor} maintains the search indexes itself')
+            return
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} users'))
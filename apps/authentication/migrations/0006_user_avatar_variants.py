@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:00
+
+import apps.authentication.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0005_alter_user_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_medium',
+            field=models.ImageField(blank=True, help_text='Medium square avatar variant for profiles', null=True, upload_to=apps.authentication.models.user_avatar_path),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_pending',
+            field=models.CharField(blank=True, help_text='Uploaded avatar awaiting processing', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='avatar_small',
+            field=models.ImageField(blank=True, help_text='Small square avatar variant for lists', null=True, upload_to=apps.authentication.models.user_avatar_path),
+        ),
+    ]
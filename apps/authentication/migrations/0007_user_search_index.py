@@ -0,0 +1,96 @@
+from django.db import migrations
+
+# The SQL is a frozen copy of apps.authentication.search as of this
+# migration, so later changes to that module cannot alter what it installs
+
+PHONE_DIGITS_SQL = (
+    "replace(replace(replace(replace(replace(replace({column}, '+', ''), '-', ''), "
+    "' ', ''), '(', ''), ')', ''), '.', '')"
+)
+
+SQLITE_ROW_SQL = (
+    "{prefix}first_name || ' ' || {prefix}last_name, {prefix}email, "
+    "{prefix}phone_number || ' ' || " + PHONE_DIGITS_SQL.format(column='{prefix}phone_number')
+)
+
+POSTGRES_DIGITS_SQL = r"regexp_replace(phone_number, '\D', '', 'g')"
+
+POSTGRES_COLUMNS = ('first_name', 'last_name', 'email', 'phone_number')
+
+
+def sqlite_install(table):
+    search_table = f'{table}_search'
+    new_row = SQLITE_ROW_SQL.format(prefix='new.')
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} USING fts5("
+        f"name, email, phone, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_insert AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {search_table}(rowid, name, email, phone) VALUES (new.id, {new_row}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_update AFTER UPDATE OF "
+        f"first_name, last_name, email, phone_number ON {table} BEGIN "
+        f"DELETE FROM {search_table} WHERE rowid = old.id; "
+        f"INSERT INTO {search_table}(rowid, name, email, phone) VALUES (new.id, {new_row}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {search_table}_delete AFTER DELETE ON {table} BEGIN "
+        f"DELETE FROM {search_table} WHERE rowid = old.id; END",
+        f"DELETE FROM {search_table}",
+        f"INSERT INTO {search_table}(rowid, name, email, phone) "
+        f"SELECT id, {SQLITE_ROW_SQL.format(prefix='')} FROM {table}",
+    ]
+
+
+def sqlite_uninstall(table):
+    search_table = f'{table}_search'
+    return [
+        f"DROP TRIGGER IF EXISTS {search_table}_insert",
+        f"DROP TRIGGER IF EXISTS {search_table}_update",
+        f"DROP TRIGGER IF EXISTS {search_table}_delete",
+        f"DROP TABLE IF EXISTS {search_table}",
+    ]
+
+
+def postgres_install(table):
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        *(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm ON {table} "
+            f"USING gin (UPPER({column}::text) gin_trgm_ops)"
+            for column in POSTGRES_COLUMNS
+        ),
+        f"CREATE INDEX IF NOT EXISTS {table}_phone_digits_trgm ON {table} "
+        f"USING gin (({POSTGRES_DIGITS_SQL}) gin_trgm_ops)",
+    ]
+
+
+def postgres_uninstall(table):
+    return [
+        f"DROP INDEX IF EXISTS {table}_{column}_trgm"
+        for column in (*POSTGRES_COLUMNS, 'phone_digits')
+    ]
+
+
+def _run(apps, schema_editor, statements_by_vendor):
+    statements = statements_by_vendor.get(schema_editor.connection.vendor)
+    if statements is None:
+        return
+    table = apps.get_model('authentication', 'User')._meta.db_table
+    for statement in statements(table):
+        schema_editor.execute(statement, params=None)
+
+
+def install(apps, schema_editor):
+    _run(apps, schema_editor, {'sqlite': sqlite_install, 'postgresql': postgres_install})
+
+
+def uninstall(apps, schema_editor):
+    _run(apps, schema_editor, {'sqlite': sqlite_uninstall, 'postgresql': postgres_uninstall})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0006_user_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_user_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingUserImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rows', models.JSONField(help_text='Parsed import rows, including passwords')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'pending_user_imports',
+            },
+        ),
+    ]
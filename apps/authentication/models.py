@@ -86,6 +86,28 @@ class User(AbstractUser):
         help_text="User profile picture/avatar"
     )
     
+    # Resized avatar variants, written by the avatar processing job
+    avatar_small = models.ImageField(
+        upload_to=user_avatar_path,
+        null=True,
+        blank=True,
+        help_text="Small square avatar variant for lists"
+    )
+    
+    avatar_medium = models.ImageField(
+        upload_to=user_avatar_path,
+        null=True,
+        blank=True,
+        help_text="Medium square avatar variant for profiles"
+    )
+    
+    # Storage path of an uploaded avatar still being processed
+    avatar_pending = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Uploaded avatar awaiting processing"
+    )
+    
     # User settings (JSON field for storing user preferences)
     settings = models.JSONField(
         default=dict,
@@ -180,3 +202,26 @@ class User(AbstractUser):
         if not self.username:
             self.username = self.email
         super().save(*args, **kwargs)
+
+
+class PendingUserImport(models.Model):
+    """
+    Parsed rows of a user import waiting for its background job.
+
+    The rows hold plain-text passwords, so they are kept out of the job's
+    payload (shown in the admin) and deleted by the job as soon as it reads
+    them, or when the job fails.
+    """
+
+    rows = models.JSONField(help_text="Parsed import rows, including passwords")
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'pending_user_imports'
@@ -0,0 +1,116 @@
+"""
+Indexed user directory search.
+
+Terms match the start of a word in the first or last name, the email address
+or the phone number (as typed, or as bare digits). Every whitespace-separated
+term must match, so ``"ada lov"`` finds Ada Lovelace.
+
+The index depends on the database backend:
+
+* SQLite -- an FTS5 table (``users_search``) keyed by user id,
+  filled and kept in sync by triggers on the ``users`` table. Triggers see
+  every write, including ``bulk_create`` and queryset ``update()``.
+* PostgreSQL -- ``pg_trgm`` GIN indexes on the searched columns, which serve
+  the ``LIKE 'term%'`` filters directly. These match the start of each
+  column rather than of each word.
+
+Other backends fall back to unindexed prefix filters. The index is created
+by migration ``0007_user_search_index`` (changing it needs a new migration);
+``rebuild_user_search_index`` refills the SQLite table if it ever drifts.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import F, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import User
+
+USER_TABLE = User._meta.db_table
+SEARCH_TABLE = f'{USER_TABLE}_search'
+
+# The columns the 0007 triggers index for a row. Phone numbers are also
+# indexed as digits only, so "0803 123" and "0803123" both match "0803-123-4567"
+SQLITE_ROW_SQL = (
+    "first_name || ' ' || last_name, email, phone_number || ' ' || "
+    "replace(replace(replace(replace(replace(replace(phone_number, '+', ''), '-', ''), "
+    "' ', ''), '(', ''), ')', ''), '.', '')"
+)
+
+SQLITE_REBUILD = [
+    f"DELETE FROM {SEARCH_TABLE}",
+    f"INSERT INTO {SEARCH_TABLE}(rowid, name, email, phone) SELECT id, {SQLITE_ROW_SQL} FROM {USER_TABLE}",
+]
+
+
+def rebuild_search_index():
+    """Refill the SQLite search table from the ``users`` table; returns rows indexed."""
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        for statement in SQLITE_REBUILD:
+            cursor.execute(statement)
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def search_terms(query):
+    """The whitespace-separated terms of ``query`` that hold a word character (at most eight)."""
+    return [term for term in (query or '').split() if re.search(r'\w', term)][:8]
+
+
+def fts_query(terms):
+    """
+    FTS5 MATCH expression requiring every term as a word prefix.
+
+    Each term is a quoted phrase with a trailing ``*``: FTS5 splits it like
+    the indexed text, so ``ada.lov@ex`` must match the words ``ada``, ``lov``
+    and ``ex*`` in sequence, and anything a user types is taken literally.
+    """
+    return ' AND '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def _prefix_filter(term, digits_expression):
+    condition = (
+        Q(first_name__istartswith=term)
+        | Q(last_name__istartswith=term)
+        | Q(email__istartswith=term)
+        | Q(phone_number__istartswith=term)
+    )
+    digits = re.sub(r'\D', '', term)
+    if digits and digits_expression is not None:
+        condition |= Q(phone_digits__startswith=digits)
+    return condition
+
+
+def search_users(queryset, query):
+    """
+    Restrict a ``User`` queryset to the users matching ``query``.
+
+    Returns the queryset unchanged for a blank query, and ordered by last and
+    first name otherwise. A query without any searchable term matches nobody.
+    """
+    if not (query or '').strip():
+        return queryset
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    if connection.vendor == 'sqlite':
+        matches = RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+            [fts_query(terms)],
+        )
+        queryset = queryset.filter(id__in=matches)
+    else:
+        digits_expression = None
+        if connection.vendor == 'postgresql':
+            digits_expression = Func(
+                F('phone_number'), Value(r'\D'), Value(''), Value('g'), function='regexp_replace',
+            )
+            queryset = queryset.annotate(phone_digits=digits_expression)
+        for term in terms:
+            queryset = queryset.filter(_prefix_filter(term, digits_expression))
+
+    return queryset.order_by('last_name', 'first_name', 'id')
@@ -5,9 +5,12 @@ Handles user registration, login, profile management with role-based validation.
 
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
-from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .avatars import avatar_url
+from .backends import authenticate_login
+from .blacklist import PrefilteredRefreshToken
 from .models import User
 
 
@@ -83,16 +86,7 @@ class UserLoginSerializer(serializers.Serializer):
         password = attrs.get('password')
         
         if email_or_username and password:
-            # Try to authenticate with username first
-            user = authenticate(username=email_or_username, password=password)
-            
-            if not user:
-                # Try with email if username authentication failed
-                try:
-                    user_obj = User.objects.get(email=email_or_username)
-                    user = authenticate(username=user_obj.username, password=password)
-                except User.DoesNotExist:
-                    pass
+            user = authenticate_login(self.context.get('request'), email_or_username, password)
             
             if not user:
                 raise serializers.ValidationError(
@@ -121,6 +115,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
         read_only=True
     )
     avatar_url = serializers.SerializerMethodField()
+    avatar_small_url = serializers.SerializerMethodField()
+    avatar_medium_url = serializers.SerializerMethodField()
+    avatar_processing = serializers.SerializerMethodField()
     is_deacon = serializers.SerializerMethodField()
     full_name = serializers.SerializerMethodField()
     current_allocation = serializers.SerializerMethodField()
@@ -131,19 +128,27 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'username', 'email', 'first_name', 'last_name', 'full_name',
             'phone_number', 'role', 'service_unit', 'service_unit_name',
-            'is_deacon', 'avatar', 'avatar_url', 'date_joined',
+            'is_deacon', 'avatar', 'avatar_url', 'avatar_small_url', 'avatar_medium_url',
+            'avatar_processing', 'date_joined',
             'last_login', 'created_at', 'updated_at', 'current_allocation', 'allocation_count'
         )
         read_only_fields = ('id', 'username', 'date_joined', 'last_login', 'created_at', 'updated_at')
     
     def get_avatar_url(self, obj):
-        """Get avatar URL if avatar exists."""
-        if obj.avatar:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.avatar.url)
-            return obj.avatar.url
-        return None
+        """Get avatar URL: the medium variant, or the original until it exists."""
+        return avatar_url(self.context.get('request'), obj.avatar_medium or obj.avatar)
+    
+    def get_avatar_small_url(self, obj):
+        """Get the small avatar variant URL."""
+        return avatar_url(self.context.get('request'), obj.avatar_small)
+    
+    def get_avatar_medium_url(self, obj):
+        """Get the medium avatar variant URL."""
+        return avatar_url(self.context.get('request'), obj.avatar_medium)
+    
+    def get_avatar_processing(self, obj):
+        """Whether a newly uploaded avatar is still being resized."""
+        return bool(obj.avatar_pending)
     
     def get_is_deacon(self, obj):
         """Check if user is a deacon."""
@@ -186,9 +191,9 @@ class UserProfileSerializer(serializers.ModelSerializer):
     def validate_service_unit(self, value):
         """Validate service unit assignment based on user role."""
         user = self.instance
-        if user and user.role == 'ServiceUnitAdmin' and not value:
+        if user and user.role == 'Deacon' and not value:
             raise serializers.ValidationError(
-                "Service Unit Admins must be assigned to a service unit."
+                "Deacons must be assigned to a service unit."
             )
         return value
 
@@ -263,12 +268,12 @@ class UserCreateUpdateSerializer(serializers.ModelSerializer):
             )
         
         # Role-based validation
-        role = attrs.get('role')
-        service_unit = attrs.get('service_unit')
+        role = attrs.get('role', getattr(self.instance, 'role', None))
+        service_unit = attrs.get('service_unit', getattr(self.instance, 'service_unit', None))
         
-        if role == 'ServiceUnitAdmin' and not service_unit:
+        if role == 'Deacon' and not service_unit:
             raise serializers.ValidationError(
-                {"service_unit": "Service Unit Admins must be assigned to a service unit."}
+                {"service_unit": "Deacons must be assigned to a service unit."}
             )
         
         return attrs
@@ -326,14 +331,14 @@ class UserListSerializer(serializers.ModelSerializer):
         )
     
     def get_avatar_url(self, obj):
-        """Get avatar URL if avatar exists."""
-        if obj.avatar:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(obj.avatar.url)
-            return obj.avatar.url
-        return None
+        """Get avatar URL: the small variant, or the original until it exists."""
+        return avatar_url(self.context.get('request'), obj.avatar_small or obj.avatar)
     
     def get_is_deacon(self, obj):
         """Check if user is a deacon."""
         return obj.role == 'Deacon'
+
+
+class PrefilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    """Token refresh whose blacklist lookup is skipped for tokens the Bloom filter rules out."""
+    token_class = PrefilteredRefreshToken
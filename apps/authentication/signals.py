@@ -0,0 +1,55 @@
+"""
+Cache invalidation for the authenticated-user snapshots
+(``apps.authentication.authentication``) and the user statistics
+(``apps.authentication.statistics``).
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from apps.service_units.models import ServiceUnit
+
+from .authentication import invalidate_auth_user
+from .models import User
+from .statistics import STATISTICS_FIELDS, invalidate_user_statistics
+
+
+def _affects_statistics(update_fields):
+    # Logins save last_login only
+    return update_fields is None or bool(STATISTICS_FIELDS & set(update_fields))
+
+
+@receiver(pre_save, sender=User)
+def remember_statistics_unit(sender, instance, update_fields=None, **kwargs):
+    if instance.pk and _affects_statistics(update_fields):
+        instance._statistics_previous_unit = (
+            sender.objects.filter(pk=instance.pk).values_list('service_unit_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created:
+        invalidate_auth_user(instance.id)
+    if created or _affects_statistics(update_fields):
+        invalidate_user_statistics([
+            instance.service_unit_id,
+            getattr(instance, '_statistics_previous_unit', None),
+        ])
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_delete(sender, instance, **kwargs):
+    invalidate_auth_user(instance.id)
+    invalidate_user_statistics([instance.service_unit_id])
+
+
+@receiver(post_save, sender=ServiceUnit)
+@receiver(pre_delete, sender=ServiceUnit)
+def invalidate_service_unit_members(sender, instance, **kwargs):
+    # Snapshots carry the unit name. Deleting the unit nulls service_unit_id
+    # with a queryset update that sends no User signals, so collect the
+    # members before it runs
+    invalidate_auth_user(*User.objects.filter(service_unit=instance).values_list('id', flat=True))
+    # The global distribution lists units by name
+    invalidate_user_statistics([instance.id])
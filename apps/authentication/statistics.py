@@ -0,0 +1,90 @@
+"""
+User statistics for the admin stats page.
+
+The figures for a scope (every user, or one service unit's members) come from
+one conditional-aggregate query, plus one GROUP BY for the service unit
+distribution in the global scope. They are cached under a plain per-scope key,
+so a cached page costs a single cache read. ``apps.authentication.signals``
+deletes the affected scopes when a user's role, status, unit or join date
+changes. ``recent_registrations`` counts a rolling 30 days and only moves on
+change or expiry (``USER_STATISTICS_CACHE_TTL``). Those deletes only reach
+other workers through a shared cache, so with a per-process one the figures
+are computed on every request.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.core.cache import cache_is_shared
+
+from .models import User
+
+STATISTICS_NAMESPACE = 'user-statistics'
+
+# Fields whose change moves a figure; saves touching only others keep the cache
+STATISTICS_FIELDS = {'role', 'is_active', 'service_unit', 'service_unit_id', 'date_joined'}
+
+
+def statistics_cache_key(service_unit_id=None):
+    scope = 'all' if service_unit_id is None else f'unit:{service_unit_id}'
+    return f'{STATISTICS_NAMESPACE}:{scope}'
+
+
+def invalidate_user_statistics(service_unit_ids=()):
+    """Drop the global statistics and those of ``service_unit_ids``."""
+    keys = [statistics_cache_key()]
+    keys += [statistics_cache_key(unit_id) for unit_id in set(service_unit_ids) - {None}]
+    cache.delete_many(keys)
+
+
+def compute_user_statistics(service_unit_id=None):
+    """Statistics for every user, or for the members of ``service_unit_id``."""
+    queryset = User.objects.all()
+    if service_unit_id is not None:
+        queryset = queryset.filter(service_unit_id=service_unit_id)
+
+    roles = User.RoleChoices.values
+    totals = queryset.aggregate(
+        total_users=Count('id'),
+        active_users=Count('id', filter=Q(is_active=True)),
+        recent_registrations=Count('id', filter=Q(date_joined__gte=timezone.now() - timedelta(days=30))),
+        **{f'role_{role}': Count('id', filter=Q(role=role)) for role in roles},
+    )
+
+    service_unit_stats = []
+    if service_unit_id is None:
+        service_unit_stats = [
+            {'name': item['service_unit__name'], 'count': item['count']}
+            for item in (
+                queryset.exclude(service_unit__isnull=True)
+                .values('service_unit__name')
+                .annotate(count=Count('id'))
+                .order_by('-count')
+            )
+        ]
+
+    return {
+        'total_users': totals['total_users'],
+        'active_users': totals['active_users'],
+        'inactive_users': totals['total_users'] - totals['active_users'],
+        'recent_registrations': totals['recent_registrations'],
+        'role_distribution': {role: totals[f'role_{role}'] for role in roles if totals[f'role_{role}']},
+        'service_unit_distribution': service_unit_stats,
+    }
+
+
+def get_user_statistics(service_unit_id=None):
+    """Cached ``compute_user_statistics`` for the scope."""
+    if not cache_is_shared():
+        # Other workers would never see this worker's invalidations
+        return compute_user_statistics(service_unit_id)
+    key = statistics_cache_key(service_unit_id)
+    statistics = cache.get(key)
+    if statistics is None:
+        statistics = compute_user_statistics(service_unit_id)
+        cache.set(key, statistics, settings.USER_STATISTICS_CACHE_TTL)
+    return statistics
@@ -0,0 +1,74 @@
+"""
+Background job handlers for the authentication app.
+Executed by the ``process_jobs`` worker (see apps/core/jobs.py).
+"""
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.core.jobs import PermanentJobError, register_job
+from .avatars import AvatarProcessingError, discard_files, process_avatar
+from .blacklist import prune_token_blacklist
+from .deletion import delete_users
+from .imports import import_users
+from .models import PendingUserImport, User
+
+
+@register_job('authentication.prune_token_blacklist')
+def prune_token_blacklist_job(job, batch_size=None):
+    """Delete expired outstanding/blacklisted refresh tokens (schedule daily via cron or enqueue)."""
+    return {'deleted': prune_token_blacklist(batch_size or settings.TOKEN_BLACKLIST_PRUNE_BATCH_SIZE)}
+
+
+@register_job('authentication.bulk_delete_users')
+def bulk_delete_users_job(job, user_ids, actor_id=None, batch_size=None):
+    """Delete users in batches, reporting ``done``/``total`` progress (safe to retry)."""
+    actor = User.objects.filter(id=actor_id).first() if actor_id else None
+    return delete_users(
+        user_ids,
+        actor=actor,
+        batch_size=batch_size,
+        on_progress=lambda done, total: job.set_progress(done=done, total=total),
+    )
+
+
+def _discard_import_rows(job, exc):
+    """Drop the rows of an import that failed before reading them."""
+    PendingUserImport.objects.filter(pk=job.payload.get('batch_id')).delete()
+
+
+# A retry would report the rows the first attempt created as duplicates
+@register_job('authentication.import_users', max_attempts=1, on_failure=_discard_import_rows)
+def import_users_job(job, batch_id, actor_id=None):
+    """Create users from a pending import's rows, reporting hashing ``done``/``total`` progress."""
+    # The rows carry plain-text passwords; take them out of the table first
+    with transaction.atomic():
+        batch = PendingUserImport.objects.select_for_update().filter(pk=batch_id).first()
+        if batch is None:
+            raise PermanentJobError(f'Pending import {batch_id} no longer exists')
+        rows = batch.rows
+        batch.delete()
+
+    actor = User.objects.filter(id=actor_id).first() if actor_id else None
+    return import_users(
+        rows,
+        created_by=actor,
+        on_progress=lambda done, total: job.set_progress(done=done, total=total),
+    )
+
+
+def _discard_failed_avatar(job, exc):
+    """Drop an upload that could not be processed, unless a newer one replaced it."""
+    upload = job.payload.get('upload_path')
+    User.objects.filter(pk=job.payload.get('user_id'), avatar_pending=upload).update(avatar_pending='')
+    discard_files([upload])
+
+
+@register_job('authentication.process_avatar', on_failure=_discard_failed_avatar)
+def process_avatar_job(job, user_id, upload_path):
+    """Resize an uploaded avatar into its variants and swap them in."""
+    try:
+        paths = process_avatar(user_id, upload_path)
+    except AvatarProcessingError as exc:
+        raise PermanentJobError(str(exc))
+    return {'superseded': paths is None, 'paths': paths}
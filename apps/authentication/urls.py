@@ -28,6 +28,10 @@ urlpatterns = [
     path('users/', views.UserListCreateView.as_view(), name='user_list_create'),
     path('users/<int:pk>/', views.UserDetailView.as_view(), name='user_detail'),
     path('users/statistics/', views.user_statistics_view, name='user_statistics'),
+    path('users/search/', views.user_search_view, name='user_search'),
     path('users/bulk-delete/', views.bulk_delete_users_view, name='bulk_delete_users'),
+    path('users/bulk-delete/<int:job_id>/', views.bulk_delete_status_view, name='bulk_delete_status'),
+    path('users/import/', views.import_users_view, name='import_users'),
+    path('users/import/<int:job_id>/', views.import_users_status_view, name='import_users_status'),
     path('users/<int:pk>/role/', views.update_user_role_view, name='update_user_role'),
 ]
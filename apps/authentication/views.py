@@ -3,20 +3,29 @@ Authentication API views for user management and JWT authentication.
 Provides endpoints for registration, login, profile management.
 """
 
-import os
 from rest_framework import status, generics, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth import login
+from django.contrib.auth.models import update_last_login
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.db import transaction
 from django.db.models import Q, Count
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.pagination import PageNumberPagination
 
-from .models import User
+from .avatars import discard_files, store_avatar_upload
+from .blacklist import PrefilteredRefreshToken
+from .deletion import delete_users, deletion_preview
+from .imports import import_users, parse_user_rows
+from .models import PendingUserImport, User
+from .search import search_users
+from .statistics import get_user_statistics
 from .serializers import (
     UserRegistrationSerializer,
     UserLoginSerializer,
@@ -26,6 +35,10 @@ from .serializers import (
     UserCreateUpdateSerializer
 )
 from apps.analytics.utils import EventLogger, EventType
+from apps.core.jobs import enqueue
+from apps.core.models import BackgroundJob
+from apps.core.permissions import ALL, can, scope_for, scope_queryset
+from apps.core.ratelimit import LoginRateThrottle, RegistrationRateThrottle
 
 
 class UserPagination(PageNumberPagination):
@@ -35,23 +48,41 @@ class UserPagination(PageNumberPagination):
     max_page_size = 100
 
 
+def issue_tokens(user):
+    """JWT refresh/access pair for ``user``."""
+    refresh = PrefilteredRefreshToken.for_user(user)
+    if jwt_settings.UPDATE_LAST_LOGIN:
+        update_last_login(None, user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
 class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Custom JWT token view that includes user data in the response.
+    Authenticates through UserLoginSerializer, like UserLoginView, so each
+    login costs a single password hash.
     """
+    throttle_classes = [LoginRateThrottle]
+    
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        serializer = UserLoginSerializer(data=request.data, context={'request': request})
         
-        if response.status_code == 200:
-            # Get user data to include in response
-            serializer = UserLoginSerializer(data=request.data)
-            if serializer.is_valid():
-                user = serializer.validated_data['user']
-                user_data = UserProfileSerializer(user).data
-                
-                response.data['user'] = user_data
+        if not serializer.is_valid():
+            if 'non_field_errors' in serializer.errors:
+                # Same response as simplejwt for bad credentials
+                return Response({
+                    'detail': 'No active account found with the given credentials'
+                }, status=status.HTTP_401_UNAUTHORIZED)
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        return response
+        user = serializer.validated_data['user']
+        return Response({
+            **issue_tokens(user),
+            'user': UserProfileSerializer(user).data,
+        }, status=status.HTTP_200_OK)
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -62,6 +93,7 @@ class UserRegistrationView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegistrationRateThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -70,7 +102,7 @@ class UserRegistrationView(generics.CreateAPIView):
         user = serializer.save()
         
         # Generate JWT tokens for the new user
-        refresh = RefreshToken.for_user(user)
+        refresh = PrefilteredRefreshToken.for_user(user)
         
         return Response({
             'message': 'User registered successfully',
@@ -88,9 +120,10 @@ class UserLoginView(APIView):
     POST /api/auth/login/
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginRateThrottle]
     
     def post(self, request):
-        serializer = UserLoginSerializer(data=request.data)
+        serializer = UserLoginSerializer(data=request.data, context={'request': request})
         
         if serializer.is_valid():
             user = serializer.validated_data['user']
@@ -103,16 +136,10 @@ class UserLoginView(APIView):
                 success=True
             )
             
-            # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
-            
             return Response({
                 'message': 'Login successful',
                 'user': UserProfileSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+                'tokens': issue_tokens(user)
             }, status=status.HTTP_200_OK)
         
         # Log failed login attempt
@@ -175,11 +202,7 @@ class UserListCreateView(generics.ListCreateAPIView):
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = UserPagination
-    # Temporarily remove filter backends to debug
-    # filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    # filterset_fields = ['role', 'service_unit', 'is_active', 'is_service_unit_admin']
-    # search_fields = ['username', 'email', 'first_name', 'last_name', 'phone_number']
-    # ordering_fields = ['username', 'email', 'first_name', 'last_name', 'date_joined', 'role']
+    # ?search= goes through the user search index (apps/authentication/search.py)
     ordering = ['-date_joined']
     
     def get_serializer_class(self):
@@ -189,29 +212,16 @@ class UserListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Filter users based on requesting user's role."""
-        user = self.request.user
-        queryset = User.objects.all()
-        
-        if user.role == 'SuperAdmin':
-            # SuperAdmin can see all users
-            pass
-        elif user.role == 'ServiceUnitAdmin':
-            # ServiceUnitAdmin can see users in their service unit
-            if user.service_unit:
-                queryset = queryset.filter(service_unit=user.service_unit)
-            else:
-                queryset = queryset.none()
-        else:
-            # Regular users can't access user lists
-            queryset = queryset.none()
-        
-        return queryset.select_related('service_unit')
+        # SuperAdmin sees every user, a Deacon their service unit's members
+        queryset = scope_queryset(User.objects.all(), self.request.user, 'users').select_related('service_unit')
+        search = self.request.query_params.get('search')
+        if search:
+            return search_users(queryset, search)
+        return queryset.order_by(*self.ordering)
     
     def list(self, request, *args, **kwargs):
         """Check permissions before listing users."""
-        user = request.user
-        
-        if user.role not in ['SuperAdmin', 'ServiceUnitAdmin']:
+        if not can(request.user, 'users', 'view'):
             return Response({
                 'error': 'You do not have permission to view user lists'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -220,9 +230,7 @@ class UserListCreateView(generics.ListCreateAPIView):
     
     def create(self, request, *args, **kwargs):
         """Check permissions before creating users."""
-        user = request.user
-        
-        if user.role != 'SuperAdmin':
+        if not can(request.user, 'users', 'create'):
             return Response({
                 'error': 'Only SuperAdmin can create users'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -245,23 +253,11 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Filter users based on requesting user's role."""
-        user = self.request.user
-        
-        if user.role == 'SuperAdmin':
-            return User.objects.all()
-        elif user.role == 'ServiceUnitAdmin':
-            if user.service_unit:
-                return User.objects.filter(service_unit=user.service_unit)
-            else:
-                return User.objects.none()
-        else:
-            return User.objects.none()
+        return scope_queryset(User.objects.all(), self.request.user, 'users')
     
     def retrieve(self, request, *args, **kwargs):
         """Check permissions before retrieving user."""
-        user = request.user
-        
-        if user.role not in ['SuperAdmin', 'ServiceUnitAdmin']:
+        if not can(request.user, 'users', 'view'):
             return Response({
                 'error': 'You do not have permission to view user details'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -270,9 +266,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def update(self, request, *args, **kwargs):
         """Check permissions before updating user."""
-        user = request.user
-        
-        if user.role != 'SuperAdmin':
+        if not can(request.user, 'users', 'update'):
             return Response({
                 'error': 'Only SuperAdmin can update user details'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -281,9 +275,7 @@ class UserDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def destroy(self, request, *args, **kwargs):
         """Check permissions before deleting user."""
-        user = request.user
-        
-        if user.role != 'SuperAdmin':
+        if not can(request.user, 'users', 'delete'):
             return Response({
                 'error': 'Only SuperAdmin can delete users'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -299,54 +291,64 @@ def user_statistics_view(request):
     GET /api/auth/users/statistics/
     """
     user = request.user
+    scope = scope_for(user, 'users', 'statistics')
     
-    if user.role not in ['SuperAdmin', 'ServiceUnitAdmin']:
+    if scope is None:
         return Response({
             'error': 'You do not have permission to view user statistics'
         }, status=status.HTTP_403_FORBIDDEN)
     
-    # Base queryset based on user role
-    if user.role == 'SuperAdmin':
-        queryset = User.objects.all()
-    else:  # ServiceUnitAdmin
-        if user.service_unit:
-            queryset = User.objects.filter(service_unit=user.service_unit)
-        else:
-            queryset = User.objects.none()
-    
-    # Calculate statistics
-    total_users = queryset.count()
-    active_users = queryset.filter(is_active=True).count()
-    inactive_users = total_users - active_users
-    
-    # Users by role
-    role_stats = queryset.values('role').annotate(count=Count('role'))
-    role_distribution = {item['role']: item['count'] for item in role_stats}
-    
-    # Recent registrations (last 30 days)
-    from datetime import datetime, timedelta
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_registrations = queryset.filter(date_joined__gte=thirty_days_ago).count()
-    
-    # Service unit distribution (for SuperAdmin)
-    service_unit_stats = []
-    if user.role == 'SuperAdmin':
-        su_stats = queryset.exclude(service_unit__isnull=True)\
-                           .values('service_unit__name')\
-                           .annotate(count=Count('service_unit'))\
-                           .order_by('-count')
-        service_unit_stats = [
-            {'name': item['service_unit__name'], 'count': item['count']}
-            for item in su_stats
-        ]
+    # SuperAdmin sees every user, a Deacon their service unit's members
+    if scope == ALL:
+        return Response(get_user_statistics())
+    if user.service_unit_id:
+        return Response(get_user_statistics(user.service_unit_id))
+    
+    return Response({
+        'total_users': 0,
+        'active_users': 0,
+        'inactive_users': 0,
+        'recent_registrations': 0,
+        'role_distribution': {},
+        'service_unit_distribution': []
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def user_search_view(request):
+    """
+    API view for searching the user directory (admin only).
+    GET /api/auth/users/search/?q=<terms>&limit=<n>
+
+    Every term must prefix a name, the email or the phone number. Returns at
+    most USER_SEARCH_MAX_RESULTS users, ordered by name, without a count.
+    """
+    user = request.user
+    
+    if not can(user, 'users', 'view'):
+        return Response({
+            'error': 'You do not have permission to search users'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({
+            'error': 'q parameter is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        limit = int(request.query_params.get('limit', settings.USER_SEARCH_MAX_RESULTS))
+    except ValueError:
+        limit = settings.USER_SEARCH_MAX_RESULTS
+    limit = max(1, min(limit, settings.USER_SEARCH_MAX_RESULTS))
+    
+    queryset = search_users(scope_queryset(User.objects.all(), user, 'users'), query)
+    users = queryset.select_related('service_unit')[:limit]
     
     return Response({
-        'total_users': total_users,
-        'active_users': active_users,
-        'inactive_users': inactive_users,
-        'recent_registrations': recent_registrations,
-        'role_distribution': role_distribution,
-        'service_unit_distribution': service_unit_stats
+        'query': query,
+        'results': UserListSerializer(users, many=True, context={'request': request}).data,
     })
 
 
@@ -356,10 +358,13 @@ def bulk_delete_users_view(request):
     """
     API view for bulk deleting users (SuperAdmin only).
     POST /api/auth/users/bulk-delete/
+
+    ``preview: true`` returns the cascade counts without deleting. More than
+    USER_BULK_DELETE_SYNC_LIMIT users are deleted by a background job (202).
     """
     user = request.user
     
-    if user.role != 'SuperAdmin':
+    if not can(user, 'users', 'delete'):
         return Response({
             'error': 'Only SuperAdmin can perform bulk delete operations'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -371,22 +376,140 @@ def bulk_delete_users_view(request):
             'error': 'user_ids list is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
+    if not isinstance(user_ids, list) or not all(isinstance(user_id, int) for user_id in user_ids):
+        return Response({
+            'error': 'user_ids must be a list of user IDs'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
     # Prevent self-deletion
     if user.id in user_ids:
         return Response({
             'error': 'You cannot delete your own account'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    # Get users to delete
-    users_to_delete = User.objects.filter(id__in=user_ids)
-    deleted_count = users_to_delete.count()
+    # Report what would be deleted without deleting anything
+    if request.data.get('preview'):
+        return Response(deletion_preview(user_ids))
+    
+    # Large deletions run in the background, batch by batch
+    if len(user_ids) > settings.USER_BULK_DELETE_SYNC_LIMIT:
+        job = enqueue('authentication.bulk_delete_users', user_ids=user_ids, actor_id=user.id)
+        return Response({
+            'message': f'Deleting {len(user_ids)} users in the background',
+            'job_id': job.id,
+            'status_url': reverse('authentication:bulk_delete_status', args=[job.id]),
+            'preview': deletion_preview(user_ids),
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    result = delete_users(user_ids, actor=user, request=request)
+    
+    return Response({
+        'message': f"Successfully deleted {result['deleted_users']} users",
+        'deleted_count': result['deleted_users'],
+        'deleted': result['deleted'],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_delete_status_view(request, job_id):
+    """
+    API view for the progress of a background bulk delete (SuperAdmin only).
+    GET /api/auth/users/bulk-delete/<job_id>/
+    """
+    if not can(request.user, 'users', 'delete'):
+        return Response({
+            'error': 'Only SuperAdmin can view bulk delete operations'
+        }, status=status.HTTP_403_FORBIDDEN)
+    
+    job = get_object_or_404(BackgroundJob, id=job_id, name='authentication.bulk_delete_users')
+    
+    return Response({
+        'job_id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'result': job.result,
+        'error': job.last_error or None,
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def import_users_view(request):
+    """
+    API view for bulk importing users from CSV or JSON (SuperAdmin only).
+    POST /api/auth/users/import/
+
+    Accepts a multipart ``file`` upload or a JSON body with a ``users`` list;
+    ``dry_run`` validates without creating anyone. Otherwise the users are
+    created by a background job (202); poll its ``status_url`` for the result.
+    """
+    user = request.user
+
+    if not can(user, 'users', 'import'):
+        return Response({
+            'error': 'Only SuperAdmin can import users'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    upload = request.FILES.get('file')
+    try:
+        if upload is not None:
+            format = 'json' if upload.name.lower().endswith('.json') else 'csv'
+            rows = parse_user_rows(upload.read(), format)
+        else:
+            rows = request.data.get('users')
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                raise ValueError('Provide a file upload or a "users" list')
+    except (ValueError, UnicodeDecodeError) as e:
+        return Response({
+            'error': str(e)
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if not rows:
+        return Response({
+            'error': 'The import contains no users'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if len(rows) > settings.USER_IMPORT_MAX_ROWS:
+        return Response({
+            'error': f'Imports are limited to {settings.USER_IMPORT_MAX_ROWS} users; use the import_users command'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    if dry_run:
+        return Response(import_users(rows, created_by=user, request=request, dry_run=True))
+
+    # Password hashing takes minutes for large files, far past request timeouts.
+    # The rows hold plain-text passwords, so the job payload only names them
+    with transaction.atomic():
+        batch = PendingUserImport.objects.create(rows=rows, created_by=user)
+        job = enqueue('authentication.import_users', batch_id=batch.id, actor_id=user.id)
+    return Response({
+        'message': f'Importing {len(rows)} users in the background',
+        'job_id': job.id,
+        'status_url': reverse('authentication:import_users_status', args=[job.id]),
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def import_users_status_view(request, job_id):
+    """
+    API view for the progress and result of a background user import (SuperAdmin only).
+    GET /api/auth/users/import/<job_id>/
+    """
+    if not can(request.user, 'users', 'import'):
+        return Response({
+            'error': 'Only SuperAdmin can view user imports'
+        }, status=status.HTTP_403_FORBIDDEN)
     
-    # Delete users
-    users_to_delete.delete()
+    job = get_object_or_404(BackgroundJob, id=job_id, name='authentication.import_users')
     
     return Response({
-        'message': f'Successfully deleted {deleted_count} users',
-        'deleted_count': deleted_count
+        'job_id': job.id,
+        'status': job.status,
+        'progress': job.progress,
+        'result': job.result,
+        'error': job.last_error or None,
     })
 
 
@@ -399,7 +522,7 @@ def update_user_role_view(request, pk):
     """
     user = request.user
     
-    if user.role != 'SuperAdmin':
+    if not can(user, 'users', 'change_role'):
         return Response({
             'error': 'Only SuperAdmin can update user roles'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -437,7 +560,7 @@ def update_user_role_view(request, pk):
 class AvatarManagementView(APIView):
     """
     API view for managing user avatars.
-    POST /api/auth/profile/avatar/ - Upload avatar
+    POST /api/auth/profile/avatar/ - Upload avatar (resized in the background)
     DELETE /api/auth/profile/avatar/ - Remove avatar
     """
     permission_classes = [permissions.IsAuthenticated]
@@ -466,40 +589,35 @@ class AvatarManagementView(APIView):
                 'error': 'File size too large. Maximum size is 5MB.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Delete old avatar if exists
-        if user.avatar:
-            old_avatar_path = user.avatar.path
-            if os.path.exists(old_avatar_path):
-                os.remove(old_avatar_path)
-        
-        # Save new avatar
-        user.avatar = avatar_file
-        user.save()
+        # Store the upload as-is; the variants are built in the background
+        upload_path = store_avatar_upload(user, avatar_file)
+        enqueue('authentication.process_avatar', priority=5, user_id=user.id, upload_path=upload_path)
         
         # Return updated profile data
         serializer = UserProfileSerializer(user, context={'request': request})
         return Response({
-            'message': 'Avatar uploaded successfully',
+            'message': 'Avatar uploaded successfully, processing',
             'user': serializer.data
-        })
+        }, status=status.HTTP_202_ACCEPTED)
     
     def delete(self, request):
         """Remove user avatar."""
         user = request.user
         
-        if not user.avatar:
+        if not (user.avatar or user.avatar_pending):
             return Response({
                 'error': 'No avatar to remove'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Delete avatar file
-        avatar_path = user.avatar.path
-        if os.path.exists(avatar_path):
-            os.remove(avatar_path)
+        # Delete the avatar, its variants and any upload still processing
+        discard_files([
+            user.avatar.name, user.avatar_small.name, user.avatar_medium.name, user.avatar_pending,
+        ])
         
-        # Clear avatar field
-        user.avatar = None
-        user.save()
+        # Clear avatar fields; an upload still processing is dropped too
+        user.avatar = user.avatar_small = user.avatar_medium = None
+        user.avatar_pending = ''
+        user.save(update_fields=['avatar', 'avatar_small', 'avatar_medium', 'avatar_pending', 'updated_at'])
         
         # Return updated profile data
         serializer = UserProfileSerializer(user, context={'request': request})
@@ -519,7 +637,7 @@ def logout_view(request):
     try:
         refresh_token = request.data.get('refresh')
         if refresh_token:
-            token = RefreshToken(refresh_token)
+            token = PrefilteredRefreshToken(refresh_token)
             token.blacklist()
         
         return Response({
@@ -6,6 +6,8 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 
+from apps.core.permissions import can
+
 from .models import Building, Room, RoomPicture
 from .serializers import (
     BuildingSerializer, BuildingListSerializer, BuildingCreateUpdateSerializer,
@@ -37,7 +39,7 @@ class BuildingListCreateView(generics.ListCreateAPIView):
         return BuildingListSerializer
     
     def create(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can create buildings'}, 
                           status=status.HTTP_403_FORBIDDEN)
         return super().create(request, *args, **kwargs)
@@ -54,13 +56,13 @@ class BuildingDetailView(generics.RetrieveUpdateDestroyAPIView):
         return BuildingSerializer
     
     def update(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can update buildings'}, 
                           status=status.HTTP_403_FORBIDDEN)
         return super().update(request, *args, **kwargs)
     
     def destroy(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can delete buildings'}, 
                           status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
@@ -80,7 +82,7 @@ class RoomListCreateView(generics.ListCreateAPIView):
         return RoomListSerializer
     
     def create(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can create rooms'}, 
                           status=status.HTTP_403_FORBIDDEN)
         
@@ -108,13 +110,13 @@ class RoomDetailView(generics.RetrieveUpdateDestroyAPIView):
         return RoomSerializer
     
     def update(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can update rooms'}, 
                           status=status.HTTP_403_FORBIDDEN)
         return super().update(request, *args, **kwargs)
     
     def destroy(self, request, *args, **kwargs):
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'buildings', 'manage'):
             return Response({'error': 'Only SuperAdmin can delete rooms'}, 
                           status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
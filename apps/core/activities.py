@@ -0,0 +1,187 @@
+"""
+Dashboard activity feed selection and formatting.
+
+``FEED_RULES`` says which events each role's feed shows; the dashboard feed
+(``feed_filter``) and the live stream in ``apps.analytics.live``
+(``feed_includes``) both read it, so the two always agree.
+
+Each event type maps to one precompiled ``ActivityFormat`` (title, icon,
+priority and a description builder), so rendering a feed is a dict lookup per
+event. Descriptions only read ``event.user`` (load feeds with
+``select_related('user')``) and the already-decoded ``metadata`` dict.
+"""
+
+from collections import namedtuple
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
+
+from apps.analytics.models import EventType
+
+ActivityFormat = namedtuple('ActivityFormat', 'title icon priority describe')
+
+# everything: every event; unit: events in, or by a member of, the viewer's
+# service unit; own / about: events by / targeting the viewer; event_types:
+# these types whoever they concern
+FeedRule = namedtuple(
+    'FeedRule', 'everything unit own about event_types', defaults=(False, False, False, False, ()),
+)
+
+# Roles missing here get no activity
+FEED_RULES = {
+    'SuperAdmin': FeedRule(everything=True),
+    'Deacon': FeedRule(unit=True),
+    # Pastoral activity: new allocations and registrations, plus their own
+    'Pastor': FeedRule(own=True, event_types=(EventType.ALLOCATION_CREATE, EventType.USER_CREATE)),
+    'Member': FeedRule(own=True, about=True),
+}
+
+
+def feed_filter(role, user_id, service_unit_id):
+    """``Q`` over ``UserEvent`` selecting what ``role``'s feed shows, or None for nothing."""
+    rule = FEED_RULES.get(role)
+    if rule is None:
+        return None
+    if rule.everything:
+        return Q()
+    conditions = []
+    if rule.unit and service_unit_id:
+        conditions += [Q(service_unit_id=service_unit_id), Q(user__service_unit_id=service_unit_id)]
+    if rule.own:
+        conditions.append(Q(user_id=user_id))
+    if rule.about:
+        conditions.append(Q(target_user_id=user_id))
+    if rule.event_types:
+        conditions.append(Q(event_type__in=rule.event_types))
+    return reduce(or_, conditions) if conditions else None
+
+
+def feed_includes(role, user_id, service_unit_id, event):
+    """
+    Whether ``role``'s feed shows ``event``, a dict with ``event_type``,
+    ``user_id``, ``target_user_id``, ``service_unit_id`` and
+    ``user__service_unit_id``: ``feed_filter`` for one row in memory.
+    """
+    rule = FEED_RULES.get(role)
+    if rule is None:
+        return False
+    return bool(
+        rule.everything
+        or (rule.unit and service_unit_id and service_unit_id in (
+            event['service_unit_id'], event['user__service_unit_id'],
+        ))
+        or (rule.own and event['user_id'] == user_id)
+        or (rule.about and event['target_user_id'] == user_id)
+        or event['event_type'] in rule.event_types
+    )
+
+
+def _actor(event):
+    if event.user is None:
+        return 'System'
+    return f'{event.user.first_name} {event.user.last_name}'.strip() or event.user.username
+
+
+def _describe_login(event):
+    return f'{_actor(event)} logged into the system'
+
+
+def _describe_logout(event):
+    return f'{_actor(event)} logged out'
+
+
+def _describe_allocation(verb):
+    def describe(event):
+        metadata = event.metadata or {}
+        if 'room_number' not in metadata:
+            # Signal-logged allocations only carry ids
+            if event.resource_id is None:
+                return f'Room allocation {verb}'
+            return f'Room allocation #{event.resource_id} {verb}'
+        return f"Room {metadata['room_number']} in {metadata.get('building_name', 'Unknown Building')} allocation {verb}"
+    return describe
+
+
+def _describe_user_create(event):
+    summary = (event.metadata or {}).get('import_summary')
+    if summary:
+        return f"{summary.get('created', 0)} users imported by {_actor(event)}"
+    details = (event.metadata or {}).get('user_details', {})
+    name = details.get('username') or details.get('email') or 'A new user'
+    role = details.get('role') or 'user'
+    return f'{name} registered as a new {role}'
+
+
+def _describe_booking(event):
+    return f'New booking created by {_actor(event)}'
+
+
+def _describe_building(event):
+    metadata = event.metadata or {}
+    return f"{metadata.get('building_name') or metadata.get('name') or 'A building'} was added"
+
+
+def _describe_report(event):
+    report_type = (event.metadata or {}).get('report_type', 'report').replace('_', ' ')
+    return f'{_actor(event)} generated a {report_type} report'
+
+
+def _describe_default(event):
+    metadata = event.metadata or {}
+    return metadata.get('description') or f"Activity: {event.get_event_type_display()}"
+
+
+ACTIVITY_FORMATS = {
+    EventType.LOGIN: ActivityFormat('User Login', 'LogIn', 'low', _describe_login),
+    EventType.LOGOUT: ActivityFormat('User Logout', 'LogOut', 'low', _describe_logout),
+    EventType.USER_CREATE: ActivityFormat('New User Registration', 'UserPlus', 'medium', _describe_user_create),
+    EventType.ALLOCATION_CREATE: ActivityFormat(
+        'Room Allocation Created', 'Home', 'high', _describe_allocation('created'),
+    ),
+    EventType.ALLOCATION_UPDATE: ActivityFormat(
+        'Room Allocation Updated', 'Edit', 'medium', _describe_allocation('updated'),
+    ),
+    EventType.ALLOCATION_DELETE: ActivityFormat(
+        'Room Allocation Cancelled', 'Trash2', 'high', _describe_allocation('cancelled'),
+    ),
+    EventType.BUILDING_CREATE: ActivityFormat('New Building Added', 'Building', 'high', _describe_building),
+    EventType.BUILDING_UPDATE: ActivityFormat('Building Updated', 'Building', 'medium', _describe_default),
+    EventType.ROOM_CREATE: ActivityFormat('New Room Added', 'Home', 'medium', _describe_default),
+    EventType.ROOM_UPDATE: ActivityFormat('Room Updated', 'Home', 'low', _describe_default),
+    EventType.SERVICE_UNIT_CREATE: ActivityFormat('Service Unit Created', 'Users', 'medium', _describe_default),
+    EventType.SERVICE_UNIT_UPDATE: ActivityFormat('Service Unit Updated', 'Users', 'low', _describe_default),
+    EventType.BOOKING_CREATE: ActivityFormat('Booking Created', 'Calendar', 'medium', _describe_booking),
+    EventType.BOOKING_CANCEL: ActivityFormat('Booking Cancelled', 'X', 'high', _describe_default),
+    EventType.BOOKING_PAYMENT: ActivityFormat('Payment Received', 'DollarSign', 'low', _describe_default),
+    EventType.REPORT_GENERATE: ActivityFormat('Report Generated', 'FileText', 'low', _describe_report),
+    EventType.SYSTEM_BACKUP: ActivityFormat('System Backup', 'Database', 'low', _describe_default),
+    EventType.SYSTEM_MAINTENANCE: ActivityFormat('Maintenance', 'AlertTriangle', 'urgent', _describe_default),
+}
+
+# Remaining event types: their display label, a generic icon and low priority
+for event_type, label in EventType.choices:
+    ACTIVITY_FORMATS.setdefault(event_type, ActivityFormat(label, 'Activity', 'low', _describe_default))
+
+DEFAULT_FORMAT = ActivityFormat(None, 'Activity', 'low', _describe_default)
+
+
+def format_activity(event):
+    """Render a ``UserEvent`` as a dashboard activity item."""
+    activity_format = ACTIVITY_FORMATS.get(event.event_type, DEFAULT_FORMAT)
+    title = activity_format.title or event.event_type.replace('_', ' ').title()
+    aggregated = (event.metadata or {}).get('aggregated')
+    if aggregated:
+        # One event standing for a bulk operation (see aggregate_events)
+        description = f"{title} ({aggregated.get('count', 0)}) by {_actor(event)}"
+    else:
+        description = activity_format.describe(event)
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'title': title,
+        'description': description,
+        'timestamp': event.timestamp.isoformat(),
+        'icon': activity_format.icon,
+        'priority': activity_format.priority,
+    }
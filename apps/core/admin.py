@@ -5,4 +5,27 @@ This app contains shared utilities and base models.
 
 from django.contrib import admin
 
-# Core app contains shared utilities - no specific models to register
+from .models import BackgroundJob, DashboardSnapshot
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = [
+        'id', 'name', 'status', 'priority', 'attempts', 'max_attempts',
+        'run_at', 'duration_ms', 'locked_by', 'created_at'
+    ]
+    list_filter = ['status', 'name']
+    search_fields = ['name', 'locked_by', 'last_error']
+    readonly_fields = [
+        'created_at', 'started_at', 'finished_at', 'locked_at', 'duration_ms',
+        'payload', 'progress', 'result', 'last_error'
+    ]
+    ordering = ['-created_at']
+
+
+@admin.register(DashboardSnapshot)
+class DashboardSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['name', 'scope', 'generated_at', 'duration_ms']
+    list_filter = ['name']
+    search_fields = ['name', 'scope']
+    readonly_fields = ['generated_at', 'duration_ms']
@@ -0,0 +1,49 @@
+"""
+Versioned cache keys shared across apps.
+
+Every cached payload is stored under a key that embeds the current version of
+its namespace. Invalidating a namespace is a single cache write (the version
+changes), no matter how many entries were cached under it; stale entries are
+simply never read again and expire on their own TTL.
+
+Invalidation only reaches other processes through a cache they share;
+``cache_is_shared()`` tells callers whose correctness depends on that.
+"""
+
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY_PREFIX = 'version'
+
+
+def get_version(namespace):
+    """Return the current version token for ``namespace``."""
+    key = f'{VERSION_KEY_PREFIX}:{namespace}'
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        # add() keeps the first writer's token if several processes race here
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every entry cached under ``namespace``."""
+    # A fresh timestamp (rather than an increment) cannot collide with entries
+    # written under an older version if the version key itself was evicted
+    cache.set(f'{VERSION_KEY_PREFIX}:{namespace}', time.time_ns(), None)
+
+
+def versioned_key(namespace, *parts):
+    """Build a cache key for ``parts`` under the current version of ``namespace``."""
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:{get_version(namespace)}:{suffix}'
+
+
+def cache_is_shared():
+    """True unless the default cache is private to this process (or disabled)."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
@@ -0,0 +1,112 @@
+"""
+Per-user and per-service-unit cache for dashboard statistics.
+
+Member and Deacon dashboards depend on a handful of rows: the member's active
+allocation and its roommates, or the unit's members and allocations. Their
+payloads are cached under two kinds of version namespaces (see
+``apps.core.cache``):
+
+* ``dashboard-stats:user:<id>`` for a member's own dashboard
+* ``dashboard-stats:unit:<id>`` for a unit's Deacon dashboard, and for the
+  unit name shown on its members' dashboards
+
+The handlers in ``apps.core.signals`` bump exactly the namespaces a
+``RoomAllocation``, ``User``, ``ServiceUnit``, ``Room`` or ``Building`` change
+can affect, so invalidation is one cache write per affected user or unit.
+The version bump only reaches other processes through a shared cache, so with
+a per-process one (``LocMemCache``) the dashboards are computed on every
+request. Other roles see system-wide totals and are served from dashboard
+snapshots.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .cache import bump_version, cache_is_shared, get_version, versioned_key
+
+CACHED_ROLES = {'Member', 'Deacon'}
+
+STATS_NAMESPACE = 'dashboard-stats'
+COUNTERS = ('hits', 'misses')
+
+
+def user_namespace(user_id):
+    return f'{STATS_NAMESPACE}:user:{user_id}'
+
+
+def unit_namespace(service_unit_id):
+    return f'{STATS_NAMESPACE}:unit:{service_unit_id}'
+
+
+def stats_cache_key(user):
+    """Cache key for ``user``'s dashboard statistics."""
+    if user.role == 'Deacon':
+        # Every Deacon of a unit sees the same payload
+        return versioned_key(unit_namespace(user.service_unit_id), 'Deacon')
+    return versioned_key(
+        user_namespace(user.id),
+        user.role,
+        get_version(unit_namespace(user.service_unit_id)),
+    )
+
+
+def get_cached_dashboard_stats(user, fresh=False):
+    """
+    Return ``user``'s dashboard statistics, computing them on a cache miss.
+
+    Returns:
+        ``(stats, generated_at)``
+    """
+    from .views import get_dashboard_stats_data
+
+    if user.role not in CACHED_ROLES or not cache_is_shared():
+        # Other workers would never see this worker's invalidations
+        return get_dashboard_stats_data(user), timezone.now()
+
+    key = stats_cache_key(user)
+    entry = None if fresh else cache.get(key)
+    if entry is not None:
+        _count('hits')
+        return entry['stats'], entry['generated_at']
+
+    _count('misses')
+    stats = get_dashboard_stats_data(user)
+    generated_at = timezone.now()
+    if 'error' not in stats:
+        cache.set(key, {'stats': stats, 'generated_at': generated_at}, settings.DASHBOARD_STATS_CACHE_TTL)
+    return stats, generated_at
+
+
+def invalidate_dashboard_stats(user_ids=(), service_unit_ids=()):
+    """Drop the cached dashboards of the given users and service units."""
+    for user_id in set(user_ids) - {None}:
+        bump_version(user_namespace(user_id))
+    for service_unit_id in set(service_unit_ids) - {None}:
+        bump_version(unit_namespace(service_unit_id))
+
+
+def _count(counter):
+    key = f'{STATS_NAMESPACE}:{counter}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First lookup since the counters were reset or evicted
+        cache.add(key, 1, None)
+
+
+def dashboard_cache_stats():
+    """Hit and miss counters of the dashboard statistics cache."""
+    counters = cache.get_many([f'{STATS_NAMESPACE}:{counter}' for counter in COUNTERS])
+    hits = counters.get(f'{STATS_NAMESPACE}:hits', 0)
+    misses = counters.get(f'{STATS_NAMESPACE}:misses', 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups * 100, 2) if lookups else 0,
+    }
+
+
+def reset_dashboard_cache_stats():
+    cache.delete_many([f'{STATS_NAMESPACE}:{counter}' for counter in COUNTERS])
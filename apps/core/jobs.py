@@ -0,0 +1,273 @@
+"""
+Local background job runner.
+
+Deferred work (report exports, image processing, bulk operations) is stored in
+the ``BackgroundJob`` table and executed by ``python manage.py process_jobs``.
+No external broker is needed: workers claim jobs with
+``SELECT ... FOR UPDATE SKIP LOCKED`` where the database supports it
+(PostgreSQL) and fall back to an atomic compare-and-set UPDATE elsewhere
+(SQLite), so several worker processes can share one queue safely.
+
+Handlers live in each app's ``tasks.py`` and are registered by name::
+
+    from apps.core.jobs import register_job
+
+    @register_job('analytics.generate_report_export', max_attempts=3)
+    def generate_report_export(job, export_id):
+        ...
+
+    enqueue('analytics.generate_report_export', export_id=export.id)
+"""
+
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+class JobDefinition:
+    """A registered job handler and its retry policy."""
+
+    def __init__(self, name, func, max_attempts, on_failure=None):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.on_failure = on_failure
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler to fail a job immediately without further retries."""
+
+
+def register_job(name, max_attempts=None, on_failure=None):
+    """
+    Decorator registering ``func`` as the handler for jobs called ``name``.
+
+    Args:
+        name: Unique job name used when enqueueing
+        max_attempts: Retry budget (defaults to JOB_MAX_ATTEMPTS)
+        on_failure: Optional callable ``(job, exc)`` run once the job has
+            permanently failed, e.g. to mark a related record as failed
+    """
+    def decorator(func):
+        _registry[name] = JobDefinition(
+            name,
+            func,
+            max_attempts or settings.JOB_MAX_ATTEMPTS,
+            on_failure=on_failure,
+        )
+        return func
+    return decorator
+
+
+def get_job_definition(name):
+    """Return the registered definition for ``name`` or None."""
+    return _registry.get(name)
+
+
+def autodiscover_jobs():
+    """Import every installed app's ``tasks`` module so handlers register."""
+    autodiscover_modules('tasks')
+
+
+def enqueue(name, priority=0, run_at=None, max_attempts=None, **payload):
+    """
+    Queue a job for background execution and return the ``BackgroundJob``.
+
+    The job row is written inside the caller's transaction, so a job enqueued
+    from a request that later rolls back is never run.
+    """
+    definition = get_job_definition(name)
+    if max_attempts is None:
+        max_attempts = definition.max_attempts if definition else settings.JOB_MAX_ATTEMPTS
+
+    return BackgroundJob.objects.create(
+        name=name,
+        payload=payload,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff in seconds for the given number of attempts made."""
+    base = settings.JOB_RETRY_BACKOFF_SECONDS
+    return min(base * (2 ** max(attempts - 1, 0)), settings.JOB_RETRY_BACKOFF_MAX_SECONDS)
+
+
+def default_worker_id():
+    """Identifier stored on claimed jobs: ``hostname:pid``."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _ready_jobs(names=None):
+    queryset = BackgroundJob.objects.filter(
+        status=BackgroundJob.StatusChoices.QUEUED,
+        run_at__lte=timezone.now(),
+    )
+    if names:
+        queryset = queryset.filter(name__in=names)
+    return queryset.order_by('-priority', 'run_at', 'id')
+
+
+def claim_job(worker_id, names=None):
+    """
+    Atomically claim the next ready job for ``worker_id``.
+
+    Returns the claimed job (already marked running) or None if the queue is empty.
+    """
+    now = timezone.now()
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _ready_jobs(names).select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = BackgroundJob.StatusChoices.RUNNING
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.started_at = now
+            job.attempts += 1
+            job.save(update_fields=['status', 'locked_by', 'locked_at', 'started_at', 'attempts'])
+            return job
+
+    # Fallback (SQLite): pick candidates without locks and win the race with a
+    # conditional UPDATE; a zero row count means another worker got there first.
+    for job_id in _ready_jobs(names).values_list('id', flat=True)[:10]:
+        claimed = BackgroundJob.objects.filter(
+            id=job_id,
+            status=BackgroundJob.StatusChoices.QUEUED,
+        ).update(
+            status=BackgroundJob.StatusChoices.RUNNING,
+            locked_by=worker_id,
+            locked_at=now,
+            started_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return BackgroundJob.objects.get(id=job_id)
+    return None
+
+
+def run_job(job):
+    """Execute a claimed job, recording timing and scheduling retries on failure."""
+    definition = get_job_definition(job.name)
+    started = time.monotonic()
+
+    if definition is None:
+        _fail(job, started, f"No handler registered for job '{job.name}'", permanent=True)
+        return job
+
+    try:
+        result = definition.func(job, **job.payload)
+    except Exception as exc:
+        permanent = isinstance(exc, PermanentJobError)
+        _fail(job, started, traceback.format_exc(), permanent=permanent)
+        if job.status == BackgroundJob.StatusChoices.FAILED and definition.on_failure:
+            try:
+                definition.on_failure(job, exc)
+            except Exception:
+                logger.exception("on_failure hook for job %s raised", job.pk)
+        return job
+
+    job.status = BackgroundJob.StatusChoices.SUCCEEDED
+    job.result = result
+    job.last_error = ''
+    job.finished_at = timezone.now()
+    job.duration_ms = int((time.monotonic() - started) * 1000)
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=[
+        'status', 'result', 'last_error', 'finished_at', 'duration_ms', 'locked_by', 'locked_at'
+    ])
+    logger.info("Job %s (%s) succeeded in %d ms", job.pk, job.name, job.duration_ms)
+    return job
+
+
+def _fail(job, started, error, permanent=False):
+    job.duration_ms = int((time.monotonic() - started) * 1000)
+    job.last_error = error
+    job.locked_by = ''
+    job.locked_at = None
+
+    if permanent or job.attempts >= job.max_attempts:
+        job.status = BackgroundJob.StatusChoices.FAILED
+        job.finished_at = timezone.now()
+        logger.error("Job %s (%s) failed permanently after %d attempt(s)", job.pk, job.name, job.attempts)
+    else:
+        job.status = BackgroundJob.StatusChoices.QUEUED
+        job.run_at = timezone.now() + timedelta(seconds=retry_delay(job.attempts))
+        logger.warning("Job %s (%s) failed, retrying at %s", job.pk, job.name, job.run_at)
+
+    job.save(update_fields=[
+        'status', 'duration_ms', 'last_error', 'locked_by', 'locked_at', 'finished_at', 'run_at'
+    ])
+
+
+def requeue_stale_jobs(stale_after):
+    """
+    Return jobs stuck in ``running`` (worker crashed or was killed) to the queue.
+
+    Args:
+        stale_after: Seconds after which a running job is considered abandoned
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_after)
+    return BackgroundJob.objects.filter(
+        status=BackgroundJob.StatusChoices.RUNNING,
+        locked_at__lt=cutoff,
+    ).update(
+        status=BackgroundJob.StatusChoices.QUEUED,
+        locked_by='',
+        locked_at=None,
+        run_at=timezone.now(),
+    )
+
+
+def work(worker_id=None, names=None, once=False, poll_interval=None, max_jobs=None, stop_event=None):
+    """
+    Worker loop: claim and run jobs until stopped.
+
+    Args:
+        worker_id: Identifier recorded on claimed jobs
+        names: Restrict the worker to these job names
+        once: Drain the currently ready jobs and return
+        poll_interval: Seconds to sleep when the queue is empty
+        max_jobs: Exit after running this many jobs
+        stop_event: Optional ``multiprocessing.Event`` checked between jobs
+
+    Returns:
+        Number of jobs processed
+    """
+    worker_id = worker_id or default_worker_id()
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+
+    while not (stop_event and stop_event.is_set()):
+        job = claim_job(worker_id, names)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        run_job(job)
+        processed += 1
+        if max_jobs and processed >= max_jobs:
+            break
+
+    return processed
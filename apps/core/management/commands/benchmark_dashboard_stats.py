@@ -0,0 +1,96 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.allocations.models import RoomAllocation
+from apps.authentication.models import User
+from apps.buildings.models import Building, Room
+from apps.core.stats import can_run_concurrently, collect_stats
+from apps.service_units.models import ServiceUnit
+
+
+def separate_counts():
+    """The SuperAdmin totals as one COUNT per figure, as computed before."""
+    month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return {
+        'rooms': {
+            'total': Room.objects.count(),
+            'occupied': Room.objects.filter(is_allocated=True).count(),
+            'available': Room.objects.filter(is_allocated=False).count(),
+        },
+        'allocations': {'active': RoomAllocation.objects.filter(is_active=True).count()},
+        'users': {
+            'total': User.objects.count(),
+            'new_this_month': User.objects.filter(date_joined__gte=month_start).count(),
+        },
+        'buildings': {'total': Building.objects.count()},
+        'service_units': {'total': ServiceUnit.objects.count()},
+    }
+
+
+class Command(BaseCommand):
+    help = 'Compare separate COUNT queries with the per-table conditional aggregates for SuperAdmin stats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help='Timed runs per strategy (default: 50)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=4,
+            help='Threads for the concurrent strategy (default: 4)',
+        )
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        # name -> (strategy, sequential equivalent used to count queries, as
+        # queries issued from worker threads are not captured)
+        sequential = lambda: collect_stats(workers=1)
+        strategies = {
+            'separate_counts': (separate_counts, separate_counts),
+            'aggregates': (sequential, sequential),
+        }
+        if can_run_concurrently():
+            strategies['aggregates_concurrent'] = (
+                lambda: collect_stats(workers=options['workers']),
+                sequential,
+            )
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'Skipping the concurrent strategy on {connection.vendor}'
+            ))
+
+        results = {}
+        for name, (strategy, counted) in strategies.items():
+            results[name] = self.measure(strategy, counted, options['repeat'])
+            self.stdout.write(
+                f"{name:<24} {results[name]['queries']:>3} queries  "
+                f"median {results[name]['median_ms']:>8.2f} ms  p95 {results[name]['p95_ms']:>8.2f} ms"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump({'database': connection.vendor, 'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def measure(strategy, counted, repeat):
+        with CaptureQueriesContext(connection) as queries:
+            counted()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            strategy()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+
+        return {
+            'queries': len(queries.captured_queries),
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
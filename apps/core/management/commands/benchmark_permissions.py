@@ -0,0 +1,86 @@
+import json
+import statistics
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.allocations.models import RoomAllocation
+from apps.authentication.models import User
+from apps.core.permissions import RULES, SCOPE_LOOKUPS, RolePermission, can, compile_rules, scope_queryset
+from apps.service_units.models import ServiceUnit
+
+
+def legacy_allocation_queryset(queryset, user):
+    # The per-view role branching the matrix replaced
+    if user.role in ['SuperAdmin', 'PortalManager']:
+        return queryset
+    if user.role == 'Deacon':
+        return queryset.filter(Q(service_unit__admin=user) | Q(allocated_by=user))
+    return queryset.filter(user=user)
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request cost of permission checks against the compiled role matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000, help='Checks per measurement (default: 100000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Measurements per check, median reported (default: 5)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        iterations, repeat = options['iterations'], options['repeat']
+
+        start = time.perf_counter()
+        matrix, _ = compile_rules(RULES, SCOPE_LOOKUPS)
+        results = {
+            'compile_ms': round((time.perf_counter() - start) * 1000, 3),
+            'rules': len(matrix),
+            'checks': {},
+        }
+        self.stdout.write(f"compiled {results['rules']} rules in {results['compile_ms']:.3f} ms")
+
+        # Unsaved instances: only the check itself is timed, never the database
+        unit = ServiceUnit(id=1, name='Bench', admin_id=2)
+        users = {role: User(id=index, role=role, service_unit_id=1) for index, role in enumerate(User.RoleChoices.values, 1)}
+        allocation = RoomAllocation(id=1, user_id=5, service_unit=unit, allocated_by_id=1)
+        permission = RolePermission()
+        view = SimpleNamespace(permission_resource='allocations', permission_actions={})
+        request = SimpleNamespace(method='GET', user=None)
+        queryset = RoomAllocation.objects.all()
+        # Building a queryset costs ~100x a lookup; fewer runs keep it short
+        queryset_iterations = max(1, iterations // 100)
+
+        for role, user in users.items():
+            request.user = user
+            checks = {
+                'legacy_role_check': (lambda: user.role in ['SuperAdmin', 'PortalManager', 'Deacon'], iterations),
+                'can': (lambda: can(user, 'allocations', 'manage'), iterations),
+                'can_object': (lambda: can(user, 'allocations', 'manage', allocation), iterations),
+                'drf_permission': (lambda: permission.has_permission(request, view), iterations),
+                'legacy_queryset': (lambda: legacy_allocation_queryset(queryset, user), queryset_iterations),
+                'scope_queryset': (lambda: scope_queryset(queryset, user, 'allocations'), queryset_iterations),
+            }
+            results['checks'][role] = {
+                name: self.measure(check, count, repeat) for name, (check, count) in checks.items()
+            }
+            self.stdout.write(f'{role:<14}' + '  '.join(
+                f'{name} {micros:.3f}' for name, micros in results['checks'][role].items()
+            ) + '  (µs/check)')
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def measure(check, count, repeat):
+        """Median microseconds per call of ``check`` over ``repeat`` runs of ``count`` calls."""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(count):
+                check()
+            timings.append((time.perf_counter() - start) / count * 1e6)
+        return round(statistics.median(timings), 3)
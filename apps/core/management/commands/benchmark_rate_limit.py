@@ -0,0 +1,112 @@
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from apps.core.ratelimit import CacheBucketStore, LocalBucketStore, SQLiteBucketStore, parse_rate
+
+
+class Command(BaseCommand):
+    help = 'Measure token-bucket store throughput and the cost of a rate-limited login rejection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--takes', type=int, default=100000, help='Bucket takes per store (default: 100000)')
+        parser.add_argument('--threads', type=int, default=4, help='Threads for the concurrent run (default: 4)')
+        parser.add_argument('--requests', type=int, default=200, help='Rejected login requests to time (default: 200)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        results = {'stores': {}, 'rejection': None}
+
+        with tempfile.TemporaryDirectory() as directory:
+            stores = {
+                'local': LocalBucketStore(),
+                'sqlite': SQLiteBucketStore(os.path.join(directory, 'ratelimit.sqlite3')),
+                'cache': CacheBucketStore(),
+            }
+            for name, store in stores.items():
+                results['stores'][name] = self.measure_store(store, options['takes'], options['threads'])
+                self.stdout.write(
+                    f"{name:<8} {results['stores'][name]['takes_per_second']:>12,.0f} takes/s  "
+                    f"{results['stores'][name]['threaded_takes_per_second']:>12,.0f} takes/s "
+                    f"({options['threads']} threads)"
+                )
+
+        results['rejection'] = self.measure_rejection(options['requests'])
+        rejection = results['rejection']
+        self.stdout.write(
+            f"rejected login: median {rejection['rejected_median_ms']:.3f} ms, "
+            f"{rejection['rejected_hashes']} hashes  |  "
+            f"failed login: median {rejection['failed_login_median_ms']:.1f} ms"
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+    @staticmethod
+    def measure_store(store, takes, threads):
+        # Spread over many keys, like a credential-stuffing run across accounts
+        capacity, refill_rate = parse_rate('20/10')
+        keys = [f'bench:{index}' for index in range(1000)]
+
+        start = time.perf_counter()
+        for index in range(takes):
+            store.take(keys[index % len(keys)], capacity, refill_rate)
+        single = takes / (time.perf_counter() - start)
+
+        def worker(offset):
+            for index in range(takes // threads):
+                store.take(keys[(index + offset) % len(keys)], capacity, refill_rate)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, range(threads)))
+        threaded = (takes // threads * threads) / (time.perf_counter() - start)
+        store.reset()
+
+        return {'takes_per_second': round(single), 'threaded_takes_per_second': round(threaded)}
+
+    def measure_rejection(self, requests):
+        # A fresh address and account, so the run starts from full buckets
+        address = f'198.51.100.{uuid.uuid4().int % 250 + 1}'
+        payload = {'email': f'{uuid.uuid4().hex}@example.invalid', 'password': 'not-the-password'}
+        client = APIClient(REMOTE_ADDR=address)
+
+        def post():
+            start = time.perf_counter()
+            response = client.post('/api/auth/token/', payload, format='json')
+            return response.status_code, (time.perf_counter() - start) * 1000
+
+        with override_settings(RATE_LIMIT_ENABLED=True):
+            failed = []
+            # Drain the email bucket with real (hashed) failed logins
+            capacity, _ = parse_rate(settings.RATE_LIMITS['login_email'])
+            for _ in range(capacity):
+                failed.append(post())
+
+            hasher_class = type(get_hasher())
+            with mock.patch.object(hasher_class, 'encode', autospec=True, side_effect=hasher_class.encode) as encode:
+                rejected = [post() for _ in range(requests)]
+
+        statuses = {status for status, _ in rejected}
+        if statuses != {429}:
+            self.stdout.write(self.style.WARNING(f'Expected only 429 responses, got {sorted(statuses)}'))
+
+        return {
+            'failed_login_median_ms': round(statistics.median(timing for _, timing in failed), 3),
+            'rejected_median_ms': round(statistics.median(timing for _, timing in rejected), 3),
+            'rejected_hashes': encode.call_count,
+            'rejected_statuses': sorted(statuses),
+        }
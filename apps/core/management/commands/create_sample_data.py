@@ -209,7 +209,7 @@ class Command(BaseCommand):
                 'email': 'choir@church.com',
                 'first_name': 'Mary',
                 'last_name': 'Singer',
-                'role': 'ServiceUnitAdmin',
+                'role': 'Deacon',
                 'service_unit': service_units[0]  # Choir
             },
             {
@@ -217,7 +217,7 @@ class Command(BaseCommand):
                 'email': 'ushers@church.com',
                 'first_name': 'David',
                 'last_name': 'Welcome',
-                'role': 'ServiceUnitAdmin',
+                'role': 'Deacon',
                 'service_unit': service_units[1]  # Ushers
             },
             {
@@ -0,0 +1,105 @@
+"""
+Django management command to run background job workers.
+
+Usage:
+    python manage.py process_jobs                 # JOB_WORKER_CONCURRENCY processes
+    python manage.py process_jobs --workers 4
+    python manage.py process_jobs --once          # drain ready jobs and exit
+    python manage.py process_jobs --name analytics.generate_report_export
+"""
+
+import multiprocessing
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.core.jobs import autodiscover_jobs, default_worker_id, requeue_stale_jobs, work
+
+
+def _worker_main(index, names, once, poll_interval, stop_event):
+    """Entry point for a forked worker process."""
+    # Connections inherited from the parent must not be shared across processes
+    connections.close_all()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    autodiscover_jobs()
+    work(
+        worker_id=f"{default_worker_id()}/{index}",
+        names=names,
+        once=once,
+        poll_interval=poll_interval,
+        stop_event=stop_event,
+    )
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers backed by the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Number of worker processes (default: JOB_WORKER_CONCURRENCY)',
+        )
+        parser.add_argument(
+            '--name',
+            action='append',
+            dest='names',
+            help='Only process jobs with this name (may be repeated)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Process jobs that are ready now and exit',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=None,
+            help='Seconds to wait when the queue is empty (default: JOB_POLL_INTERVAL)',
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or settings.JOB_WORKER_CONCURRENCY
+        names = options['names']
+        once = options['once']
+        poll_interval = options['poll_interval']
+
+        autodiscover_jobs()
+
+        requeued = requeue_stale_jobs(settings.JOB_STALE_AFTER_SECONDS)
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'Requeued {requeued} stale job(s)'))
+
+        if workers <= 1:
+            self.stdout.write(self.style.SUCCESS('Starting 1 job worker'))
+            processed = work(names=names, once=once, poll_interval=poll_interval)
+            self.stdout.write(self.style.SUCCESS(f'Processed {processed} job(s)'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Starting {workers} job workers'))
+        connections.close_all()
+        stop_event = multiprocessing.Event()
+        processes = [
+            multiprocessing.Process(
+                target=_worker_main,
+                args=(index, names, once, poll_interval, stop_event),
+                daemon=True,
+            )
+            for index in range(workers)
+        ]
+        for process in processes:
+            process.start()
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Stopping workers after current jobs...'))
+            stop_event.set()
+            for process in processes:
+                process.join()
+
+        self.stdout.write(self.style.SUCCESS('Job workers stopped'))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.core.snapshots import (
+    GLOBAL_SNAPSHOTS, SNAPSHOT_BUILDERS, build_snapshot, refresh_if_stale, shared_scope_users,
+)
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard snapshots for every shared role'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Recompute even snapshots younger than DASHBOARD_SNAPSHOT_MAX_AGE',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, refreshing stale snapshots every DASHBOARD_SNAPSHOT_MAX_AGE seconds',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            refreshed = self.refresh(options['force'])
+            self.stdout.write(self.style.SUCCESS(f'Refreshed {refreshed} snapshots'))
+            if not options['loop']:
+                break
+            time.sleep(settings.DASHBOARD_SNAPSHOT_MAX_AGE)
+
+    def refresh(self, force):
+        refreshed = 0
+        for name in SNAPSHOT_BUILDERS:
+            users = shared_scope_users(name)
+            # Global snapshots only need computing once
+            for user in users[:1] if name in GLOBAL_SNAPSHOTS else users:
+                snapshot = build_snapshot(name, user) if force else refresh_if_stale(name, user)
+                if snapshot is not None:
+                    refreshed += 1
+                    self.stdout.write(f'  {snapshot.name} [{snapshot.scope}] {snapshot.duration_ms} ms')
+        return refreshed
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Registered name of the job handler', max_length=100)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Keyword arguments passed to the job handler')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', help_text='Current state of the job', max_length=20)),
+                ('priority', models.SmallIntegerField(default=0, help_text='Higher priority jobs are picked up first')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Number of times this job has been started')),
+                ('max_attempts', models.PositiveIntegerField(default=3, help_text='Give up after this many failed attempts')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the job may run (pushed back on retry)')),
+                ('locked_by', models.CharField(blank=True, help_text='Identifier of the worker currently running the job', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, help_text='When the current worker claimed the job', null=True)),
+                ('started_at', models.DateTimeField(blank=True, help_text='When the most recent attempt started', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, help_text='When the job reached a final state', null=True)),
+                ('duration_ms', models.PositiveIntegerField(blank=True, help_text='Wall-clock duration of the most recent attempt in milliseconds', null=True)),
+                ('progress', models.JSONField(blank=True, default=dict, help_text='Progress information reported by the handler')),
+                ('result', models.JSONField(blank=True, help_text='Value returned by the handler on success', null=True)),
+                ('last_error', models.TextField(blank=True, help_text='Error from the most recent failed attempt')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Background Job',
+                'verbose_name_plural': 'Background Jobs',
+                'db_table': 'background_jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'priority', 'run_at'], name='idx_jobs_ready'), models.Index(fields=['name'], name='idx_jobs_name')],
+            },
+        ),
+    ]
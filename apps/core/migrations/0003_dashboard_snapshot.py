@@ -0,0 +1,35 @@
+# Generated by Django 4.2.30 on 2026-10-19 05:33
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_background_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Snapshot name, e.g. dashboard_stats', max_length=100)),
+                ('scope', models.CharField(help_text='Audience the payload was computed for, e.g. a role or role:id', max_length=100)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('generated_at', models.DateTimeField()),
+                ('duration_ms', models.PositiveIntegerField(default=0, help_text='Time taken to compute the payload')),
+            ],
+            options={
+                'verbose_name': 'Dashboard Snapshot',
+                'verbose_name_plural': 'Dashboard Snapshots',
+                'db_table': 'dashboard_snapshots',
+                'ordering': ['name', 'scope'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dashboardsnapshot',
+            constraint=models.UniqueConstraint(fields=('name', 'scope'), name='uniq_dashboard_snapshot'),
+        ),
+    ]
@@ -5,6 +5,8 @@ Shared utilities and base models used across the application.
 
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 
 class TimeStampedModel(models.Model):
@@ -187,3 +189,169 @@ class SystemSetting(models.Model):
             }
         )
         return setting
+
+
+class BackgroundJob(models.Model):
+    """
+    Database-backed job queue entry for work deferred out of the request cycle.
+
+    Jobs are enqueued with ``apps.core.jobs.enqueue`` and executed by the
+    ``process_jobs`` management command. No external broker is required.
+    """
+
+    class StatusChoices(models.TextChoices):
+        QUEUED = 'queued', 'Queued'
+        RUNNING = 'running', 'Running'
+        SUCCEEDED = 'succeeded', 'Succeeded'
+        FAILED = 'failed', 'Failed'
+
+    name = models.CharField(
+        max_length=100,
+        help_text="Registered name of the job handler"
+    )
+
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Keyword arguments passed to the job handler"
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusChoices.choices,
+        default=StatusChoices.QUEUED,
+        help_text="Current state of the job"
+    )
+
+    priority = models.SmallIntegerField(
+        default=0,
+        help_text="Higher priority jobs are picked up first"
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of times this job has been started"
+    )
+
+    max_attempts = models.PositiveIntegerField(
+        default=3,
+        help_text="Give up after this many failed attempts"
+    )
+
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the job may run (pushed back on retry)"
+    )
+
+    locked_by = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Identifier of the worker currently running the job"
+    )
+
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the current worker claimed the job"
+    )
+
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the most recent attempt started"
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the job reached a final state"
+    )
+
+    duration_ms = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Wall-clock duration of the most recent attempt in milliseconds"
+    )
+
+    progress = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Progress information reported by the handler"
+    )
+
+    result = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Value returned by the handler on success"
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error from the most recent failed attempt"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'background_jobs'
+        verbose_name = 'Background Job'
+        verbose_name_plural = 'Background Jobs'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_at'], name='idx_jobs_ready'),
+            models.Index(fields=['name'], name='idx_jobs_name'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        """Return True once the job has succeeded or permanently failed."""
+        return self.status in (self.StatusChoices.SUCCEEDED, self.StatusChoices.FAILED)
+
+    def set_progress(self, **progress):
+        """Merge progress information and persist it without touching other fields."""
+        self.progress.update(progress)
+        BackgroundJob.objects.filter(pk=self.pk).update(progress=self.progress)
+
+
+class DashboardSnapshot(models.Model):
+    """
+    Last computed payload of a dashboard endpoint for one scope.
+
+    Dashboards are served from these rows (see ``apps.core.snapshots``) and
+    recomputed in the background once they are older than
+    ``DASHBOARD_SNAPSHOT_MAX_AGE`` seconds.
+    """
+
+    name = models.CharField(
+        max_length=100,
+        help_text="Snapshot name, e.g. dashboard_stats"
+    )
+
+    scope = models.CharField(
+        max_length=100,
+        help_text="Audience the payload was computed for, e.g. a role or role:id"
+    )
+
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+
+    generated_at = models.DateTimeField()
+
+    duration_ms = models.PositiveIntegerField(
+        default=0,
+        help_text="Time taken to compute the payload"
+    )
+
+    class Meta:
+        db_table = 'dashboard_snapshots'
+        verbose_name = 'Dashboard Snapshot'
+        verbose_name_plural = 'Dashboard Snapshots'
+        ordering = ['name', 'scope']
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'scope'], name='uniq_dashboard_snapshot'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.scope}] at {self.generated_at}"
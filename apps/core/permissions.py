@@ -0,0 +1,229 @@
+"""
+Role-based permission matrix shared by every app.
+
+``RULES`` declares, per resource and action, the scope each role is granted:
+
+* ``ALL``  -- every row
+* ``UNIT`` -- rows belonging to the service unit the user belongs to or administers
+* ``OWN``  -- the user's own rows
+
+A role missing from an action's rules is denied. ``SCOPE_LOOKUPS`` says how a
+scope maps onto each resource's rows: a list of ``(lookup, user attribute)``
+pairs, any of which may match.
+
+Both tables are compiled once, at import, into flat dicts keyed by
+``(role, resource, action)`` and ``(resource, scope)``, so a check is a single
+dict lookup and scoping a queryset needs no per-request rule evaluation.
+
+Views use ``RolePermission`` (DRF) or ``can()`` / ``scope_queryset()``
+directly.
+"""
+
+from operator import attrgetter
+
+from django.db.models import Q
+from rest_framework import permissions
+
+ALL = 'all'
+UNIT = 'unit'
+OWN = 'own'
+
+SUPER_ADMIN = 'SuperAdmin'
+PORTAL_MANAGER = 'PortalManager'
+PASTOR = 'Pastor'
+DEACON = 'Deacon'
+MEMBER = 'Member'
+
+EVERYONE = (SUPER_ADMIN, PORTAL_MANAGER, PASTOR, DEACON, MEMBER)
+
+
+def _grant(scope, *roles):
+    return {role: scope for role in roles}
+
+
+RULES = {
+    'users': {
+        'view': _grant(ALL, SUPER_ADMIN),
+        'create': _grant(ALL, SUPER_ADMIN),
+        'update': _grant(ALL, SUPER_ADMIN),
+        'delete': _grant(ALL, SUPER_ADMIN),
+        'statistics': {**_grant(ALL, SUPER_ADMIN), DEACON: UNIT},
+        'import': _grant(ALL, SUPER_ADMIN),
+        'change_role': _grant(ALL, SUPER_ADMIN),
+    },
+    'service_units': {
+        # Everyone may browse service units; only SuperAdmin changes them
+        'view': _grant(ALL, *EVERYONE),
+        'view_members': _grant(ALL, *EVERYONE),
+        'create': _grant(ALL, SUPER_ADMIN),
+        'update': _grant(ALL, SUPER_ADMIN),
+        'delete': _grant(ALL, SUPER_ADMIN),
+        'manage_members': _grant(ALL, SUPER_ADMIN),
+    },
+    'allocations': {
+        'view': {**_grant(ALL, SUPER_ADMIN, PORTAL_MANAGER), DEACON: UNIT, **_grant(OWN, PASTOR, MEMBER)},
+        'manage': {**_grant(ALL, SUPER_ADMIN, PORTAL_MANAGER), DEACON: UNIT},
+    },
+    'allocation_requests': {
+        'view': {**_grant(ALL, SUPER_ADMIN, PORTAL_MANAGER), DEACON: UNIT, **_grant(OWN, PASTOR, MEMBER)},
+        'create': _grant(OWN, *EVERYONE),
+        'approve': {**_grant(ALL, SUPER_ADMIN, PORTAL_MANAGER), DEACON: UNIT},
+    },
+    'buildings': {
+        'view': _grant(ALL, *EVERYONE),
+        'manage': _grant(ALL, SUPER_ADMIN),
+    },
+    'analytics': {
+        # Analytics aggregates are not unit-scoped, so they stay SuperAdmin only
+        'view': _grant(ALL, SUPER_ADMIN),
+    },
+}
+
+SCOPE_LOOKUPS = {
+    'users': {
+        UNIT: [('service_unit_id', 'service_unit_id')],
+        OWN: [('id', 'id')],
+    },
+    'service_units': {
+        UNIT: [('id', 'service_unit_id'), ('admin_id', 'id')],
+    },
+    'allocations': {
+        UNIT: [('service_unit__admin_id', 'id'), ('allocated_by_id', 'id')],
+        OWN: [('user_id', 'id')],
+    },
+    'allocation_requests': {
+        UNIT: [('requested_by__service_unit__admin_id', 'id'), ('requested_by_id', 'id')],
+        OWN: [('requested_by_id', 'id')],
+    },
+}
+
+
+def _path_getter(lookup):
+    """Getter following ``lookup``'s ``__`` hops on an object; None if any hop is None."""
+    hops = lookup.split('__')
+
+    def get(obj):
+        for hop in hops:
+            if obj is None:
+                return None
+            obj = getattr(obj, hop)
+        return obj
+    return get
+
+
+def compile_rules(rules, scope_lookups):
+    """
+    Flatten the rule tables.
+
+    Returns:
+        ``(matrix, scopes)``: ``matrix[(role, resource, action)] -> scope`` and
+        ``scopes[(resource, scope)] -> ((lookup, user getter, object getter), ...)``
+    """
+    matrix = {}
+    for resource, actions in rules.items():
+        for action, grants in actions.items():
+            for role, scope in grants.items():
+                if scope not in (ALL, UNIT, OWN):
+                    raise ValueError(f'Unknown scope {scope!r} for {role} {resource}.{action}')
+                if scope != ALL and scope not in scope_lookups.get(resource, {}):
+                    raise ValueError(f'No {scope!r} lookup defined for {resource}')
+                matrix[(role, resource, action)] = scope
+
+    scopes = {}
+    for resource, lookups in scope_lookups.items():
+        for scope, pairs in lookups.items():
+            scopes[(resource, scope)] = tuple(
+                (lookup, attrgetter(user_attr), _path_getter(lookup))
+                for lookup, user_attr in pairs
+            )
+    return matrix, scopes
+
+
+MATRIX, SCOPES = compile_rules(RULES, SCOPE_LOOKUPS)
+
+
+def scope_for(user, resource, action):
+    """The scope ``user``'s role has for ``action`` on ``resource``, or None."""
+    return MATRIX.get((getattr(user, 'role', None), resource, action))
+
+
+def can(user, resource, action, obj=None):
+    """Whether ``user`` may perform ``action`` on ``resource`` (or on ``obj``)."""
+    scope = scope_for(user, resource, action)
+    if scope is None:
+        return False
+    if obj is None or scope == ALL:
+        return True
+    for _, user_value, obj_value in SCOPES[(resource, scope)]:
+        value = user_value(user)
+        if value is not None and obj_value(obj) == value:
+            return True
+    return False
+
+
+def scope_queryset(queryset, user, resource, action='view'):
+    """Restrict ``queryset`` to the rows ``user`` may ``action``; none if denied."""
+    scope = scope_for(user, resource, action)
+    if scope is None:
+        return queryset.none()
+    if scope == ALL:
+        return queryset
+
+    condition = Q()
+    for lookup, user_value, _ in SCOPES[(resource, scope)]:
+        value = user_value(user)
+        if value is not None:
+            condition |= Q(**{lookup: value})
+    # A Deacon without a unit (or any unset attribute) matches nothing
+    return queryset.filter(condition) if condition else queryset.none()
+
+
+METHOD_ACTIONS = {
+    'GET': 'view',
+    'HEAD': 'view',
+    'OPTIONS': 'view',
+    'POST': 'create',
+    'PUT': 'update',
+    'PATCH': 'update',
+    'DELETE': 'delete',
+}
+
+
+class RolePermission(permissions.BasePermission):
+    """
+    DRF permission checking the view's ``permission_resource`` against the matrix.
+
+    The action is ``view.permission_actions[view.action]`` (viewsets) or
+    ``view.permission_actions[method]`` when given, else derived from the
+    HTTP method (``METHOD_ACTIONS``). Object checks apply the role's scope.
+    """
+
+    def get_action(self, request, view):
+        actions = getattr(view, 'permission_actions', {})
+        return (
+            actions.get(getattr(view, 'action', None))
+            or actions.get(request.method)
+            or METHOD_ACTIONS.get(request.method)
+        )
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        return scope_for(user, view.permission_resource, self.get_action(request, view)) is not None
+
+    def has_object_permission(self, request, view, obj):
+        return can(request.user, view.permission_resource, self.get_action(request, view), obj)
+
+
+def role_permission(resource, action=None):
+    """A ``RolePermission`` bound to ``resource`` (and a fixed ``action``) for function views."""
+    class BoundRolePermission(RolePermission):
+        def has_permission(self, request, view):
+            view.permission_resource = resource
+            if action:
+                view.permission_actions = {request.method: action}
+            return super().has_permission(request, view)
+
+    BoundRolePermission.__name__ = f'RolePermission[{resource}.{action or "*"}]'
+    return BoundRolePermission
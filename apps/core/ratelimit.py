@@ -0,0 +1,220 @@
+"""
+Token-bucket rate limiting.
+
+A bucket holds up to ``capacity`` tokens and refills at ``refill_rate`` tokens
+per second; each request takes one token and is rejected when none is left.
+Buckets live in a pluggable store (``RATE_LIMIT_STORE``):
+
+* ``LocalBucketStore`` -- per-process ordered dict, no locks. Under a race on the same
+  key a burst may get a token or two extra, which is fine for throttling.
+  Limits are per gunicorn worker.
+* ``SQLiteBucketStore`` -- one SQLite file shared by every worker on a host;
+  each take is a single atomic UPSERT.
+* ``CacheBucketStore`` -- the Django cache, shared when ``CACHE_BACKEND`` is.
+
+``RateLimitThrottle`` subclasses plug the buckets into DRF views; throttles run
+in ``initial()``, before the view parses credentials or hashes anything.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from rest_framework.throttling import BaseThrottle
+
+
+class LocalBucketStore:
+    """
+    In-process buckets in an ordered dict (lock-free; see module docstring).
+
+    Every take moves its bucket to the end, so the dict stays ordered by last
+    update and pruning only ever looks at the oldest entries: each is dropped
+    once it has refilled (a full bucket is the same as no bucket), or when
+    more than ``max_keys`` buckets are still refilling. Each entry carries its
+    own capacity and rate, so buckets of every scope are judged by their own.
+    """
+
+    # Buckets kept at most; past this the least recently used are dropped
+    # even if still refilling
+    max_keys = 50000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+
+    def take(self, key, capacity, refill_rate):
+        """
+        Take a token from ``key``'s bucket.
+
+        Returns:
+            ``(allowed, retry_after_seconds)``
+        """
+        now = time.monotonic()
+        tokens, updated, _, _ = self._buckets.pop(key, None) or (capacity, now, capacity, refill_rate)
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, capacity, refill_rate)
+        self._prune(now)
+        return (True, 0) if allowed else (False, (1 - tokens) / refill_rate)
+
+    def _prune(self, now):
+        buckets = self._buckets
+        while buckets:
+            try:
+                key, (tokens, updated, capacity, refill_rate) = next(iter(buckets.items()))
+            except (StopIteration, RuntimeError):
+                # Emptied or reordered by another thread meanwhile
+                return
+            refilled = tokens + (now - updated) * refill_rate >= capacity
+            if not refilled and len(buckets) <= self.max_keys:
+                return
+            buckets.pop(key, None)
+
+    def reset(self):
+        self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """Buckets in a SQLite file (``RATE_LIMIT_SQLITE_PATH``) shared across workers."""
+
+    # Every SET expression sees the row's old values, hence the repeated refill
+    TAKE_SQL = """
+        INSERT INTO rate_limit_buckets (key, tokens, updated_at, allowed)
+        VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = MIN(:capacity, tokens + (:now - updated_at) * :rate)
+                     - (MIN(:capacity, tokens + (:now - updated_at) * :rate) >= 1),
+            allowed = MIN(:capacity, tokens + (:now - updated_at) * :rate) >= 1,
+            updated_at = :now
+        RETURNING tokens, allowed
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.RATE_LIMIT_SQLITE_PATH)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, allowed INTEGER NOT NULL)'
+            )
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, capacity, refill_rate):
+        tokens, allowed = self.connection.execute(
+            self.TAKE_SQL,
+            {'key': key, 'capacity': capacity, 'rate': refill_rate, 'now': time.time()},
+        ).fetchone()
+        if allowed:
+            return True, 0
+        return False, (1 - tokens) / refill_rate
+
+    def reset(self):
+        self.connection.execute('DELETE FROM rate_limit_buckets')
+
+
+class CacheBucketStore:
+    """Buckets in the Django cache; concurrent takes on one key may race."""
+
+    key_prefix = 'ratelimit'
+
+    def take(self, key, capacity, refill_rate):
+        now = time.time()
+        cache_key = f'{self.key_prefix}:{key}'
+        tokens, updated = cache.get(cache_key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expire once the bucket would be full again
+        cache.set(cache_key, (tokens, now), int((capacity - tokens) / refill_rate) + 1)
+        return (True, 0) if allowed else (False, (1 - tokens) / refill_rate)
+
+    def reset(self):
+        # Entries expire on their own once refilled
+        pass
+
+
+_store = None
+
+
+def get_store():
+    """The configured bucket store, created once per process."""
+    global _store
+    if _store is None:
+        _store = import_string(settings.RATE_LIMIT_STORE)()
+    return _store
+
+
+def parse_rate(rate):
+    """``'burst/per_minute'`` -> ``(capacity, refill tokens per second)``."""
+    burst, per_minute = rate.split('/')
+    return int(burst), int(per_minute) / 60
+
+
+class RateLimitThrottle(BaseThrottle):
+    """
+    DRF throttle taking one token from each bucket ``get_buckets`` names.
+
+    Subclasses set ``scope`` and return ``(name, key)`` pairs; each name's
+    rate comes from ``RATE_LIMITS['<scope>_<name>']``.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.retry_after = None
+
+    def get_buckets(self, request, view):
+        return [('ip', self.get_ident(request))]
+
+    def allow_request(self, request, view):
+        if not settings.RATE_LIMIT_ENABLED:
+            return True
+
+        store = get_store()
+        for name, key in self.get_buckets(request, view):
+            if not key:
+                continue
+            capacity, refill_rate = parse_rate(settings.RATE_LIMITS[f'{self.scope}_{name}'])
+            allowed, retry_after = store.take(f'{self.scope}:{name}:{key}', capacity, refill_rate)
+            if not allowed:
+                self.retry_after = retry_after
+                return False
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class CredentialRateThrottle(RateLimitThrottle):
+    """Per-IP and per-account buckets for endpoints that take an email."""
+
+    def get_buckets(self, request, view):
+        # Parsing the small credential body is cheap next to a hash; the email
+        # bucket stops a botnet rotating IPs against one account
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        buckets = [('ip', self.get_ident(request))]
+        if isinstance(email, str) and email.strip():
+            buckets.append(('email', email.strip().lower()))
+        return buckets
+
+
+class LoginRateThrottle(CredentialRateThrottle):
+    scope = 'login'
+
+
+class RegistrationRateThrottle(CredentialRateThrottle):
+    scope = 'register'
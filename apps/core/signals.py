@@ -0,0 +1,113 @@
+"""
+Dashboard cache invalidation.
+
+Each handler works out which members and service units a change can show up
+for and bumps only their cache namespaces (see ``apps.core.dashboard_cache``).
+Service unit stats share the unit namespaces; member edits only they show are
+dropped from ``apps.service_units.stats`` directly.
+"""
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.allocations.models import RoomAllocation
+from apps.authentication.models import User
+from apps.buildings.models import Building, Room
+from apps.service_units.models import ServiceUnit
+from apps.service_units.stats import invalidate_service_unit_stats
+
+from .dashboard_cache import invalidate_dashboard_stats
+
+# User fields shown in service unit stats, besides the unit itself
+SERVICE_UNIT_STATS_FIELDS = {'first_name', 'last_name', 'email', 'role', 'is_active', 'date_joined'}
+
+
+def _active_occupants(**filters):
+    """(user ids, service unit ids) of the active allocations matching ``filters``."""
+    rows = RoomAllocation.objects.filter(is_active=True, **filters).values_list('user_id', 'service_unit_id')
+    return {user_id for user_id, _ in rows}, {unit_id for _, unit_id in rows}
+
+
+@receiver(pre_save, sender=RoomAllocation)
+def remember_allocation_audience(sender, instance, **kwargs):
+    # Saving an active allocation deactivates the room's other allocations with
+    # a queryset update, which sends no signals, so collect them up front
+    previous = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values('user_id', 'service_unit_id', 'room_id').first()
+    rooms = {instance.room_id, previous['room_id'] if previous else None} - {None}
+    user_ids, unit_ids = _active_occupants(room_id__in=rooms)
+    if previous:
+        user_ids.add(previous['user_id'])
+        unit_ids.add(previous['service_unit_id'])
+    instance._dashboard_audience = (user_ids, unit_ids)
+
+
+@receiver(post_save, sender=RoomAllocation)
+def invalidate_allocation_save(sender, instance, **kwargs):
+    user_ids, unit_ids = getattr(instance, '_dashboard_audience', (set(), set()))
+    invalidate_dashboard_stats(
+        user_ids | {instance.user_id},
+        unit_ids | {instance.service_unit_id},
+    )
+
+
+@receiver(post_delete, sender=RoomAllocation)
+def invalidate_allocation_delete(sender, instance, **kwargs):
+    user_ids, unit_ids = _active_occupants(room_id=instance.room_id)
+    invalidate_dashboard_stats(
+        user_ids | {instance.user_id},
+        unit_ids | {instance.service_unit_id},
+    )
+
+
+@receiver(pre_save, sender=User)
+def remember_user_service_unit(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only; skip the lookup when the unit cannot change
+    if not instance.pk or (update_fields is not None and 'service_unit' not in update_fields):
+        return
+    instance._dashboard_previous_unit = (
+        sender.objects.filter(pk=instance.pk).values_list('service_unit_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_save(sender, instance, created, update_fields=None, **kwargs):
+    # A member's dashboard depends on their allocation and unit, not their
+    # profile; only unit membership (the Deacon member count) matters here
+    if created:
+        invalidate_dashboard_stats(service_unit_ids=[instance.service_unit_id])
+        return
+    previous_unit = getattr(instance, '_dashboard_previous_unit', instance.service_unit_id)
+    if previous_unit != instance.service_unit_id:
+        invalidate_dashboard_stats([instance.id], [previous_unit, instance.service_unit_id])
+    elif update_fields is None or SERVICE_UNIT_STATS_FIELDS & set(update_fields):
+        # Unit stats also list members, occupants and the admin by name
+        _, unit_ids = _active_occupants(user_id=instance.id)
+        unit_ids.update(instance.administered_units.values_list('id', flat=True))
+        invalidate_service_unit_stats(unit_ids | {instance.service_unit_id})
+
+
+@receiver(post_delete, sender=User)
+def invalidate_user_delete(sender, instance, **kwargs):
+    invalidate_dashboard_stats([instance.id], [instance.service_unit_id])
+
+
+@receiver(post_save, sender=ServiceUnit)
+@receiver(post_delete, sender=ServiceUnit)
+def invalidate_service_unit(sender, instance, **kwargs):
+    # Member keys embed their unit's version, so this also covers the unit
+    # name on members' dashboards; members allocated through the unit are
+    # bumped separately because they may belong to another one
+    user_ids, _ = _active_occupants(service_unit_id=instance.id)
+    invalidate_dashboard_stats(user_ids, [instance.id])
+
+
+@receiver(post_save, sender=Room)
+def invalidate_room_save(sender, instance, **kwargs):
+    invalidate_dashboard_stats(*_active_occupants(room_id=instance.id))
+
+
+@receiver(post_save, sender=Building)
+def invalidate_building_save(sender, instance, **kwargs):
+    invalidate_dashboard_stats(*_active_occupants(room__building_id=instance.id))
@@ -0,0 +1,160 @@
+"""
+Materialized dashboard snapshots.
+
+Dashboard endpoints serve the last payload stored in ``DashboardSnapshot``
+for the caller's scope, so a page load costs a single indexed read. Once a
+snapshot is older than ``DASHBOARD_SNAPSHOT_MAX_AGE`` the request still gets
+it, and a ``core.refresh_dashboard_snapshot`` job recomputes it in the
+background (at most one refresh per snapshot per interval). Snapshots older
+than ``DASHBOARD_SNAPSHOT_MAX_STALENESS`` are recomputed inline, so the
+dashboards stay correct when no worker is running. ``?fresh=1`` always
+recomputes; only SuperAdmins may ask for it. Payloads that report an error
+are returned but never stored.
+
+``refresh_dashboard_snapshots`` (management command) warms every shared
+scope, e.g. before admins open their dashboards in the morning.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import DashboardSnapshot
+
+# Snapshot name -> builder taking the requesting user and returning the payload
+SNAPSHOT_BUILDERS = {
+    'dashboard_stats': 'apps.core.views.get_dashboard_stats_data',
+    'dashboard_summary': 'apps.core.views.get_dashboard_summary_data',
+    'dashboard_overview': 'apps.analytics.views.get_dashboard_overview_data',
+}
+
+# Snapshots whose payload is the same for every caller
+GLOBAL_SNAPSHOTS = {'dashboard_overview'}
+
+# Roles whose dashboards do not depend on who is asking
+SHARED_ROLES = {'SuperAdmin', 'PortalManager', 'Pastor'}
+
+# Shared roles that still get a per-user snapshot of the named dashboards: a
+# Pastor's summary includes their own activity
+PER_USER_ROLES = {'dashboard_summary': {'Pastor'}}
+
+REFRESH_LOCK_PREFIX = 'snapshot-refresh'
+
+
+def snapshot_scope(name, user):
+    """Return the audience a snapshot computed for ``user`` can be shared with."""
+    if name in GLOBAL_SNAPSHOTS:
+        return 'all'
+    if user.role in SHARED_ROLES and user.role not in PER_USER_ROLES.get(name, ()):
+        return user.role
+    if user.role == 'Deacon':
+        return f'Deacon:{user.service_unit_id}'
+    return f'{user.role}:{user.id}'
+
+
+def wants_fresh(request):
+    """
+    True when a SuperAdmin asks to bypass the snapshot with ``?fresh=1``.
+
+    Everyone else is served the snapshot, so a client cannot force an inline
+    rebuild on every request.
+    """
+    return (
+        request.query_params.get('fresh') in ('1', 'true', 'yes')
+        and request.user.is_super_admin()
+    )
+
+
+def _has_error(payload):
+    # The stats builders return {'error': ...} instead of raising
+    return isinstance(payload, dict) and (
+        'error' in payload or 'error' in (payload.get('stats') or {})
+    )
+
+
+def build_snapshot(name, user):
+    """
+    Compute and store the snapshot ``name`` for ``user``'s scope.
+
+    A payload reporting an error is returned in an unsaved snapshot, leaving
+    the stored one (if any) in place.
+    """
+    builder = import_string(SNAPSHOT_BUILDERS[name])
+    started = time.perf_counter()
+    payload = builder(user)
+    fields = {
+        'payload': payload,
+        'generated_at': timezone.now(),
+        'duration_ms': int((time.perf_counter() - started) * 1000),
+    }
+    scope = snapshot_scope(name, user)
+    if _has_error(payload):
+        return DashboardSnapshot(name=name, scope=scope, **fields)
+    snapshot, _ = DashboardSnapshot.objects.update_or_create(name=name, scope=scope, defaults=fields)
+    return snapshot
+
+
+def get_snapshot(name, user, fresh=False):
+    """
+    Return the snapshot ``name`` for ``user``, computing it only when needed.
+
+    Returns:
+        ``(payload, generated_at)``
+    """
+    snapshot = None
+    if not fresh:
+        snapshot = DashboardSnapshot.objects.filter(name=name, scope=snapshot_scope(name, user)).first()
+
+    if snapshot is None:
+        snapshot = build_snapshot(name, user)
+    else:
+        age = timezone.now() - snapshot.generated_at
+        if age > timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_STALENESS):
+            snapshot = build_snapshot(name, user)
+        elif age > timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE):
+            schedule_refresh(name, user)
+
+    return snapshot.payload, snapshot.generated_at
+
+
+def schedule_refresh(name, user):
+    """Enqueue one background refresh per snapshot and interval."""
+    from .jobs import enqueue
+
+    lock = f'{REFRESH_LOCK_PREFIX}:{name}:{snapshot_scope(name, user)}'
+    if cache.add(lock, True, settings.DASHBOARD_SNAPSHOT_MAX_AGE):
+        enqueue('core.refresh_dashboard_snapshot', priority=5, snapshot=name, user_id=user.id)
+
+
+def refresh_if_stale(name, user):
+    """Recompute the snapshot unless it was generated within the last interval."""
+    generated_at = (
+        DashboardSnapshot.objects
+        .filter(name=name, scope=snapshot_scope(name, user))
+        .values_list('generated_at', flat=True)
+        .first()
+    )
+    if generated_at and timezone.now() - generated_at < timedelta(seconds=settings.DASHBOARD_SNAPSHOT_MAX_AGE):
+        return None
+    return build_snapshot(name, user)
+
+
+def shared_scope_users(name='dashboard_stats'):
+    """
+    One active user per shared scope of ``name``, i.e. per shared role.
+
+    Deacons and Members read their dashboards from ``apps.core.dashboard_cache``
+    instead, so their scopes are not warmed.
+    """
+    from apps.authentication.models import User
+
+    users = {}
+    roles = SHARED_ROLES - PER_USER_ROLES.get(name, set())
+    candidates = User.objects.filter(is_active=True, role__in=roles).order_by('id')
+    for user in candidates:
+        users.setdefault(snapshot_scope(name, user), user)
+    return list(users.values())
@@ -0,0 +1,98 @@
+"""
+System-wide dashboard totals, one conditional-aggregate query per table.
+
+Each collector returns every figure the dashboards need from one table with a
+single ``aggregate(Count(..., filter=Q(...)))``. The collectors are
+independent, so ``collect_stats`` can run them concurrently on a thread pool
+(``DASHBOARD_STATS_WORKERS``), each thread on its own database connection.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def room_totals():
+    from apps.buildings.models import Room
+
+    totals = Room.objects.aggregate(
+        total=Count('id'),
+        occupied=Count('id', filter=Q(is_allocated=True)),
+    )
+    totals['available'] = totals['total'] - totals['occupied']
+    return totals
+
+
+def allocation_totals():
+    from apps.allocations.models import RoomAllocation
+
+    return RoomAllocation.objects.aggregate(active=Count('id', filter=Q(is_active=True)))
+
+
+def user_totals():
+    from apps.authentication.models import User
+
+    month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return User.objects.aggregate(
+        total=Count('id'),
+        new_this_month=Count('id', filter=Q(date_joined__gte=month_start)),
+        members=Count('id', filter=Q(role='Member')),
+        active_members=Count('id', filter=Q(role='Member', is_active=True)),
+    )
+
+
+def building_totals():
+    from apps.buildings.models import Building
+
+    return Building.objects.aggregate(total=Count('id'))
+
+
+def service_unit_totals():
+    from apps.service_units.models import ServiceUnit
+
+    return ServiceUnit.objects.aggregate(total=Count('id'))
+
+
+COLLECTORS = {
+    'rooms': room_totals,
+    'allocations': allocation_totals,
+    'users': user_totals,
+    'buildings': building_totals,
+    'service_units': service_unit_totals,
+}
+
+
+def can_run_concurrently():
+    """
+    Worker threads open their own connections: they cannot see rows written
+    by an open transaction, and SQLite serializes access anyway.
+    """
+    return connection.vendor != 'sqlite' and not connection.in_atomic_block
+
+
+def collect_stats(tables=None, workers=None):
+    """
+    Run the collectors for ``tables`` (default: all) and return
+    ``{table: figures}``.
+    """
+    tables = list(tables or COLLECTORS)
+    workers = settings.DASHBOARD_STATS_WORKERS if workers is None else workers
+    workers = min(workers, len(tables))
+
+    if workers <= 1 or not can_run_concurrently():
+        return {table: COLLECTORS[table]() for table in tables}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {table: executor.submit(_run_in_thread, COLLECTORS[table]) for table in tables}
+        return {table: future.result() for table, future in futures.items()}
+
+
+def _run_in_thread(collector):
+    try:
+        return collector()
+    finally:
+        # Threads get their own connection; don't leak it past the pool
+        connections.close_all()
@@ -0,0 +1,21 @@
+"""
+Background job handlers for the core app.
+Executed by the ``process_jobs`` worker (see apps/core/jobs.py).
+"""
+
+from .jobs import PermanentJobError, register_job
+from .snapshots import refresh_if_stale
+
+
+@register_job('core.refresh_dashboard_snapshot', max_attempts=1)
+def refresh_dashboard_snapshot(job, snapshot, user_id):
+    """Recompute a dashboard snapshot that a request found stale."""
+    from apps.authentication.models import User
+
+    try:
+        user = User.objects.get(id=user_id)
+    except User.DoesNotExist:
+        raise PermanentJobError(f"User {user_id} no longer exists")
+
+    refreshed = refresh_if_stale(snapshot, user)
+    return {'refreshed': refreshed is not None}
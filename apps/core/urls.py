@@ -12,4 +12,5 @@ urlpatterns = [
     path('dashboard/stats/', views.dashboard_stats, name='dashboard_stats'),
     path('dashboard/activities/', views.dashboard_activities, name='dashboard_activities'),
     path('dashboard/summary/', views.dashboard_summary, name='dashboard_summary'),
+    path('dashboard/cache-stats/', views.dashboard_cache_status, name='dashboard_cache_status'),
 ]
@@ -43,10 +43,11 @@ class ServiceUnitAdmin(admin.ModelAdmin):
         """Display allocated rooms count."""
         return obj.get_allocated_rooms_count()
     get_allocated_rooms_count.short_description = 'Allocated Rooms'
+    get_allocated_rooms_count.admin_order_field = 'allocations_count'
     
     def get_queryset(self, request):
         """Filter based on user permissions."""
-        qs = super().get_queryset(request)
+        qs = super().get_queryset(request).with_counts()
         if request.user.is_superuser:
             return qs
         if hasattr(request.user, 'service_unit') and request.user.service_unit:
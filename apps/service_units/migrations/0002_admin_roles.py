@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-19 06:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('service_units', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='serviceunit',
+            name='admin',
+            field=models.ForeignKey(blank=True, help_text='Admin user responsible for managing this service unit', limit_choices_to={'role__in': ['SuperAdmin', 'Deacon']}, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='administered_units', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
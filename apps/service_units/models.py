@@ -4,9 +4,71 @@ Based on the SQL schema design for managing service units like Choir, Ushers, Pr
 """
 
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.conf import settings
 
 
+def _count_subquery(queryset, field):
+    """COUNT of ``queryset`` rows whose ``field`` points at the outer service unit."""
+    counts = (
+        queryset.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(counts), 0)
+
+
+class ServiceUnitQuerySet(models.QuerySet):
+    """QuerySet for service units."""
+
+    def with_counts(self):
+        """
+        Annotate ``members_count`` and ``allocations_count`` and join the admin.
+
+        ``member_count`` and ``allocated_rooms_count`` read the annotations
+        instead of issuing two COUNT queries per unit. The counts are
+        correlated subqueries: two COUNT joins would multiply each other.
+        """
+        from django.apps import apps
+        User = apps.get_model('authentication', 'User')
+        RoomAllocation = apps.get_model('allocations', 'RoomAllocation')
+
+        return self.select_related('admin').annotate(
+            members_count=_count_subquery(User.objects.filter(is_active=True), 'service_unit'),
+            allocations_count=_count_subquery(RoomAllocation.objects.all(), 'service_unit'),
+        )
+
+    def with_stats(self, recent_members=5):
+        """
+        ``with_counts()`` plus the prefetches behind the stats endpoint.
+
+        Sets ``active_allocation_list`` (with room, building and occupant)
+        and ``recent_member_list`` (newest ``recent_members`` members), so a
+        unit's stats take three queries however many rows they cover.
+        """
+        from django.apps import apps
+        User = apps.get_model('authentication', 'User')
+        RoomAllocation = apps.get_model('allocations', 'RoomAllocation')
+
+        return self.with_counts().prefetch_related(
+            models.Prefetch(
+                'room_allocations',
+                queryset=RoomAllocation.objects.filter(is_active=True)
+                .select_related('room', 'room__building', 'user')
+                .order_by('room__building__name', 'room__room_number'),
+                to_attr='active_allocation_list',
+            ),
+            models.Prefetch(
+                'members',
+                queryset=User.objects.order_by('-date_joined')[:recent_members],
+                to_attr='recent_member_list',
+            ),
+        )
+
+
 class ServiceUnit(models.Model):
     """
     Service Unit model representing groups like Choir, Ushers, Protocol, Media.
@@ -46,6 +108,8 @@ class ServiceUnit(models.Model):
         help_text="When this service unit was created"
     )
     
+    objects = ServiceUnitQuerySet.as_manager()
+    
     class Meta:
         db_table = 'service_units'
         verbose_name = 'Service Unit'
@@ -58,6 +122,8 @@ class ServiceUnit(models.Model):
     @property
     def member_count(self):
         """Return the number of members in this service unit."""
+        if hasattr(self, 'members_count'):
+            return self.members_count
         return self.members.filter(is_active=True).count()
     
     def get_member_count(self):
@@ -67,6 +133,8 @@ class ServiceUnit(models.Model):
     @property
     def allocated_rooms_count(self):
         """Return the number of rooms allocated to this service unit."""
+        if hasattr(self, 'allocations_count'):
+            return self.allocations_count
         return self.room_allocations.count()
     
     def get_allocated_rooms_count(self):
@@ -116,6 +184,6 @@ class ServiceUnit(models.Model):
         """Override save to perform validation."""
         # Ensure admin has appropriate role
         if self.admin and not self.admin.can_allocate_rooms():
-            raise ValueError("Admin must be either SuperAdmin or ServiceUnitAdmin")
+            raise ValueError("Admin must be either SuperAdmin or Deacon")
         
         super().save(*args, **kwargs)
@@ -118,19 +118,23 @@ class ServiceUnitMemberSerializer(serializers.ModelSerializer):
 class ServiceUnitStatsSerializer(serializers.ModelSerializer):
     """
     Serializer for service unit statistics and analytics.
+
+    Expects a unit from ``ServiceUnit.objects.with_stats()``; units fetched
+    otherwise fall back to one query per section.
     """
     admin_name = serializers.CharField(source='admin.get_full_name', read_only=True)
     member_count = serializers.SerializerMethodField()
     allocated_rooms_count = serializers.SerializerMethodField()
     active_allocations = serializers.SerializerMethodField()
+    capacity = serializers.SerializerMethodField()
     recent_members = serializers.SerializerMethodField()
     
     class Meta:
         model = ServiceUnit
         fields = [
-            'id', 'name', 'description', 'admin_name', 
+            'id', 'name', 'description', 'admin', 'admin_name',
             'member_count', 'allocated_rooms_count', 'active_allocations',
-            'recent_members', 'created_at'
+            'capacity', 'recent_members', 'created_at'
         ]
     
     def get_member_count(self, obj):
@@ -141,40 +145,51 @@ class ServiceUnitStatsSerializer(serializers.ModelSerializer):
         """Get the number of rooms allocated to this service unit."""
         return obj.get_allocated_rooms_count()
     
+    def _active_allocations(self, obj):
+        if not hasattr(obj, 'active_allocation_list'):
+            obj.active_allocation_list = list(
+                obj.room_allocations.filter(is_active=True)
+                .select_related('room', 'room__building', 'user')
+                .order_by('room__building__name', 'room__room_number')
+            )
+        return obj.active_allocation_list
+    
     def get_active_allocations(self, obj):
         """Get active room allocations for this service unit."""
-        try:
-            RoomAllocation = apps.get_model('allocations', 'RoomAllocation')
-            allocations = RoomAllocation.objects.filter(
-                service_unit=obj,
-                status='Active'
-            ).select_related('room', 'room__building')
-            
-            return [{
-                'id': allocation.id,
-                'room_number': allocation.room.room_number,
-                'building_name': allocation.room.building.name,
-                'allocation_type': allocation.allocation_type,
-                'start_date': allocation.start_date,
-                'end_date': allocation.end_date
-            } for allocation in allocations]
-        except:
-            return []
+        return [{
+            'id': allocation.id,
+            'room_number': allocation.room.room_number,
+            'building_name': allocation.room.building.name,
+            'room_capacity': allocation.room.capacity,
+            'allocation_type': allocation.allocation_type,
+            'occupant': allocation.user.get_full_name() if allocation.user else None,
+            'start_date': allocation.start_date,
+            'end_date': allocation.end_date
+        } for allocation in self._active_allocations(obj)]
+    
+    def get_capacity(self, obj):
+        """Beds in the unit's actively allocated rooms against their named occupants."""
+        allocations = self._active_allocations(obj)
+        allocated = sum(allocation.room.capacity for allocation in allocations)
+        # Unit-wide allocations name no occupant, so they hold no counted bed
+        used = sum(1 for allocation in allocations if allocation.user_id)
+        return {
+            'allocated': allocated,
+            'used': used,
+            'available': max(allocated - used, 0),
+            'occupancy_rate': round(used / allocated * 100) if allocated else 0,
+        }
     
     def get_recent_members(self, obj):
         """Get recently joined members of this service unit."""
-        try:
-            User = apps.get_model('authentication', 'User')
-            recent_members = User.objects.filter(
-                service_unit=obj
-            ).order_by('-date_joined')[:5]
-            
-            return [{
-                'id': member.id,
-                'full_name': member.get_full_name(),
-                'email': member.email,
-                'role': member.role,
-                'date_joined': member.date_joined
-            } for member in recent_members]
-        except:
-            return []
+        recent_members = getattr(obj, 'recent_member_list', None)
+        if recent_members is None:
+            recent_members = obj.members.order_by('-date_joined')[:5]
+        
+        return [{
+            'id': member.id,
+            'full_name': member.get_full_name(),
+            'email': member.email,
+            'role': member.role,
+            'date_joined': member.date_joined
+        } for member in recent_members]
@@ -0,0 +1,58 @@
+"""
+Service unit statistics for the unit stats endpoint.
+
+A unit's payload (member and allocation counts, active allocations with their
+room and building, bed capacity against occupants, and the newest members)
+comes from ``ServiceUnit.objects.with_stats()`` in three queries, however many
+rows it covers. It is cached under the unit's dashboard namespace (see
+``apps.core.dashboard_cache``), so every allocation, room, building, unit or
+membership change that bumps the unit's Deacon dashboard also retires its
+stats. ``apps.core.signals`` deletes the key directly for member edits the
+dashboard does not show, such as a renamed occupant. Those invalidations only
+reach other workers through a shared cache, so with a per-process one the
+stats are computed on every request.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.core.cache import cache_is_shared, versioned_key
+from apps.core.dashboard_cache import unit_namespace
+
+from .models import ServiceUnit
+from .serializers import ServiceUnitStatsSerializer
+
+STATS_NAMESPACE = 'service-unit-stats'
+
+
+def service_unit_stats_cache_key(service_unit_id):
+    return versioned_key(unit_namespace(service_unit_id), STATS_NAMESPACE)
+
+
+def invalidate_service_unit_stats(service_unit_ids=()):
+    """Drop the cached stats of ``service_unit_ids``."""
+    cache.delete_many([
+        service_unit_stats_cache_key(unit_id) for unit_id in set(service_unit_ids) - {None}
+    ])
+
+
+def compute_service_unit_stats(service_unit_id):
+    """Stats payload for ``service_unit_id``, or ``None`` if there is no such unit."""
+    service_unit = ServiceUnit.objects.with_stats().filter(pk=service_unit_id).first()
+    if service_unit is None:
+        return None
+    return dict(ServiceUnitStatsSerializer(service_unit).data)
+
+
+def get_service_unit_stats(service_unit_id):
+    """Cached ``compute_service_unit_stats`` for the unit."""
+    if not cache_is_shared():
+        # Other workers would never see this worker's invalidations
+        return compute_service_unit_stats(service_unit_id)
+    key = service_unit_stats_cache_key(service_unit_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_service_unit_stats(service_unit_id)
+        if stats is not None:
+            cache.set(key, stats, settings.SERVICE_UNIT_STATS_CACHE_TTL)
+    return stats
@@ -7,16 +7,19 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.apps import apps
 
+from apps.core.permissions import can, scope_queryset
+
 from .models import ServiceUnit
+from .stats import get_service_unit_stats
 from .serializers import (
     ServiceUnitSerializer,
     ServiceUnitCreateSerializer,
     ServiceUnitListSerializer,
-    ServiceUnitMemberSerializer,
-    ServiceUnitStatsSerializer
+    ServiceUnitMemberSerializer
 )
 
 
@@ -35,23 +38,12 @@ class ServiceUnitListCreateView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         """Filter service units based on user role."""
-        user = self.request.user
-        
-        if user.role == 'SuperAdmin':
-            return ServiceUnit.objects.all()
-        elif user.role == 'ServiceUnitAdmin':
-            # ServiceUnitAdmin can see their own service unit
-            if user.service_unit:
-                return ServiceUnit.objects.filter(id=user.service_unit.id)
-            else:
-                return ServiceUnit.objects.none()
-        else:
-            # Regular users can see all service units (read-only)
-            return ServiceUnit.objects.all()
+        # Every role may browse service units (read-only)
+        return scope_queryset(ServiceUnit.objects.with_counts(), self.request.user, 'service_units')
     
     def create(self, request, *args, **kwargs):
         """Create a new service unit (SuperAdmin only)."""
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'service_units', 'create'):
             return Response({
                 'error': 'Only SuperAdmin can create service units'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -70,36 +62,13 @@ class ServiceUnitDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def get_queryset(self):
         """Filter service units based on user role."""
-        user = self.request.user
-        
-        if user.role == 'SuperAdmin':
-            return ServiceUnit.objects.all()
-        elif user.role == 'ServiceUnitAdmin':
-            if user.service_unit:
-                return ServiceUnit.objects.filter(id=user.service_unit.id)
-            else:
-                return ServiceUnit.objects.none()
-        else:
-            # Regular users can view service units
-            return ServiceUnit.objects.all()
+        return scope_queryset(ServiceUnit.objects.with_counts(), self.request.user, 'service_units')
     
     def update(self, request, *args, **kwargs):
-        """Update service unit (SuperAdmin or assigned admin only)."""
+        """Update service unit (SuperAdmin only)."""
         service_unit = self.get_object()
-        user = request.user
         
-        if user.role == 'SuperAdmin':
-            # SuperAdmin can update any service unit
-            pass
-        elif user.role == 'ServiceUnitAdmin' and user.service_unit == service_unit:
-            # ServiceUnitAdmin can update their own service unit (limited fields)
-            allowed_fields = ['description']
-            for field in request.data.keys():
-                if field not in allowed_fields:
-                    return Response({
-                        'error': f'ServiceUnitAdmin can only update: {", ".join(allowed_fields)}'
-                    }, status=status.HTTP_403_FORBIDDEN)
-        else:
+        if not can(request.user, 'service_units', 'update', service_unit):
             return Response({
                 'error': 'You do not have permission to update this service unit'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -108,7 +77,7 @@ class ServiceUnitDetailView(generics.RetrieveUpdateDestroyAPIView):
     
     def destroy(self, request, *args, **kwargs):
         """Delete service unit (SuperAdmin only)."""
-        if request.user.role != 'SuperAdmin':
+        if not can(request.user, 'service_units', 'delete'):
             return Response({
                 'error': 'Only SuperAdmin can delete service units'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -129,49 +98,37 @@ class ServiceUnitMembersView(generics.ListAPIView):
         service_unit_id = self.kwargs['pk']
         user = self.request.user
         
-        # Check permissions
-        if user.role == 'SuperAdmin':
-            # SuperAdmin can view any service unit's members
-            pass
-        elif user.role == 'ServiceUnitAdmin':
-            # ServiceUnitAdmin can only view their own service unit's members
-            if not user.service_unit or user.service_unit.id != int(service_unit_id):
-                return apps.get_model('authentication', 'User').objects.none()
-        else:
-            # Regular users can view service unit members
-            pass
-        
         try:
             service_unit = ServiceUnit.objects.get(id=service_unit_id)
+            
+            if not can(user, 'service_units', 'view_members', service_unit):
+                return apps.get_model('authentication', 'User').objects.none()
+            
             User = apps.get_model('authentication', 'User')
             return User.objects.filter(service_unit=service_unit)
         except ServiceUnit.DoesNotExist:
             return apps.get_model('authentication', 'User').objects.none()
 
 
-class ServiceUnitStatsView(generics.RetrieveAPIView):
+class ServiceUnitStatsView(APIView):
     """
     API view for service unit statistics and analytics.
     GET /api/service-units/<id>/stats/
+
+    Served from the per-unit cache in ``apps.service_units.stats``.
     """
-    queryset = ServiceUnit.objects.all()
-    serializer_class = ServiceUnitStatsSerializer
     permission_classes = [permissions.IsAuthenticated]
     
-    def get_queryset(self):
-        """Filter service units based on user role."""
-        user = self.request.user
-        
-        if user.role == 'SuperAdmin':
-            return ServiceUnit.objects.all()
-        elif user.role == 'ServiceUnitAdmin':
-            if user.service_unit:
-                return ServiceUnit.objects.filter(id=user.service_unit.id)
-            else:
-                return ServiceUnit.objects.none()
-        else:
-            # Regular users can view basic stats
-            return ServiceUnit.objects.all()
+    def get(self, request, pk):
+        # Units outside the user's scope are reported missing, as the
+        # scoped queryset lookup did; check before computing or caching
+        unit = ServiceUnit.objects.filter(pk=pk).values('id', 'admin_id').first()
+        if unit is None or not can(request.user, 'service_units', 'view', ServiceUnit(**unit)):
+            raise Http404
+        stats = get_service_unit_stats(pk)
+        if stats is None:
+            raise Http404
+        return Response(stats)
 
 
 @api_view(['POST'])
@@ -184,20 +141,14 @@ def assign_member_to_service_unit(request, pk):
     user = request.user
     
     # Check permissions
-    if user.role not in ['SuperAdmin', 'ServiceUnitAdmin']:
+    if not can(user, 'service_units', 'manage_members'):
         return Response({
-            'error': 'Only SuperAdmin and ServiceUnitAdmin can assign members'
+            'error': 'Only SuperAdmin can assign members'
         }, status=status.HTTP_403_FORBIDDEN)
     
     try:
         service_unit = ServiceUnit.objects.get(id=pk)
         
-        # ServiceUnitAdmin can only assign to their own service unit
-        if user.role == 'ServiceUnitAdmin' and user.service_unit != service_unit:
-            return Response({
-                'error': 'You can only assign members to your own service unit'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         member_id = request.data.get('member_id')
         if not member_id:
             return Response({
@@ -231,20 +182,14 @@ def remove_member_from_service_unit(request, pk):
     user = request.user
     
     # Check permissions
-    if user.role not in ['SuperAdmin', 'ServiceUnitAdmin']:
+    if not can(user, 'service_units', 'manage_members'):
         return Response({
-            'error': 'Only SuperAdmin and ServiceUnitAdmin can remove members'
+            'error': 'Only SuperAdmin can remove members'
         }, status=status.HTTP_403_FORBIDDEN)
     
     try:
         service_unit = ServiceUnit.objects.get(id=pk)
         
-        # ServiceUnitAdmin can only remove from their own service unit
-        if user.role == 'ServiceUnitAdmin' and user.service_unit != service_unit:
-            return Response({
-                'error': 'You can only remove members from your own service unit'
-            }, status=status.HTTP_403_FORBIDDEN)
-        
         member_id = request.data.get('member_id')
         if not member_id:
             return Response({